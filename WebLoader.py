@@ -1,22 +1,100 @@
 import os
+import sys
 import json
 import time
 import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext, messagebox, simpledialog
-from urllib.parse import urlparse
-import requests
 from pathlib import Path
 from tkinter.font import Font
-from datetime import datetime
 import zipfile
 import shutil
 import webbrowser
 from PIL import Image, ImageTk
 import io
 import re
+import logging
+from logging.handlers import RotatingFileHandler
+from collections import OrderedDict, deque
+import http_client
+import progress_events as events
+import artifacts
+import bundle
+import gdweave
+import snapshots
+import store
+import lockfile
+import mirrors
+import delta
+import ingest
+import scheduler
+import throttle
+from control import BatchControl
+from download_queue import DownloadQueue, QUEUE_FILE, CHANGE_ADD, CHANGE_REMOVE, CHANGE_MOVE, CHANGE_UPDATE, CHANGE_CLEAR
+from engine import EngineError, ModEngine, PresetError, extract_mod_info_from_url, is_gdweave_url, load_preset, save_preset
+
+# Icons kept for the details panel; the least recently shown are dropped beyond this
+MAX_CACHED_ICONS = 64
+
+
+class LogBuffer:
+    """Keep the last N console lines in memory and the full log in rotated files"""
+
+    LEVELS = ("info", "success", "warning", "error")
+
+    def __init__(self, log_dir, max_lines=2000, max_bytes=1024 * 1024, backup_count=5):
+        self.entries = deque(maxlen=max_lines)
+        self.lock = threading.Lock()
+        self.log_path = None
+
+        self.logger = logging.getLogger("WebLoader.console")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            try:
+                os.makedirs(log_dir, exist_ok=True)
+                self.log_path = os.path.join(log_dir, "webloader.log")
+                handler = RotatingFileHandler(self.log_path, maxBytes=max_bytes,
+                                              backupCount=backup_count, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self.logger.addHandler(handler)
+            except Exception:
+                self.log_path = None
+
+    @property
+    def max_lines(self):
+        return self.entries.maxlen
+
+    def append(self, message, level="info"):
+        """Store a message in the ring buffer and the rotated log file"""
+        if level not in self.LEVELS:
+            level = "info"
+        with self.lock:
+            self.entries.append((level, message))
+        try:
+            self.logger.info(f"[{level.upper()}] {message.strip()}")
+        except Exception:
+            pass
+
+    def search(self, term, levels=None):
+        """Return buffered entries containing term (case-insensitive), optionally limited to levels"""
+        term = term.lower()
+        with self.lock:
+            snapshot = list(self.entries)
+        return [
+            (level, message) for level, message in snapshot
+            if (levels is None or level in levels) and term in message.lower()
+        ]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
 
 class WebFishingModManager:
+    # Redraw interval for download progress while a batch is running
+    PROGRESS_FRAME_MS = 100
+
     def load_config(self):
         try:
             if os.path.exists(self.config_path):
@@ -66,20 +144,51 @@ class WebFishingModManager:
         self.download_thread = None
         self.is_downloading = False
         self.current_mods = []
-        self.current_mod_images = {}
+        self.current_mod_images = OrderedDict()
+        self.http = http_client.get_client()
+        self.event_bus = events.EventBus()
+        self.progress_queue = self.event_bus.subscribe()
+        self.progress_tracker = events.ProgressTracker()
+        self.transfer_bars = {}
+        # Pause/resume/cancel for the running batch; replaced by start_batch
+        self.control = BatchControl()
+        # Lockfile from the last loaded preset; used while the list still holds exactly its mods
+        self.loaded_lock = None
+        # The download list; url_tree only displays it
+        self.queue = DownloadQueue.load(os.path.join(os.path.dirname(self.config_path), QUEUE_FILE))
+        self.queue_save_pending = False
+        
+        # Load config
+        self.config = self.load_config()
+
+        # Bandwidth limits shared by every batch; the speed boxes change them while one runs
+        self.bandwidth = throttle.Bandwidth(self.config_rate("bandwidth_limit"),
+                                            self.config_rate("per_download_limit"))
+        # Archive mirrors from config.json; kept between batches so their measurements carry over
+        self.mirror_set = self.load_mirrors()
+        # Team-shared archive cache ("artifact_cache" in config.json), checked before Thunderstore
+        self.artifact_cache = self.load_artifact_cache()
+
+        # Console history: bounded in memory, full log rotated on disk
+        self.log_buffer = LogBuffer(
+            os.path.join(os.path.dirname(self.config_path), 'logs'),
+            max_lines=self.config.get("console_max_lines", 2000)
+        )
         
         # Configure styles
         self.configure_styles()
         
         # Build UI
         self.create_ui()
-        
-        # Load config
-        self.config = self.load_config()
+        for item in self.queue:
+            self.on_queue_change(CHANGE_ADD, item, None)
+        self.queue.subscribe(self.on_queue_change)
 
         # Load initial mod list
         self.refresh_mod_browser()
 
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Show welcome popup and GDWeave check if not disabled
         if not self.config.get("suppress_welcome_popup", False):
             self.root.after(300, self.show_welcome_and_gdweave_prompt)
@@ -588,6 +697,7 @@ class WebFishingModManager:
             return
 
         if image_url in self.current_mod_images:
+            self.current_mod_images.move_to_end(image_url)
             img = self.current_mod_images[image_url]
             self.mod_image_label.config(image=img, text='')
             self.mod_image_label.image = img
@@ -595,8 +705,7 @@ class WebFishingModManager:
             
         def fetch_image():
             try:
-                response = requests.get(image_url, timeout=10, 
-                                    headers={'User-Agent': 'WebFishing Mod Manager/1.0'})
+                response = self.http.get(image_url, kind=http_client.KIND_ICON)
                 
                 if response.status_code == 200:
                     image_data = response.content
@@ -607,7 +716,7 @@ class WebFishingModManager:
                     photo_img = ImageTk.PhotoImage(img)
                     
 
-                    self.current_mod_images[image_url] = photo_img
+                    self.cache_mod_image(image_url, photo_img)
                     
 
                     self.root.after(0, lambda: self.update_mod_image(photo_img))
@@ -690,6 +799,9 @@ class WebFishingModManager:
         
         add_button = ttk.Button(url_entry_frame, text="Add Mod", command=self.add_url, style='Secondary.TButton')
         add_button.pack(side=tk.LEFT)
+
+        bulk_add_button = ttk.Button(url_entry_frame, text="Bulk Add...", command=self.bulk_add, style='Secondary.TButton')
+        bulk_add_button.pack(side=tk.LEFT, padx=(5, 0))
         
 
         import_zip_button = ttk.Button(
@@ -710,11 +822,29 @@ class WebFishingModManager:
         tree_container = ttk.Frame(list_card)
         tree_container.pack(fill=tk.BOTH, expand=True)
         
-        self.url_tree = ttk.Treeview(tree_container, columns=("url", "name"), show="headings")
+        self.url_tree = ttk.Treeview(tree_container, columns=("url", "name", "priority"), show="headings")
         self.url_tree.heading("url", text="Mod URL")
         self.url_tree.heading("name", text="Mod Name")
+        self.url_tree.heading("priority", text="Priority")
         self.url_tree.column("url", width=400, anchor="w")
         self.url_tree.column("name", width=150, anchor="w")
+        self.url_tree.column("priority", width=60, anchor="center", stretch=False)
+
+        self.queue_menu = tk.Menu(self.root, tearoff=0)
+        self.queue_menu.add_command(label="Move to Top", command=lambda: self.move_selected(self.queue.move_to_top, True))
+        self.queue_menu.add_command(label="Move Up", command=lambda: self.move_selected(self.queue.move_up, True))
+        self.queue_menu.add_command(label="Move Down", command=lambda: self.move_selected(self.queue.move_down, False))
+        self.queue_menu.add_command(label="Move to Bottom", command=lambda: self.move_selected(self.queue.move_to_bottom, False))
+        self.queue_menu.add_separator()
+        self.queue_menu.add_command(label="Download First", command=lambda: self.set_selected_priority(1))
+        self.queue_menu.add_command(label="Normal Priority", command=lambda: self.set_selected_priority(0))
+        self.queue_menu.add_command(label="Download Last", command=lambda: self.set_selected_priority(-1))
+        self.queue_menu.add_separator()
+        self.queue_menu.add_command(label="Remove", command=self.remove_selected)
+        self.url_tree.bind("<Button-3>", self.show_queue_menu)
+        self.url_tree.bind("<Alt-Up>", lambda e: self.move_selected(self.queue.move_up, True))
+        self.url_tree.bind("<Alt-Down>", lambda e: self.move_selected(self.queue.move_down, False))
+        self.url_tree.bind("<Delete>", lambda e: self.remove_selected())
         
         vsb = ttk.Scrollbar(tree_container, orient="vertical", command=self.url_tree.yview)
         hsb = ttk.Scrollbar(tree_container, orient="horizontal", command=self.url_tree.xview)
@@ -745,9 +875,23 @@ class WebFishingModManager:
         load_preset_button = ttk.Button(left_actions, text="Load Preset", command=self.load_preset, style='Secondary.TButton')
         load_preset_button.pack(side=tk.LEFT, padx=(0, 5))
 
+        apply_preset_button = ttk.Button(left_actions, text="Apply Preset", command=self.apply_preset, style='Secondary.TButton')
+        apply_preset_button.pack(side=tk.LEFT, padx=(0, 5))
+
         save_preset_button = ttk.Button(left_actions, text="Save Preset", command=self.save_preset_as, style='Secondary.TButton')
         save_preset_button.pack(side=tk.LEFT, padx=(0, 5))
 
+        profiles_button = ttk.Button(left_actions, text="Profiles", command=self.manage_profiles, style='Secondary.TButton')
+        profiles_button.pack(side=tk.LEFT, padx=(0, 5))
+
+        self.bundle_menu = tk.Menu(self.root, tearoff=0)
+        self.bundle_menu.add_command(label="Export Bundle...", command=self.export_bundle)
+        self.bundle_menu.add_command(label="Install from Bundle...", command=self.install_bundle)
+        bundle_button = ttk.Button(left_actions, text="Bundle", style='Secondary.TButton')
+        bundle_button.config(command=lambda: self.bundle_menu.tk_popup(
+            bundle_button.winfo_rootx(), bundle_button.winfo_rooty() + bundle_button.winfo_height()))
+        bundle_button.pack(side=tk.LEFT, padx=(0, 5))
+
         remove_button = ttk.Button(left_actions, text="Remove Selected", command=self.remove_selected, style='Secondary.TButton')
         remove_button.pack(side=tk.LEFT, padx=(0, 5))
 
@@ -761,6 +905,15 @@ class WebFishingModManager:
             style='Accent.TButton'
         )
         self.download_button.pack(fill=tk.X, pady=(0, 5), padx=(0, 5))
+
+        batch_controls = ttk.Frame(left_panel)
+        batch_controls.pack(fill=tk.X, pady=(0, 5), padx=(0, 5))
+        self.pause_button = ttk.Button(batch_controls, text="⏸️ Pause", command=self.toggle_pause,
+                                       style='Secondary.TButton', state=tk.DISABLED)
+        self.pause_button.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        self.cancel_button = ttk.Button(batch_controls, text="⏹️ Cancel", command=self.cancel_batch,
+                                        style='Secondary.TButton', state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
 
         ttk.Frame(left_panel, height=5).pack(fill=tk.X) 
@@ -778,6 +931,34 @@ class WebFishingModManager:
         self.progress.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
         ttk.Label(progress_frame, text="  ").pack(side=tk.LEFT)
+
+        self.progress_status_label = ttk.Label(left_panel, text="", foreground=self.secondary_color)
+        self.progress_status_label.pack(fill=tk.X, pady=(2, 0))
+
+        speed_frame = ttk.Frame(left_panel)
+        speed_frame.pack(fill=tk.X, pady=(2, 0))
+        rates = ("Unlimited", "256 KB/s", "512 KB/s", "1 MB/s", "2 MB/s", "5 MB/s", "10 MB/s")
+
+        ttk.Label(speed_frame, text="Speed limit:").pack(side=tk.LEFT, padx=(0, 5))
+        self.limit_var = tk.StringVar(value=throttle.format_rate(self.bandwidth.limit))
+        limit_box = ttk.Combobox(speed_frame, textvariable=self.limit_var, values=rates, width=12)
+        limit_box.pack(side=tk.LEFT, padx=(0, 10))
+
+        ttk.Label(speed_frame, text="Per mod:").pack(side=tk.LEFT, padx=(0, 5))
+        self.per_download_var = tk.StringVar(value=throttle.format_rate(self.bandwidth.per_download))
+        per_download_box = ttk.Combobox(speed_frame, textvariable=self.per_download_var, values=rates, width=12)
+        per_download_box.pack(side=tk.LEFT)
+
+        mirrors_button = ttk.Button(speed_frame, text="Mirrors...", command=self.edit_mirrors, style='Secondary.TButton')
+        mirrors_button.pack(side=tk.RIGHT)
+
+        for box in (limit_box, per_download_box):
+            box.bind("<<ComboboxSelected>>", lambda e: self.apply_speed_limits())
+            box.bind("<Return>", lambda e: self.apply_speed_limits())
+            box.bind("<FocusOut>", lambda e: self.apply_speed_limits())
+
+        self.transfer_frame = ttk.Frame(left_panel)
+        self.transfer_frame.pack(fill=tk.X)
     def install_gdweave(self):
             """Special handler for installing GDWeave"""
 
@@ -792,12 +973,23 @@ class WebFishingModManager:
                     parent=self.root
                 )
                 return
+
+            installed = gdweave.installed_version(game_folder)
+            try:
+                release = gdweave.latest_release(self.http)
+            except gdweave.GDWeaveError as e:
+                release = None
+                self.log(f"⚠️ {str(e)}", "warning")
+            if installed and release and installed == release.version:
+                self.log(f"✅ GDWeave {installed} is already installed and up to date", "success")
+                return
+            version_text = release.version if release else ""
             
 
             while True:
                 response = self.modern_popup(
                     "Install GDWeave",
-                    f"GDWeave will be installed to your game folder:\n{game_folder}\n\n"
+                    f"GDWeave {version_text} will be installed to your game folder:\n{game_folder}\n\n"
                     "This will add:\n"
                     "winmm.dll to the game directory\n"
                     "GDWeave folder with core files\n\n"
@@ -822,208 +1014,20 @@ class WebFishingModManager:
                     continue
             
             try:
-
-                temp_folder = os.path.join(game_folder, "temp_gdweave")
-                os.makedirs(temp_folder, exist_ok=True)
-                
-
-                author = "GDWeave"
-                mod_name = "GDWeave"
-                gdweave_url = f"https://thunderstore.io/c/webfishing/p/NotNet/GDWeave/"
-                
                 self.log(f"\n=== Starting GDWeave Installation ===", "info")
                 self.log(f"Game Folder: {game_folder}", "info")
-                
-                session = requests.Session()
-                session.headers.update({
-                    "User-Agent": "WebFishing Mod Manager/1.0",
-                    "Accept": "application/json"
-                })
-
-                download_url = None
-                filename = f"{author}-{mod_name}.zip"
-                
 
+                cache_dir = os.path.join(os.path.dirname(self.config_path), 'cache', 'gdweave')
                 try:
-                    api_url = f"https://thunderstore.io/api/v1/package/{author}/{mod_name}/"
-                    response = session.get(api_url, timeout=15)
-                    if response.status_code == 200:
-                        package_data = response.json()
-                        versions = package_data.get('versions', [])
-                        if not versions and 'latest' in package_data:
-                            versions = [package_data['latest']]
-                        
-                        if versions:
-                            download_url = versions[0].get("download_url")
-                            filename = versions[0].get("filename", filename)
-                            self.log("✅ Found download URL via API", "success")
-                except Exception as e:
-                    self.log(f"⚠️ API attempt failed: {str(e)}", "warning")
-
-                if not download_url:
-                    try:
-                        page_response = session.get(gdweave_url, timeout=15)
-                        if page_response.status_code == 200:
-                            page_content = page_response.text
-                            
-
-                            patterns = [
-                                r'href="(https://[^"]*thunderstore[^"]*download[^"]*)"',
-                                r'"download_url":"([^"]*)"',
-                                r'data-download-url="([^"]*)"',
-                                r'/package/download/GDWeave/GDWeave/([^/"]+)',
-                            ]
-                            
-                            for pattern in patterns:
-                                matches = re.findall(pattern, page_content, re.IGNORECASE)
-                                if matches:
-                                    download_url = matches[0]
-                                    if isinstance(download_url, tuple):
-                                        download_url = matches[0][0]
-                                    
-                                    if not download_url.startswith('http'):
-                                        download_url = f"https://thunderstore.io{download_url}"
-                                    
-                                    self.log("✅ Found download URL via page scrape", "success")
-                                    break
-                    except Exception as e:
-                        self.log(f"⚠️ Page scrape failed: {str(e)}", "warning")
-
-                if not download_url:
-                    try:
-
-                        version = "1.0.0" 
-                        version_match = re.search(r'"version_number":"([^"]+)"', page_content)
-                        if version_match:
-                            version = version_match.group(1)
-                        
-                        download_url = f"https://thunderstore.io/package/download/GDWeave/GDWeave/{version}/"
-                        self.log("⚠️ Using fallback download URL", "warning")
-                    except:
-                        pass
-                
-                if not download_url:
-                    self.log("❌ Could not find GDWeave download URL", "error")
-                    messagebox.showerror(
-                        "Download Error",
-                        "Failed to find GDWeave download URL.\n"
-                        "Please check your internet connection or try again later.",
-                        parent=self.root
-                    )
-                    return
-                
-
-                zip_path = os.path.join(temp_folder, filename)
-                self.log(f"📥 Downloading GDWeave from: {download_url}", "info")
-                
-                try:
-                    with session.get(download_url, stream=True, timeout=30) as r:
-                        r.raise_for_status()
-                        total_size = int(r.headers.get('content-length', 0))
-                        downloaded_size = 0
-                        
-                        with open(zip_path, 'wb') as f:
-                            for chunk in r.iter_content(chunk_size=8192):
-                                if chunk:
-                                    f.write(chunk)
-                                    downloaded_size += len(chunk)
-                                    if total_size > 0 and int((downloaded_size / total_size) * 100) % 25 == 0:
-                                        self.log(f"    Progress: {int((downloaded_size / total_size) * 100)}%", "info")
-                    
-                    self.log(f"✅ Downloaded: {filename} ({downloaded_size} bytes)", "success")
-                    
-                except Exception as download_error:
-                    self.log(f"❌ Download failed: {str(download_error)}", "error")
-                    messagebox.showerror(
-                        "Download Failed",
-                        f"Failed to download GDWeave:\n{str(download_error)}",
-                        parent=self.root
-                    )
-                    return
-
-                try:
-                    with zipfile.ZipFile(zip_path, 'r') as test_zip:
-                        test_zip.testzip()
-                    self.log("✅ Zip file verified", "info")
-                except Exception as zip_error:
-                    self.log(f"❌ Invalid zip file: {str(zip_error)}", "error")
-                    try:
-                        os.remove(zip_path)
-                    except:
-                        pass
-                    return
-                
-
-                self.log("📦 Extracting GDWeave...", "info")
-                try:
-                    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                        zip_ref.extractall(temp_folder)
-                    
-                    winmm_src = None
-                    gdweave_src = None
-                    mods_src = None
-                    
-                    for root, dirs, files in os.walk(temp_folder):
-                        if "winmm.dll" in files:
-                            winmm_src = os.path.join(root, "winmm.dll")
-                        if "GDWeave" in dirs:
-                            gdweave_src = os.path.join(root, "GDWeave")
-                        if "mods" in dirs:
-                            mods_src = os.path.join(root, "mods")
-                        
-                        if winmm_src and gdweave_src:
-                            break
-                    
-                    if not winmm_src or not gdweave_src:
-                        self.log("❌ Could not find winmm.dll or GDWeave folder in download", "error")
-                        messagebox.showerror(
-                            "Installation Error",
-                            "The downloaded GDWeave package is missing required files.\n"
-                            "Please try again or contact the mod author.",
-                            parent=self.root
-                        )
+                    result = gdweave.install(game_folder, cache_dir, client=self.http, log=self.log,
+                                             keep=self.config.get("snapshot_keep", 5), bandwidth=self.bandwidth)
+                    if result.status == gdweave.STATUS_CURRENT:
                         return
-                    
-                    winmm_dest = os.path.join(game_folder, "winmm.dll")
-                    gdweave_dest = os.path.join(game_folder, "GDWeave")
-                    mods_dest = os.path.join(gdweave_dest, "mods")
-                    
-                    if os.path.exists(winmm_dest):
-                        backup_path = winmm_dest + ".bak"
-                        shutil.copy2(winmm_dest, backup_path)
-                        self.log(f"🔁 Backed up existing winmm.dll to {backup_path}", "info")
-                    
-                    if os.path.exists(gdweave_dest):
-                        backup_path = gdweave_dest + ".bak"
-                        shutil.copytree(gdweave_dest, backup_path)
-                        self.log(f"🔁 Backed up existing GDWeave folder to {backup_path}", "info")
-                        shutil.rmtree(gdweave_dest)
-                    
-                    shutil.copy2(winmm_src, winmm_dest)
-                    shutil.copytree(gdweave_src, gdweave_dest)
-                    
-                    if mods_src and os.path.exists(mods_src):
-
-                        if not os.path.exists(mods_dest):
-                            shutil.copytree(mods_src, mods_dest)
-                            self.log(f"✅ Copied mods folder from package to: {mods_dest}", "info")
-                        else:
-
-                            for item in os.listdir(mods_src):
-                                src_item = os.path.join(mods_src, item)
-                                dest_item = os.path.join(mods_dest, item)
-                                if not os.path.exists(dest_item):
-                                    if os.path.isdir(src_item):
-                                        shutil.copytree(src_item, dest_item)
-                                    else:
-                                        shutil.copy2(src_item, dest_item)
-                            self.log(f"✅ Merged mods folder content to: {mods_dest}", "info")
-                    else:
 
-                        if not os.path.exists(mods_dest):
-                            os.makedirs(mods_dest)
-                            self.log(f"📁 Created empty mods folder at: {mods_dest}", "info")
-                    
+                    winmm_dest = result.winmm_path
+                    gdweave_dest = result.gdweave_path
+                    mods_dest = result.mods_path
+
                     self.log("✅ Successfully installed GDWeave!", "success")
                     self.log(f"• winmm.dll installed to: {winmm_dest}", "info")
                     self.log(f"• GDWeave folder installed to: {gdweave_dest}", "info")
@@ -1054,6 +1058,14 @@ class WebFishingModManager:
                     if response == "Yes":
                         self.download_folder.set(gdweave_mods_folder)
                         
+                except gdweave.GDWeaveError as e:
+                    self.log(f"❌ {str(e)}", "error")
+                    messagebox.showerror(
+                        "Installation Error",
+                        f"Failed to install GDWeave:\n{str(e)}\n"
+                        "Please check your internet connection or try again later.",
+                        parent=self.root
+                    )
                 except Exception as e:
 
                     error_msg = f"Failed to install GDWeave:\n{str(e)}"
@@ -1079,10 +1091,6 @@ class WebFishingModManager:
                     else:
                         self.modern_popup("Installation Error", full_msg, popup_type="error", buttons=("OK",), parent=self.root)
                     self.log(f"Error details:\n{tb}", "error")
-                try:
-                    shutil.rmtree(temp_folder)
-                except Exception as e:
-                    self.log(f"⚠️ Could not clean up temp folder: {str(e)}", "warning")
             
             except Exception as e:
                 self.log(f"💥 Critical error during GDWeave installation: {str(e)}", "error")
@@ -1099,6 +1107,27 @@ class WebFishingModManager:
         
         console_card = ttk.LabelFrame(right_panel, text="Console Output", style='Card.TFrame')
         console_card.pack(fill=tk.BOTH, expand=True)
+
+        filter_frame = ttk.Frame(console_card)
+        filter_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+
+        self.log_level_vars = {}
+        for level in LogBuffer.LEVELS:
+            var = tk.BooleanVar(value=True)
+            self.log_level_vars[level] = var
+            ttk.Checkbutton(
+                filter_frame,
+                text=level.capitalize(),
+                variable=var,
+                command=self.apply_log_filter
+            ).pack(side=tk.LEFT, padx=(0, 5))
+
+        find_button = ttk.Button(filter_frame, text="Find", command=self.search_log, style='Secondary.TButton')
+        find_button.pack(side=tk.RIGHT)
+
+        self.log_search_entry = ttk.Entry(filter_frame, width=18)
+        self.log_search_entry.pack(side=tk.RIGHT, padx=(5, 5))
+        self.log_search_entry.bind("<Return>", lambda e: self.search_log())
         
         self.console = scrolledtext.ScrolledText(
             console_card, 
@@ -1111,8 +1140,56 @@ class WebFishingModManager:
             relief=tk.FLAT
         )
         self.console.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.console_entry_lines = deque()
+
+        self.console.tag_config("success", foreground=self.success_color)
+        self.console.tag_config("error", foreground=self.error_color)
+        self.console.tag_config("warning", foreground=self.warning_color)
+        self.console.tag_config("info", foreground=self.text_color)
+        self.console.tag_config("search_match", background=self.accent_color)
+        self.console.tag_raise("search_match")
+
         self.console.config(state=tk.DISABLED)
 
+    def apply_log_filter(self):
+        """Hide or show console lines by level without re-inserting any text"""
+        for level, var in self.log_level_vars.items():
+            self.console.tag_config(level, elide=not var.get())
+
+    def search_log(self):
+        """Highlight matches of the search term in the console and jump to the next one"""
+        term = self.log_search_entry.get().strip()
+        self.console.tag_remove("search_match", "1.0", tk.END)
+        if not term:
+            return
+
+        visible = {level for level, var in self.log_level_vars.items() if var.get()}
+        if not self.log_buffer.search(term, visible):
+            self.log_search_entry.configure(foreground=self.error_color)
+            return
+        self.log_search_entry.configure(foreground=self.text_color)
+
+        first_match = None
+        start = "1.0"
+        count = tk.IntVar()
+        while True:
+            pos = self.console.search(term, start, stopindex=tk.END, nocase=True, count=count)
+            if not pos or count.get() == 0:
+                break
+            end = f"{pos}+{count.get()}c"
+            self.console.tag_add("search_match", pos, end)
+            if first_match is None:
+                first_match = pos
+            start = end
+
+        # Cycle through matches on repeated searches
+        insert = self.console.index(tk.INSERT)
+        next_match = self.console.tag_nextrange("search_match", f"{insert}+1c")
+        target = next_match[0] if next_match else first_match
+        if target:
+            self.console.mark_set(tk.INSERT, target)
+            self.console.see(target)
+
     def search_mods(self):
         """Search specifically for WebFishing mods with proper filtering"""
         search_term = self.search_entry.get().strip().lower()
@@ -1176,7 +1253,7 @@ class WebFishingModManager:
                 "ordering": "-downloads" 
             }
             
-            response = requests.get(api_url, params=params, timeout=10)
+            response = self.http.get(api_url, kind=http_client.KIND_API, params=params)
             response.raise_for_status()
             
             mods_data = response.json()
@@ -1266,6 +1343,13 @@ class WebFishingModManager:
             self.log(f"Error displaying mod details: {str(e)}", "error")
             self.clear_mod_details()
 
+    def cache_mod_image(self, image_url, photo_img):
+        """Remember an icon, dropping the least recently shown beyond MAX_CACHED_ICONS"""
+        self.current_mod_images[image_url] = photo_img
+        self.current_mod_images.move_to_end(image_url)
+        while len(self.current_mod_images) > MAX_CACHED_ICONS:
+            self.current_mod_images.popitem(last=False)
+
     def load_mod_image(self, image_url):
         """Load and display the mod's icon image with better error handling"""
         if not image_url:
@@ -1274,6 +1358,7 @@ class WebFishingModManager:
             
 
         if image_url in self.current_mod_images:
+            self.current_mod_images.move_to_end(image_url)
             img = self.current_mod_images[image_url]
             self.mod_image_label.config(image=img, text='')
             self.mod_image_label.image = img 
@@ -1283,8 +1368,7 @@ class WebFishingModManager:
             try:
                 self.root.after(0, lambda: self.mod_image_label.config(text="Loading...", image=''))
                 
-                response = requests.get(image_url, timeout=10, 
-                                    headers={'User-Agent': 'WebFishing Mod Manager/1.0'})
+                response = self.http.get(image_url, kind=http_client.KIND_ICON)
                 
                 if response.status_code == 200:
                     image_data = response.content
@@ -1293,7 +1377,7 @@ class WebFishingModManager:
                     img.thumbnail((120, 120), Image.Resampling.LANCZOS)
                     photo_img = ImageTk.PhotoImage(img)
                     
-                    self.current_mod_images[image_url] = photo_img
+                    self.cache_mod_image(image_url, photo_img)
                     
                     self.root.after(0, lambda: self.update_mod_image(photo_img))
                 else:
@@ -1353,14 +1437,6 @@ class WebFishingModManager:
         elif "requirements" in mod_data:
             requirements = [str(req) for req in mod_data.get('requirements', [])]
 
-        current_mods = set()
-        for item_id in self.url_tree.get_children():
-            values = self.url_tree.item(item_id)["values"]
-            url = values[0]
-            mod_info = self.extract_mod_info_from_url(url)
-            if mod_info and mod_info.get("author") and mod_info.get("name"):
-                current_mods.add(f"{mod_info['author']}-{mod_info['name']}")
-
         missing_deps = []
         for dep in requirements:
             dep_base = dep.split('-')
@@ -1371,19 +1447,14 @@ class WebFishingModManager:
                 if (author == "gdweave" and name == "gdweave") or (author == "notnet" and name == "gdweave"):
                     continue
                 dep_id = f"{dep_base[0]}-{dep_base[1]}"
-                if dep_id not in current_mods and dep_id not in missing_deps:
+                if dep_id not in self.queue and dep_id not in missing_deps:
                     missing_deps.append(dep_id)
 
-        already_in_list = False
-        for item_id in self.url_tree.get_children():
-            if self.url_tree.item(item_id)["values"][0] == mod_url:
-                already_in_list = True
-                break
-        if not already_in_list:
-            mod_info = self.extract_mod_info_from_url(mod_url)
-            if mod_info:
-                self.url_tree.insert("", tk.END, values=(mod_url, mod_info["name"]))
-                self.log(f"Added WebFishing mod: {mod_info['name']} ({mod_url})", "success")
+        item, added = self.queue.add(mod_url)
+        if added:
+            self.log(f"Added WebFishing mod: {item.name} ({mod_url})", "success")
+        elif item:
+            self.log(f"Mod already in list: {mod_url}", "warning")
 
         if missing_deps:
             dep_list_str = "\n".join(missing_deps)
@@ -1394,43 +1465,15 @@ class WebFishingModManager:
                 buttons=("Add All", "Cancel")
             )
             if result == "Add All":
+                listed = {f"{mod.get('owner')}-{mod.get('name')}": mod for mod in self.current_mods}
                 for dep_id in missing_deps:
-                    dep_url = None
-                    for mod in self.current_mods:
-                        author = mod.get('owner')
-                        name = mod.get('name')
-                        if f"{author}-{name}" == dep_id:
-                            dep_url = f"https://thunderstore.io/c/webfishing/p/{author}/{name}/"
-                            break
-                    if dep_url:
-                        already = False
-                        for item_id in self.url_tree.get_children():
-                            if self.url_tree.item(item_id)["values"][0] == dep_url:
-                                already = True
-                                break
-                        if not already:
-                            self.url_tree.insert("", tk.END, values=(dep_url, dep_id))
+                    mod = listed.get(dep_id)
+                    if mod:
+                        dep_url = f"https://thunderstore.io/c/webfishing/p/{mod.get('owner')}/{mod.get('name')}/"
+                        if self.queue.add(dep_url)[1]:
                             self.log(f"Added dependency: {dep_id}", "info")
                     else:
                         self.log(f"Dependency not found in mod browser: {dep_id}", "warning")
-        """Add the currently selected mod to the download list"""
-        selected = self.mod_tree.selection()
-        if not selected:
-            messagebox.showinfo("No Selection", "Please select a mod first.")
-            return
-        
-        item = self.mod_tree.item(selected[0])
-        mod_url = item['tags'][0]
-        
-        for item_id in self.url_tree.get_children():
-            if self.url_tree.item(item_id)["values"][0] == mod_url:
-                self.log(f"Mod already in list: {mod_url}", "warning")
-                return
-        
-        mod_info = self.extract_mod_info_from_url(mod_url)
-        if mod_info:
-            self.url_tree.insert("", tk.END, values=(mod_url, mod_info["name"]))
-            self.log(f"Added WebFishing mod: {mod_info['name']} ({mod_url})", "success")
 
     def view_mod_on_web(self):
         """Open the selected mod in web browser"""
@@ -1449,46 +1492,18 @@ class WebFishingModManager:
     
     def extract_mod_info_from_url(self, url):
         """Extract WebFishing mod info from URL"""
-        parsed_url = urlparse(url)
-        
-        if "thunderstore.io" not in parsed_url.netloc:
-            return None
-            
-        path_parts = [p for p in parsed_url.path.split("/") if p]
-        
-        if len(path_parts) >= 5 and path_parts[0] == "c" and path_parts[1] == "webfishing" and path_parts[2] == "p":
-            return {
-                "community": "webfishing",
-                "author": path_parts[3],
-                "name": path_parts[4],
-                "full_name": f"{path_parts[3]}-{path_parts[4]}"
-            }
-        
-        return None
+        return extract_mod_info_from_url(url)
     
     def add_url(self):
         """Add a WebFishing mod URL to the download list"""
         url = self.url_entry.get().strip()
         if not url:
             return
-            
-        for item_id in self.url_tree.get_children():
-            if self.url_tree.item(item_id)["values"][0] == url:
-                self.log(f"Mod URL already in list: {url}", "warning")
-                self.url_entry.delete(0, tk.END)
-                return
-        
-        mod_info = self.extract_mod_info_from_url(url)
-        if not mod_info:
-            messagebox.showerror("Invalid URL", 
-                "Please enter a valid WebFishing Thunderstore mod URL.\n"
-                "Example: https://thunderstore.io/c/webfishing/p/TeamLure/LureRefreshed/")
+        if len(url.split()) > 1:
+            # Several URLs pasted into the entry
+            self.url_entry.delete(0, tk.END)
+            self.start_ingest(lambda: ingest.parse_text(url))
             return
-            
-        self.url_tree.insert("", tk.END, values=(url, mod_info["name"]))
-        self.log(f"Added WebFishing mod: {mod_info['name']} ({url})", "success")
-        
-        self.url_entry.delete(0, tk.END)
         
         mod_info = self.extract_mod_info_from_url(url)
         if not mod_info:
@@ -1496,11 +1511,87 @@ class WebFishingModManager:
                 "Please enter a valid WebFishing Thunderstore mod URL.\n"
                 "Example: https://thunderstore.io/c/webfishing/p/TeamLure/LureRefreshed/")
             return
+
+        _, added = self.queue.add(url, mod_info=mod_info)
+        if not added:
+            self.log(f"Mod URL already in list: {url}", "warning")
+            self.url_entry.delete(0, tk.END)
+            return
             
-        self.url_tree.insert("", tk.END, values=(url, mod_info["name"]))
         self.log(f"Added WebFishing mod: {mod_info['name']} ({url})", "success")
         
         self.url_entry.delete(0, tk.END)
+
+    def bulk_add(self):
+        """Add many mods at once from pasted text, a file or an r2modman profile"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Bulk Add Mods")
+        dialog.configure(bg=self.bg_color)
+        dialog.transient(self.root)
+        dialog.geometry("600x420")
+
+        ttk.Label(
+            dialog,
+            text="Paste mod URLs or Author-ModName entries (one or more per line), or an r2modman profile code:"
+        ).pack(anchor="w", padx=10, pady=(10, 5))
+        text = scrolledtext.ScrolledText(dialog, height=16, bg=self.card_bg, fg=self.text_color,
+                                         insertbackground=self.text_color, font=self.console_font)
+        text.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.pack(fill=tk.X, padx=10, pady=10)
+
+        def from_file():
+            path = filedialog.askopenfilename(
+                title="Import Mod List",
+                filetypes=[("Mod lists", "*.txt *.json *.r2z"), ("All Files", "*.*")],
+                parent=dialog
+            )
+            if path:
+                dialog.destroy()
+                self.start_ingest(lambda: ingest.parse_file(path))
+
+        def add():
+            pasted = text.get("1.0", tk.END)
+            dialog.destroy()
+            if pasted.strip():
+                self.start_ingest(lambda: ingest.parse_input(pasted, client=self.http))
+
+        ttk.Button(btn_frame, text="From File...", command=from_file, style='Secondary.TButton').pack(side=tk.LEFT)
+        ttk.Button(btn_frame, text="Cancel", command=dialog.destroy, style='Secondary.TButton').pack(side=tk.RIGHT)
+        ttk.Button(btn_frame, text="Add", command=add, style='Accent.TButton').pack(side=tk.RIGHT, padx=(0, 5))
+        text.focus_set()
+
+    def start_ingest(self, parse):
+        """Parse and validate off the UI thread, then insert the result in one pass"""
+        listing = list(self.current_mods)
+
+        def work():
+            try:
+                result = parse()
+                found, missing = ingest.validate(result.mods, listing=listing, client=self.http)
+            except ingest.IngestError as e:
+                self.log(f"❌ {str(e)}", "error")
+                return
+            self.root.after(0, lambda: self.insert_ingested(result, found, missing))
+
+        self.log("📋 Checking the pasted mods...", "info")
+        threading.Thread(target=work, daemon=True).start()
+
+    def insert_ingested(self, result, found, missing):
+        """Insert validated mods that are not already listed, all in one UI update"""
+        added = len(self.queue.add_many(result.mods[full_name] for full_name in found))
+
+        self.log(f"✅ Added {added} WebFishing mods", "success")
+        already = len(found) - added
+        if already or result.duplicates:
+            self.log(f"⏩ {already} already in the list, {result.duplicates} duplicates in the input", "warning")
+        if missing:
+            self.log(f"❌ Not found on Thunderstore: {', '.join(missing)}", "error")
+        if result.invalid:
+            self.log(f"❌ Not WebFishing mod URLs: {', '.join(result.invalid)}", "error")
+        if result.skipped:
+            self.log("⚠️ GDWeave is installed with the Install GDWeave button - skipped", "warning")
     
     def remove_selected(self):
         selected = self.url_tree.selection()
@@ -1508,29 +1599,89 @@ class WebFishingModManager:
             return
             
         for item_id in selected:
-            url = self.url_tree.item(item_id)["values"][0]
-            self.url_tree.delete(item_id)
-            self.log(f"Removed mod: {url}", "info")
+            item = self.queue.remove(item_id)
+            if item:
+                self.log(f"Removed mod: {item.url}", "info")
     
     def clear_list(self):
-        if not self.url_tree.get_children():
+        if not len(self.queue):
             return
             
         if messagebox.askyesno("Clear List", "Are you sure you want to clear all mods from the list?"):
-            for item_id in self.url_tree.get_children():
-                self.url_tree.delete(item_id)
+            self.queue.clear()
             self.log("Cleared mod list", "info")
+
+    def on_queue_change(self, change, item, before):
+        """Mirror one queue change in url_tree (rows are keyed by full_name) and schedule a save"""
+        tree = self.url_tree
+        if change == CHANGE_ADD:
+            tree.insert("", tk.END, iid=item.full_name, values=(item.url, item.name, self.priority_label(item)))
+        elif change == CHANGE_REMOVE:
+            tree.delete(item.full_name)
+        elif change == CHANGE_MOVE:
+            tree.detach(item.full_name)
+            tree.move(item.full_name, "", tree.index(before.full_name) if before else tk.END)
+        elif change == CHANGE_UPDATE:
+            tree.set(item.full_name, "priority", self.priority_label(item))
+        elif change == CHANGE_CLEAR:
+            tree.delete(*tree.get_children())
+
+        if not self.queue_save_pending:
+            self.queue_save_pending = True
+            self.root.after(500, self.save_queue)
+
+    def priority_label(self, item):
+        return {1: "first", -1: "last"}.get(item.priority, "" if item.priority == 0 else str(item.priority))
+
+    def save_queue(self):
+        self.queue_save_pending = False
+        try:
+            self.queue.save()
+        except OSError as e:
+            self.log(f"⚠️ Could not save the mod list: {str(e)}", "warning")
+
+    def show_queue_menu(self, event):
+        row = self.url_tree.identify_row(event.y)
+        if not row:
+            return
+        if row not in self.url_tree.selection():
+            self.url_tree.selection_set(row)
+        self.queue_menu.tk_popup(event.x_root, event.y_root)
+
+    def move_selected(self, move, upwards):
+        """Apply a queue move to each selected row, nearest to the destination first"""
+        selected = list(self.url_tree.selection())
+        selected.sort(key=self.url_tree.index, reverse=not upwards)
+        for full_name in selected:
+            move(full_name)
+        self.url_tree.selection_set(selected)
+        return "break"
+
+    def set_selected_priority(self, priority):
+        for full_name in self.url_tree.selection():
+            self.queue.set_priority(full_name, priority)
         
     def log(self, message, msg_type="info"):
         """Add message to console with type-based coloring"""
+        self.log_buffer.append(message, msg_type)
+        if threading.current_thread() is threading.main_thread():
+            self._append_console(message, msg_type)
+        else:
+            self.root.after(0, self._append_console, message, msg_type)
+
+    def _append_console(self, message, msg_type):
+        """Append one entry to the console widget, dropping the oldest entries past the buffer size"""
         self.console.config(state=tk.NORMAL)
-        
-        self.console.tag_config("success", foreground=self.success_color)
-        self.console.tag_config("error", foreground=self.error_color)
-        self.console.tag_config("warning", foreground=self.warning_color)
-        self.console.tag_config("info", foreground=self.text_color)
-        
+
+        if msg_type not in LogBuffer.LEVELS:
+            msg_type = "info"
         self.console.insert(tk.END, message + "\n", msg_type)
+
+        self.console_entry_lines.append(message.count("\n") + 1)
+        while len(self.console_entry_lines) > self.log_buffer.max_lines:
+            oldest_lines = self.console_entry_lines.popleft()
+            self.console.delete("1.0", f"{oldest_lines + 1}.0")
+
         self.console.see(tk.END)
         self.console.config(state=tk.DISABLED)
         
@@ -1540,10 +1691,8 @@ class WebFishingModManager:
         if self.is_downloading:
             return
             
-        mod_urls = []
-        for item_id in self.url_tree.get_children():
-            url = self.url_tree.item(item_id)["values"][0]
-            mod_urls.append(url)
+        mod_urls = self.queue.download_order()
+        priorities = {item.url: item.priority for item in self.queue if item.priority}
             
         if not mod_urls:
             messagebox.showinfo("No Mods", "Please add some WebFishing mods to download first.")
@@ -1556,222 +1705,290 @@ class WebFishingModManager:
             return
             
         os.makedirs(download_folder, exist_ok=True)
-        
+        self.start_batch(self.download_mods, mod_urls, download_folder, priorities)
+
+    def start_batch(self, target, *args):
+        """Run target(*args) on the download thread with fresh progress state"""
         self.is_downloading = True
         self.download_button.config(state=tk.DISABLED)
+        self.control = BatchControl()
+        self.pause_button.config(text="⏸️ Pause", state=tk.NORMAL)
+        self.cancel_button.config(state=tk.NORMAL)
         self.progress["value"] = 0
+        events.drain(self.progress_queue)
+        self.progress_tracker = events.ProgressTracker()
+        self.progress_status_label.config(text="")
         
         self.download_thread = threading.Thread(
-            target=self.download_mods,
-            args=(mod_urls, download_folder)
+            target=target,
+            args=args
         )
         self.download_thread.daemon = True
         self.download_thread.start()
         
         self.root.after(100, self.check_download_thread)
+
+    def apply_preset(self):
+        """Bring the mods folder in line with a preset, downloading only what differs"""
+        if self.is_downloading:
+            return
+        preset_file = filedialog.askopenfilename(
+            title="Select Preset to Apply",
+            filetypes=[("JSON Preset", "*.json"), ("All Files", "*.*")],
+            initialdir=self.download_folder.get()
+        )
+        if not preset_file:
+            return
+        try:
+            mod_urls = load_preset(preset_file)
+            locked = lockfile.load_lockfile(preset_file)
+        except PresetError as e:
+            messagebox.showerror("Invalid Preset", str(e))
+            self.log(str(e), "error")
+            return
+
+        download_folder = self.download_folder.get()
+        os.makedirs(download_folder, exist_ok=True)
+        self.log(f"\n🔎 Comparing {os.path.basename(preset_file)} with {download_folder}...", "info")
+
+        def plan():
+            # Not self.control: that may still be the last batch's, cancelled; start_batch makes the next one
+            engine = self.make_engine(download_folder, control=BatchControl())
+            try:
+                result = delta.plan_delta(engine, mod_urls, locked, remove_extras=True)
+            except Exception as e:
+                self.log(f"❌ Could not compare the preset: {str(e)}", "error")
+                return
+            self.root.after(0, lambda: self.confirm_apply(result, download_folder))
+
+        threading.Thread(target=plan, daemon=True).start()
+
+    def make_engine(self, download_folder, control=None):
+        """ModEngine for download_folder with the settings from config.json; control defaults to the batch's"""
+        return ModEngine(download_folder, log=self.log, bus=self.event_bus,
+                         jobs=self.config.get("download_jobs", 1),
+                         retry_passes=self.config.get("retry_passes", 1),
+                         snapshot_keep=self.config.get("snapshot_keep", 5),
+                         store=self.file_store(download_folder),
+                         bandwidth=self.bandwidth, control=control or self.control, mirror_set=self.mirror_set,
+                         artifact_cache=self.artifact_cache,
+                         schedule=self.config.get("download_schedule", scheduler.SCHEDULE_SMALL_FIRST))
+
+    def load_mirrors(self):
+        """MirrorSet for the "mirrors" list in config.json, or None when there are none"""
+        urls = mirrors.parse_mirrors(self.config.get("mirrors", []))
+        if not urls:
+            return None
+        cache_path = os.path.join(os.path.dirname(self.config_path), 'cache', mirrors.MIRRORS_CACHE_FILE)
+        return mirrors.MirrorSet(urls, cache_path, client=self.http, log=self.log)
+
+    def load_artifact_cache(self):
+        """ArtifactCache for "artifact_cache" in config.json (a directory, URL or s3://...), or None"""
+        location = self.config.get("artifact_cache") or os.getenv("WEBLOADER_ARTIFACT_CACHE")
+        if not location:
+            return None
+        return artifacts.ArtifactCache(artifacts.open_backend(location, self.http),
+                                       publish=self.config.get("artifact_cache_publish", True), log=self.log)
+
+    def edit_mirrors(self):
+        """Edit the archive mirror list and show what is known about each source"""
+        if self.is_downloading:
+            messagebox.showinfo("Mirrors", "Mirrors can be changed once the download has finished.")
+            return
+        current = ", ".join(mirrors.parse_mirrors(self.config.get("mirrors", [])))
+        text = simpledialog.askstring(
+            "Archive Mirrors",
+            "Mirror or caching proxy base URLs, separated by commas\n"
+            "(e.g. http://192.168.1.20:8080). Leave empty to download from Thunderstore only.",
+            initialvalue=current, parent=self.root
+        )
+        if text is None:
+            return
+        self.config["mirrors"] = mirrors.parse_mirrors(text)
+        self.save_config(self.config)
+        self.mirror_set = self.load_mirrors()
+        if self.mirror_set is None:
+            self.log("🪞 No mirrors; archives come from Thunderstore", "info")
+            return
+        for source in self.mirror_set.sources:
+            expected = self.mirror_set.stats[source].expected_seconds()
+            measured = f"~{expected:.1f}s per 2 MB" if expected is not None else "not measured yet"
+            self.log(f"🪞 {source}: {measured}", "info")
+
+    def config_rate(self, key):
+        """A bandwidth limit from config.json in bytes/s; 0 (unlimited) if unset or unreadable"""
+        try:
+            return throttle.parse_rate(self.config.get(key, 0))
+        except ValueError:
+            return 0
+
+    def apply_speed_limits(self):
+        """Apply the speed boxes to running and future downloads and remember them"""
+        try:
+            limit = throttle.parse_rate(self.limit_var.get())
+            per_download = throttle.parse_rate(self.per_download_var.get())
+        except ValueError as e:
+            self.log(f"⚠️ {str(e)}", "warning")
+            self.limit_var.set(throttle.format_rate(self.bandwidth.limit))
+            self.per_download_var.set(throttle.format_rate(self.bandwidth.per_download))
+            return
+        if (limit, per_download) == (self.bandwidth.limit, self.bandwidth.per_download):
+            return
+        self.bandwidth.set_limits(limit, per_download)
+        self.limit_var.set(throttle.format_rate(limit))
+        self.per_download_var.set(throttle.format_rate(per_download))
+        self.config["bandwidth_limit"] = limit
+        self.config["per_download_limit"] = per_download
+        self.save_config(self.config)
+        self.log(f"🚦 Bandwidth limit: {self.bandwidth.describe()}", "info")
+
+    def confirm_apply(self, plan, download_folder):
+        """Show the delta and run it if confirmed; extras are only removed when asked"""
+        self.log(plan.describe(), "info")
+        if plan.empty:
+            self.log("✅ The mods folder already matches the preset", "success")
+            return
+        known, unknown = plan.estimated_bytes
+        message = (f"{len(plan.install)} to install, {len(plan.update)} to update, "
+                   f"{len(plan.keep)} unchanged (about {known / 1048576:.1f} MB"
+                   f"{f' + {unknown} of unknown size' if unknown else ''}).")
+        if plan.remove:
+            answer = messagebox.askyesnocancel(
+                "Apply Preset",
+                f"{message}\n\n{len(plan.remove)} installed mods are not in the preset. Remove them?\n"
+                "(They are kept as snapshots.)"
+            )
+            if answer is None:
+                return
+            if not answer:
+                plan.remove = []
+        elif not messagebox.askokcancel("Apply Preset", message):
+            return
+        self.start_batch(self.run_apply, plan, download_folder)
+
+    def run_apply(self, plan, download_folder):
+        try:
+            batch = delta.apply_delta(self.make_engine(download_folder), plan)
+            if batch is not None:
+                self.log(f"\n✅ Preset applied: {batch.successful} installed, {batch.failed} failed, "
+                         f"{len(plan.remove)} removed", "success" if not batch.failed else "warning")
+        except Exception as e:
+            import traceback
+            self.log(f"\n💥 Critical error while applying the preset: {str(e)}", "error")
+            self.log(f"Error details:\n{traceback.format_exc()}", "error")
         
     def check_download_thread(self):
         """Monitor the download thread"""
+        self.process_progress_events()
         if self.download_thread and self.download_thread.is_alive():
-            self.root.after(100, self.check_download_thread)
+            self.root.after(self.PROGRESS_FRAME_MS, self.check_download_thread)
         else:
             self.download_button.config(state=tk.NORMAL)
+            self.pause_button.config(text="⏸️ Pause", state=tk.DISABLED)
+            self.cancel_button.config(state=tk.DISABLED)
             self.is_downloading = False
             self.progress["value"] = 100
-            self.log("\nDownload process completed!", "success")
+            if self.control.cancelled:
+                self.log("\nDownload cancelled; unfinished mods were cleaned up.", "warning")
+            else:
+                self.log("\nDownload process completed!", "success")
+
+    def toggle_pause(self):
+        """Pause the running batch at its next checkpoint, or resume it"""
+        if not self.is_downloading or self.control.cancelled:
+            return
+        if self.control.paused:
+            self.control.resume()
+            self.pause_button.config(text="⏸️ Pause")
+            self.log("▶️ Resumed", "info")
+        else:
+            self.control.pause()
+            self.pause_button.config(text="▶️ Resume")
+            self.log("⏸️ Paused; downloads will continue where they stopped", "info")
+
+    def cancel_batch(self, mod=None):
+        """Cancel the running batch, or one mod of it; partial files are removed"""
+        if not self.is_downloading:
+            return
+        self.control.cancel(mod)
+        if mod is None:
+            self.pause_button.config(state=tk.DISABLED)
+            self.cancel_button.config(state=tk.DISABLED)
+            self.log("⏹️ Cancelling...", "warning")
+        else:
+            self.log(f"⏹️ Cancelling {mod}...", "warning")
+
+    def on_close(self):
+        """Cancel a running batch and give it a moment to clean up before closing"""
+        if self.is_downloading and self.download_thread and self.download_thread.is_alive():
+            if not messagebox.askyesno("Download Running", "A download is still running. Cancel it and quit?"):
+                return
+            self.control.cancel()
+            self.download_thread.join(timeout=5)
+        if self.queue_save_pending:
+            self.save_queue()
+        self.root.destroy()
+
+    def process_progress_events(self):
+        """Apply queued worker events and redraw the progress widgets once per frame"""
+        pending = events.drain(self.progress_queue)
+        if not pending:
+            return
+        tracker = self.progress_tracker
+        for event in pending:
+            tracker.apply(event)
+
+        self.progress["value"] = tracker.overall_fraction * 100
+
+        for mod in list(self.transfer_bars):
+            if mod not in tracker.active:
+                row, _, _ = self.transfer_bars.pop(mod)
+                row.destroy()
+        for mod, state in tracker.active.items():
+            if mod not in self.transfer_bars:
+                row = ttk.Frame(self.transfer_frame)
+                row.pack(fill=tk.X, pady=(2, 0))
+                label = ttk.Label(row, width=28, anchor="w")
+                label.pack(side=tk.LEFT)
+                bar = ttk.Progressbar(row, orient="horizontal", mode="determinate",
+                                      style='Horizontal.TProgressbar')
+                bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+                ttk.Button(row, text="✕", width=2, style='Secondary.TButton',
+                           command=lambda mod=mod: self.cancel_batch(mod)).pack(side=tk.LEFT, padx=(5, 0))
+                self.transfer_bars[mod] = (row, label, bar)
+            _, label, bar = self.transfer_bars[mod]
+            label.config(text=f"{mod[:20]} · {state.phase}")
+            bar["value"] = state.fraction * 100
+
+        rate = tracker.throughput()
+        self.progress_status_label.config(
+            text=f"{tracker.finished_mods}/{tracker.total_mods} mods · "
+                 f"{rate / (1024 * 1024):.2f} MB/s · ETA {events.format_eta(tracker.eta())}"
+        )
         
-    def download_mods(self, mod_urls, download_folder):
+    def download_mods(self, mod_urls, download_folder, priorities=None):
         """Download WebFishing mods"""
         try:
             self.log(f"\n=== Starting WebFishing Mod Download ===", "info")
             self.log(f"Download Folder: {download_folder}", "info")
             self.log(f"Mods to download: {len(mod_urls)}", "info")
             
-            has_gdweave = any("gdweave" in url.lower() for url in mod_urls)
+            has_gdweave = any(is_gdweave_url(url) for url in mod_urls)
             
             if has_gdweave:
-                mod_urls = [url for url in mod_urls if "gdweave" not in url.lower()]
+                mod_urls = [url for url in mod_urls if not is_gdweave_url(url)]
                 self.log("⚠️ GDWeave detected - it will be handled separately", "warning")
                 self.install_gdweave() 
             
-            session = requests.Session()
-            session.headers.update({
-                "User-Agent": "WebFishing Mod Manager/1.0",
-                "Accept": "application/json"
-            })
-            
-            successful = 0
-            failed = 0
-            skipped = 0
-            downloaded_mods = set()
-            
-            temp_folder = os.path.join(download_folder, "temp_extract")
-            os.makedirs(temp_folder, exist_ok=True)
-            
-            for index, mod_url in enumerate(mod_urls, 1):
-                self.progress["value"] = (index / len(mod_urls)) * 100
-                
-                mod_info = self.extract_mod_info_from_url(mod_url)
-                if not mod_info:
-                    self.log(f"\n[{index}/{len(mod_urls)}] ❌ Invalid WebFishing mod URL: {mod_url}", "error")
-                    failed += 1
-                    continue
-                
-                self.log(f"\n[{index}/{len(mod_urls)}] 🔍 Processing: {mod_info['name']}", "info")
-                
-                try:
-                    mod_folder = os.path.join(download_folder, mod_info["full_name"])
-                    if os.path.exists(mod_folder):
-                        self.log(f"  ⏩ Already installed: {mod_info['name']}", "warning")
-                        skipped += 1
-                        continue
-                    
-                    api_url = f"https://thunderstore.io/api/v1/package/{mod_info['author']}/{mod_info['name']}/"
-                    download_url = None
-                    filename = f"{mod_info['full_name']}.zip"
-                    
-                    try:
-                        response = session.get(api_url, timeout=15)
-                        if response.status_code == 200:
-                            package_data = response.json()
-                            versions = package_data.get('versions', [])
-                            if not versions and 'latest' in package_data:
-                                versions = [package_data['latest']]
-                            
-                            if versions:
-                                download_url = versions[0].get("download_url")
-                                filename = versions[0].get("filename", filename)
-                    except Exception as e:
-                        self.log(f"  API attempt failed: {str(e)}", "info")
-                    
-                    if not download_url:
-                        download_url = self.get_download_url_from_page(session, mod_url, mod_info)
-                    
-                    if not download_url:
-                        self.log(f"  ❌ No download URL found for WebFishing mod", "error")
-                        failed += 1
-                        continue
-                    
-                    self.log(f"  📥 Downloading from: {download_url}", "info")
-                    zip_path = os.path.join(temp_folder, filename)
-                    
-                    try:
-                        with session.get(download_url, stream=True, timeout=30) as r:
-                            r.raise_for_status()
-                            total_size = int(r.headers.get('content-length', 0))
-                            downloaded_size = 0
-                            
-                            with open(zip_path, 'wb') as f:
-                                for chunk in r.iter_content(chunk_size=8192):
-                                    if chunk:
-                                        f.write(chunk)
-                                        downloaded_size += len(chunk)
-                                        if total_size > 0 and int((downloaded_size / total_size) * 100) % 25 == 0:
-                                            self.log(f"    Progress: {int((downloaded_size / total_size) * 100)}%", "info")
-                        
-                        self.log(f"  ✅ Downloaded: {filename} ({downloaded_size} bytes)", "success")
-                        
-                    except Exception as download_error:
-                        self.log(f"  ❌ Download failed: {str(download_error)}", "error")
-                        failed += 1
-                        continue
-                    
-                    try:
-                        with zipfile.ZipFile(zip_path, 'r') as test_zip:
-                            test_zip.testzip()
-                        self.log(f"  ✅ Zip file verified", "info")
-                    except Exception as zip_error:
-                        self.log(f"  ❌ Invalid zip file: {str(zip_error)}", "error")
-                        try:
-                            os.remove(zip_path)
-                        except:
-                            pass
-                        failed += 1
-                        continue
-                    
-                    self.log(f"  📦 Extracting {filename}...", "info")
-                    extract_path = os.path.join(temp_folder, f"extract_{mod_info['full_name']}")
-                    os.makedirs(extract_path, exist_ok=True)
-                    
-                    try:
-                        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                            zip_ref.extractall(extract_path)
-                    except Exception as extract_error:
-                        self.log(f"  ❌ Extraction failed: {str(extract_error)}", "error")
-                        failed += 1
-                        continue
-                    
-                    mod_source_folder = self.find_mod_folder(extract_path)
-                    
-                    if not mod_source_folder:
-                        self.log(f"  ❌ No mod folder found with .dll, .pck, or .json files", "error")
-                        failed += 1
-                        continue
-                    
-                    actual_mod_folder_name = os.path.basename(mod_source_folder)
-                    final_mod_folder = os.path.join(download_folder, actual_mod_folder_name)
-                    
-                    try:
-                        os.makedirs(final_mod_folder, exist_ok=True)
-                        
-                        for item in os.listdir(mod_source_folder):
-                            source_item = os.path.join(mod_source_folder, item)
-                            dest_item = os.path.join(final_mod_folder, item)
-                            
-                            if os.path.isdir(source_item):
-                                shutil.copytree(source_item, dest_item, dirs_exist_ok=True)
-                            else:
-                                shutil.copy2(source_item, dest_item)
-                        
-                        self.log(f"  ✅ Installed WebFishing mod '{actual_mod_folder_name}' to: {final_mod_folder}", "success")
-                        successful += 1
-                        downloaded_mods.add(actual_mod_folder_name)
-                        
-                    except Exception as install_error:
-                        self.log(f"  ❌ Installation failed: {str(install_error)}", "error")
-                        failed += 1
-                        continue
-                    
-                    try:
-                        if os.path.exists(zip_path):
-                            os.remove(zip_path)
-                        if os.path.exists(extract_path):
-                            shutil.rmtree(extract_path)
-                    except Exception as clean_error:
-                        self.log(f"  ⚠️ Cleanup failed: {str(clean_error)}", "warning")
-                    
-                    time.sleep(1)
-                    
-                except Exception as e:
-                    import traceback
-                    self.log(f"  ❌ Error processing WebFishing mod {mod_info['name']}: {str(e)}", "error")
-                    self.log(f"  Error details:\n{traceback.format_exc()}", "error")
-                    failed += 1
-            
-            try:
-                if os.path.exists(temp_folder):
-                    shutil.rmtree(temp_folder)
-            except Exception as e:
-                self.log(f"  ⚠️ Could not clean up temp folder: {str(e)}", "warning")
-            
-            summary = {
-                "successful_downloads": successful,
-                "failed_downloads": failed,
-                "skipped_downloads": skipped,
-                "downloaded_mods": list(downloaded_mods),
-                "download_folder": download_folder,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            self.save_preset_auto(download_folder, downloaded_mods)
-            
-            try:
-                summary_file = os.path.join(download_folder, "download_summary.json")
-                with open(summary_file, "w") as f:
-                    json.dump(summary, f, indent=2)
-                self.log(f"\n📋 Summary saved to: {summary_file}", "info")
-            except Exception as e:
-                self.log(f"\n⚠️ Could not save summary: {str(e)}", "warning")
+            engine = self.make_engine(download_folder)
+            lock = self.loaded_lock
+            if lock and set(mod_urls) == {url for url in lock.mod_urls if not is_gdweave_url(url)}:
+                self.log(f"🔒 Installing pinned versions from preset '{lock.name}'", "info")
+                batch = engine.run_locked(lock)
+            else:
+                batch = engine.run(mod_urls, priorities)
+            successful, failed, skipped = batch.successful, batch.failed, batch.skipped
+            downloaded_mods = batch.downloaded_mods
             
             self.log("\n" + "="*40, "info")
             self.log("=== DOWNLOAD SUMMARY ===", "info")
@@ -1786,6 +2003,12 @@ class WebFishingModManager:
                 
             self.log(f"📁 Total unique mods in folder: {len(downloaded_mods)}", "info")
             self.log(f"📂 Installation directory: {Path(download_folder).absolute()}", "info")
+            connections = [
+                f"{group}: {stats['requests']} requests over {stats['connections']} connections"
+                for group, stats in batch.http_stats.items() if stats["requests"]
+            ]
+            if connections:
+                self.log(f"🔌 {', '.join(connections)}", "info")
             
             if successful > 0:
                 self.log(f"\n🎉 WebFishing mod download completed successfully!", "success")
@@ -1799,56 +2022,53 @@ class WebFishingModManager:
             self.log(f"\n💥 Critical error during download process: {str(e)}", "error")
             self.log(f"Error details:\n{traceback.format_exc()}", "error")
 
-    def find_mod_folder(self, root_path):
-        """Find the innermost folder containing mod files"""
-        mod_folders = []
-        for root, dirs, files in os.walk(root_path):
-            if any(file.endswith(('.dll', '.pck', '.json')) for file in files):
-                mod_folders.append(root)
-        
-        if mod_folders:
-            mod_folders.sort(key=lambda x: -len(x.split(os.sep)))
-            return mod_folders[0]
-        return None
-
-    def get_download_url_from_page(self, session, mod_url, mod_info):
-        """Get download URL from mod page"""
-        try:
-            page_response = session.get(mod_url, timeout=15)
-            if page_response.status_code != 200:
-                return None
-                
-            page_content = page_response.text
-            
-            patterns = [
-                r'href="(https://[^"]*thunderstore[^"]*download[^"]*)"',
-                r'"download_url":"([^"]*)"',
-                r'data-download-url="([^"]*)"',
-                rf'/package/download/{re.escape(mod_info["author"])}/{re.escape(mod_info["name"])}([^/"]+)',
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, page_content, re.IGNORECASE)
-                if matches:
-                    download_url = matches[0]
-                    if isinstance(download_url, tuple):
-                        download_url = matches[0][0]
-                    
-                    if not download_url.startswith('http'):
-                        download_url = f"https://thunderstore.io{download_url}"
-                    
-                    return download_url
-            
-            version_match = re.search(r'"version_number":"([^"]+)"', page_content)
-            if version_match:
-                version = version_match.group(1)
-                return f"https://thunderstore.io/package/download/{mod_info['author']}/{mod_info['name']}/{version}/"
-            
-            return None
-            
-        except Exception as e:
-            self.log(f"  ❌ Error parsing mod page: {str(e)}", "error")
+    def file_store(self, download_folder):
+        """The shared file store for download_folder, or None when "file_store" is off in config.json"""
+        if not self.config.get("file_store", False):
             return None
+        return store.FileStore(store.store_root(download_folder))
+
+    def manage_profiles(self):
+        """Save the mods folder as a profile or switch to another one"""
+        if self.is_downloading:
+            messagebox.showinfo("Profiles", "Profiles can be saved or switched once the download has finished.")
+            return
+        profiles = store.ProfileManager(self.download_folder.get(), log=self.log)
+        names = profiles.list()
+        active = profiles.active()
+        listing = "\n".join(f"{'▶' if name == active else '•'} {name}" for name in names) or "(none yet)"
+        name = simpledialog.askstring(
+            "Profiles",
+            f"Profiles of this mods folder:\n{listing}\n\n"
+            "Enter a profile to switch to, or a new name to save the current folder as:",
+            parent=self.root
+        )
+        if not name:
+            return
+        name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).strip()
+        if not name:
+            messagebox.showerror("Invalid Name", "Please enter a valid profile name.")
+            return
+
+        def finish():
+            self.is_downloading = False
+            self.download_button.config(state=tk.NORMAL)
+
+        def work():
+            try:
+                if name in names and name != active:
+                    profiles.switch(name)
+                else:
+                    profiles.save(name)
+            except (store.StoreError, OSError) as e:
+                self.log(f"❌ {str(e)}", "error")
+            finally:
+                self.root.after(0, finish)
+
+        # Held like a download so no batch starts while the folder is being replaced
+        self.is_downloading = True
+        self.download_button.config(state=tk.DISABLED)
+        threading.Thread(target=work, daemon=True).start()
 
     def load_preset(self):
         """Load a JSON preset file"""
@@ -1862,25 +2082,21 @@ class WebFishingModManager:
             return
         
         try:
-            with open(preset_file, 'r') as f:
-                preset_data = json.load(f)
-                
-            if "mod_urls" not in preset_data:
-                messagebox.showerror("Invalid Preset", "The selected file is not a valid mod preset.")
-                return
-                
-            for item_id in self.url_tree.get_children():
-                self.url_tree.delete(item_id)
-            
-            added_count = 0
-            for url in preset_data["mod_urls"]:
-                mod_info = self.extract_mod_info_from_url(url)
-                if mod_info:
-                    self.url_tree.insert("", tk.END, values=(url, mod_info["name"]))
-                    added_count += 1
+            mod_urls = load_preset(preset_file)
+            self.loaded_lock = lockfile.load_lockfile(preset_file)
+        except PresetError as e:
+            messagebox.showerror("Invalid Preset", str(e))
+            self.log(str(e), "error")
+            return
+
+        try:
+            self.queue.clear()
+            added_count = len(self.queue.add_many(mod_urls))
                     
             self.log(f"Loaded preset: {os.path.basename(preset_file)}", "success")
             self.log(f"• {added_count} WebFishing mods added to list", "info")
+            if self.loaded_lock:
+                self.log(f"🔒 Pinned versions for {len(self.loaded_lock.mods)} mods (dependencies included)", "info")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load preset: {str(e)}")
@@ -1888,10 +2104,7 @@ class WebFishingModManager:
 
     def save_preset_as(self):
         """Save the current mod list as a named preset"""
-        mod_urls = []
-        for item_id in self.url_tree.get_children():
-            url = self.url_tree.item(item_id)["values"][0]
-            mod_urls.append(url)
+        mod_urls = self.queue.urls()
             
         if not mod_urls:
             messagebox.showwarning("No Mods", "There are no WebFishing mods in the list to save as a preset.")
@@ -1917,40 +2130,116 @@ class WebFishingModManager:
         if not preset_file:
             return
             
-        preset_data = {
-            "name": preset_name,
-            "mod_urls": mod_urls,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "created_by": "WebFishing Mod Manager"
-        }
-        
+        pin = messagebox.askyesno(
+            "Pin Versions",
+            "Pin the exact version of every mod and its dependencies?\n\n"
+            "Installing a pinned preset skips all lookups and checks each download's SHA-256. "
+            "Pinning downloads every archive once to hash it."
+        )
+
         try:
-            with open(preset_file, 'w') as f:
-                json.dump(preset_data, f, indent=2)
+            save_preset(preset_file, preset_name, mod_urls)
                 
             self.log(f"WebFishing mod preset saved successfully: {preset_file}", "success")
-            messagebox.showinfo("Preset Saved", f"Your WebFishing mod preset '{preset_name}' was saved successfully!")
+            if not pin:
+                messagebox.showinfo("Preset Saved", f"Your WebFishing mod preset '{preset_name}' was saved successfully!")
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save preset: {str(e)}")
-            self.log(f"Failed to save preset: {str(e)}", "error")
-
-    def save_preset_auto(self, download_folder, downloaded_mods):
-        """Automatically save a preset file"""
-        preset_path = os.path.join(download_folder, "webfishing_mod_preset.json")
-        
-        preset_data = {
-            "name": "Auto Preset",
-            "downloaded_mods": list(downloaded_mods),
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "created_by": "WebFishing Mod Manager"
-        }
-        
+        except PresetError as e:
+            messagebox.showerror("Error", str(e))
+            self.log(str(e), "error")
+            return
+
+        if pin:
+            threading.Thread(target=self.pin_preset, args=(preset_file, preset_name, mod_urls), daemon=True).start()
+
+    def pin_preset(self, preset_file, preset_name, mod_urls):
+        """Resolve and hash a saved preset's mods and rewrite it as a lockfile"""
+        self.log(f"\n🔒 Pinning versions for preset '{preset_name}'...", "info")
+        engine = ModEngine(self.download_folder.get(), log=self.log, jobs=self.config.get("download_jobs", 1) or 1,
+                           bandwidth=self.bandwidth, artifact_cache=self.artifact_cache)
+        try:
+            locked = lockfile.lock(engine, mod_urls, preset_name)
+            lockfile.save_lockfile(preset_file, locked)
+        except (EngineError, PresetError) as e:
+            self.log(f"❌ {str(e)}", "error")
+            self.log("The preset was kept with page URLs only", "warning")
+            return
+        self.loaded_lock = locked
+        self.log(f"✅ Pinned {len(locked.mods)} mods ({locked.total_size} bytes) in {preset_file}", "success")
+
+    def export_bundle(self):
+        """Pack the mod list, its dependencies and every archive into one file for offline installs"""
+        mod_urls = [url for url in self.queue.urls() if not is_gdweave_url(url)]
+        if not mod_urls:
+            messagebox.showwarning("No Mods", "There are no WebFishing mods in the list to bundle.")
+            return
+        bundle_file = filedialog.asksaveasfilename(
+            title="Export Bundle",
+            initialdir=self.download_folder.get(),
+            initialfile=f"webfishing_mods{bundle.BUNDLE_EXTENSION}",
+            defaultextension=bundle.BUNDLE_EXTENSION,
+            filetypes=[("WebLoader Bundle", f"*{bundle.BUNDLE_EXTENSION}"), ("All Files", "*.*")]
+        )
+        if not bundle_file:
+            return
+        # A loaded pinned preset for this exact list is bundled as pinned
+        lock = self.loaded_lock
+        if not (lock and set(mod_urls) == {url for url in lock.mod_urls if not is_gdweave_url(url)}):
+            lock = None
+
+        def work():
+            self.log(f"\n📦 Exporting {len(mod_urls)} mods and their dependencies to {bundle_file}...", "info")
+            engine = ModEngine(self.download_folder.get(), log=self.log,
+                               jobs=self.config.get("download_jobs", 1) or 1,
+                               bandwidth=self.bandwidth, mirror_set=self.mirror_set,
+                               artifact_cache=self.artifact_cache)
+            name = None if lock else os.path.splitext(os.path.basename(bundle_file))[0]
+            try:
+                locked = bundle.export_bundle(engine, bundle_file, mod_urls, lock, name)
+            except (EngineError, PresetError) as e:
+                self.log(f"❌ {str(e)}", "error")
+                return
+            self.log(f"✅ Bundled {len(locked.mods)} mods ({os.path.getsize(bundle_file)} bytes) in {bundle_file}",
+                     "success")
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def install_bundle(self):
+        """Install every mod in a bundle file without contacting Thunderstore"""
+        if self.is_downloading:
+            return
+        bundle_file = filedialog.askopenfilename(
+            title="Install from Bundle",
+            filetypes=[("WebLoader Bundle", f"*{bundle.BUNDLE_EXTENSION}"), ("All Files", "*.*")],
+            initialdir=self.download_folder.get()
+        )
+        if not bundle_file:
+            return
+        download_folder = self.download_folder.get()
+        if not download_folder:
+            messagebox.showerror("Missing Information", "Please specify a download folder.")
+            return
+        os.makedirs(download_folder, exist_ok=True)
+        self.start_batch(self.run_bundle, bundle_file, download_folder)
+
+    def run_bundle(self, bundle_file, download_folder):
+        """Install a bundle's mods on the download thread"""
         try:
-            with open(preset_path, 'w') as f:
-                json.dump(preset_data, f, indent=2)
+            with bundle.Bundle(bundle_file) as bundled:
+                self.log(f"\n📦 Installing {len(bundled.lockfile.mods)} mods from bundle '{bundled.name}'", "info")
+                engine = self.make_engine(download_folder)
+                engine.bundle = bundled
+                batch = engine.run_locked(bundled.lockfile)
+        except bundle.BundleError as e:
+            self.log(f"❌ {str(e)}", "error")
+            return
         except Exception as e:
-            self.log(f"\n⚠️ Could not save auto-preset: {str(e)}", "error")
+            import traceback
+            self.log(f"\n💥 Critical error while installing the bundle: {str(e)}", "error")
+            self.log(f"Error details:\n{traceback.format_exc()}", "error")
+            return
+        self.log(f"✅ Installed: {batch.successful}, ⏩ already installed: {batch.skipped}, "
+                 f"❌ failed: {batch.failed}", "success" if not batch.failed else "warning")
 
     def launch_webfishing(self):
         """Launch the WebFishing game executable, waiting for Steam to be fully ready (but not launching Steam)."""
@@ -2394,6 +2683,11 @@ class WebFishingModManager:
 
             dest_folder = os.path.join(extract_to, os.path.basename(mod_folder))
             if os.path.exists(dest_folder):
+                snapshot_store = snapshots.mod_store(extract_to, os.path.basename(mod_folder),
+                                                     self.config.get("snapshot_keep", 5))
+                snapshot = snapshot_store.create("before zip import")
+                if snapshot:
+                    self.log(f"🔁 Snapshot of the existing mod kept as {snapshot.name}", "info")
                 shutil.rmtree(dest_folder)
             shutil.copytree(mod_folder, dest_folder)
 
@@ -2418,6 +2712,10 @@ class WebFishingModManager:
             shutil.rmtree(temp_extract, ignore_errors=True)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        import cli
+        sys.exit(cli.main())
+
     root = tk.Tk()
     root.state('zoomed')
     app = WebFishingModManager(root)
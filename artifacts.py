@@ -0,0 +1,400 @@
+"""Shared artifact cache: archives fetched once, reused by every machine of a team.
+
+Before an archive is downloaded from Thunderstore, the engine asks the
+ArtifactCache for it; once a download has passed its CRC check it
+publishes the archive back. A cached archive that matches its hash but
+fails the CRC check is deleted from the cache and downloaded again.
+Entries are keyed by Author-Name-version and SHA-256:
+
+    Author-Name-1.2.0.json              {"sha256": ..., "size": ...}
+    Author-Name-1.2.0/<sha256>.zip      the archive
+
+A lockfile names the hash, so its archives are read straight from their
+blob; otherwise the .json record says which blob is current. Every read is
+hashed as it is copied and a blob that does not match its key is ignored
+(and replaced by the next publish). The record is written after its blob
+and deleted before it, so a reader never sees a record whose blob is
+missing. Cache errors are
+logged and never fail an install; the archive just comes from Thunderstore.
+
+The cache is a shared directory, an HTTP server that answers GET, PUT and DELETE
+(nginx with WebDAV, bazel-remote and the like), or an S3-compatible bucket
+(AWS, MinIO, ...) with path-style requests signed with the credentials in
+AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY:
+
+    /mnt/team/webloader-cache
+    http://cache.lan:8080/webloader
+    s3://bucket/prefix?endpoint=http://127.0.0.1:9000&region=us-east-1
+"""
+import os
+import hmac
+import json
+import uuid
+import shutil
+import hashlib
+import threading
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, quote, urlsplit
+
+import http_client
+from transfer import TransferResult
+
+
+COPY_BUFFER = 1024 * 1024
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+
+class ArtifactCacheError(Exception):
+    """The cache could not be reached or refused a request"""
+
+
+def entry_name(full_name, version):
+    return f"{full_name}-{version}"
+
+
+def record_key(full_name, version):
+    return f"{entry_name(full_name, version)}.json"
+
+
+def blob_key(full_name, version, sha256):
+    return f"{entry_name(full_name, version)}/{sha256}.zip"
+
+
+class DirectoryBackend:
+    """Entries as files under a (shared) directory"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def describe(self):
+        return self.root
+
+    def path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def open(self, key):
+        """A readable binary stream for key, or None if there is no such entry"""
+        try:
+            return open(self.path(key), "rb")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            raise ArtifactCacheError(str(e)) from e
+
+    def put(self, key, source_path=None, data=None):
+        path = self.path(key)
+        # Unique name: several machines may publish the same entry at once
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if source_path is not None:
+                shutil.copyfile(source_path, tmp_path)
+            else:
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise ArtifactCacheError(str(e)) from e
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            raise ArtifactCacheError(str(e)) from e
+
+
+class HttpBackend:
+    """Entries as URLs under base_url: GET to read, PUT to publish, DELETE to drop"""
+
+    def __init__(self, base_url, client=None):
+        self.base_url = base_url.rstrip("/")
+        self.client = client or http_client.get_client()
+
+    def describe(self):
+        return self.base_url
+
+    def url(self, key):
+        return f"{self.base_url}/{quote(key)}"
+
+    def headers(self, method, url, payload_hash):
+        return {}
+
+    def is_missing(self, response):
+        return response.status_code == 404
+
+    def open(self, key):
+        url = self.url(key)
+        try:
+            r = self.client.get(url, kind=http_client.KIND_DOWNLOAD, stream=True,
+                                headers=self.headers("GET", url, EMPTY_SHA256))
+        except Exception as e:
+            raise ArtifactCacheError(str(e)) from e
+        if self.is_missing(r):
+            r.close()
+            return None
+        if r.status_code != 200:
+            r.close()
+            raise ArtifactCacheError(f"GET {url}: HTTP {r.status_code}")
+        r.raw.decode_content = True
+        return ResponseStream(r)
+
+    def put(self, key, source_path=None, data=None):
+        url = self.url(key)
+        payload_hash = sha256_file(source_path) if source_path is not None else hashlib.sha256(data).hexdigest()
+        headers = self.headers("PUT", url, payload_hash)
+        try:
+            if source_path is not None:
+                headers["Content-Length"] = str(os.path.getsize(source_path))
+                with open(source_path, "rb") as f:
+                    r = self.client.put(url, data=f, headers=headers)
+            else:
+                r = self.client.put(url, data=data, headers=headers)
+        except Exception as e:
+            raise ArtifactCacheError(str(e)) from e
+        with r:
+            if r.status_code not in (200, 201, 204):
+                raise ArtifactCacheError(f"PUT {url}: HTTP {r.status_code}")
+
+    def delete(self, key):
+        url = self.url(key)
+        try:
+            r = self.client.delete(url, headers=self.headers("DELETE", url, EMPTY_SHA256))
+        except Exception as e:
+            raise ArtifactCacheError(str(e)) from e
+        with r:
+            if r.status_code not in (200, 202, 204, 404):
+                raise ArtifactCacheError(f"DELETE {url}: HTTP {r.status_code}")
+
+
+class S3Backend(HttpBackend):
+    """An S3-compatible bucket, path-style, with AWS Signature Version 4"""
+
+    def __init__(self, endpoint, bucket, prefix="", region="us-east-1", access_key=None, secret_key=None,
+                 client=None):
+        super().__init__(f"{endpoint.rstrip('/')}/{bucket}" + (f"/{prefix.strip('/')}" if prefix.strip("/") else ""),
+                         client)
+        self.region = region
+        self.access_key = access_key or os.getenv("AWS_ACCESS_KEY_ID", "")
+        self.secret_key = secret_key or os.getenv("AWS_SECRET_ACCESS_KEY", "")
+
+    def headers(self, method, url, payload_hash):
+        if not self.access_key:
+            # Anonymous access to a public bucket
+            return {}
+        return sign_v4(method, url, {}, payload_hash, self.access_key, self.secret_key, self.region)
+
+    def is_missing(self, response):
+        """404, or the 403 AccessDenied a private bucket answers for a missing key without s3:ListBucket.
+
+        Other 403s (a bad signature, an unknown access key) are errors.
+        """
+        if response.status_code == 403:
+            return b"<Code>AccessDenied</Code>" in response.content
+        return super().is_missing(response)
+
+
+class ResponseStream:
+    """read()/close() over a streamed requests response"""
+
+    def __init__(self, response):
+        self.response = response
+
+    def read(self, size=-1):
+        return self.response.raw.read(size)
+
+    def close(self):
+        self.response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_BUFFER), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hmac(key, text):
+    return hmac.new(key, text.encode("utf-8"), hashlib.sha256).digest()
+
+
+def sign_v4(method, url, headers, payload_hash, access_key, secret_key, region, service="s3", now=None):
+    """headers plus X-Amz-Date, X-Amz-Content-Sha256 and an AWS SigV4 Authorization header.
+
+    The Host header is signed as requests will send it, from url.
+    """
+    parts = urlsplit(url)
+    amz_date = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    signed = {name.lower(): str(value).strip() for name, value in headers.items()}
+    signed.update({"host": parts.netloc, "x-amz-date": amz_date, "x-amz-content-sha256": payload_hash})
+    names = sorted(signed)
+    query = "&".join(sorted(f"{quote(name, safe='-_.~')}={quote(value[0], safe='-_.~')}"
+                            for name, value in parse_qs(parts.query, keep_blank_values=True).items()))
+    canonical_request = "\n".join([
+        method,
+        parts.path or "/",
+        query,
+        "".join(f"{name}:{signed[name]}\n" for name in names),
+        ";".join(names),
+        payload_hash,
+    ])
+    scope = f"{amz_date[:8]}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join(["AWS4-HMAC-SHA256", amz_date, scope,
+                                hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()])
+    key = _hmac(("AWS4" + secret_key).encode("utf-8"), amz_date[:8])
+    for part in (region, service, "aws4_request"):
+        key = _hmac(key, part)
+    signature = hmac.new(key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    result = dict(headers)
+    result.update({
+        "X-Amz-Date": amz_date,
+        "X-Amz-Content-Sha256": payload_hash,
+        "Authorization": f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+                         f"SignedHeaders={';'.join(names)}, Signature={signature}",
+    })
+    return result
+
+
+def open_backend(spec, client=None):
+    """The backend for a cache location: a directory, an http(s) URL or s3://bucket/prefix?endpoint=..."""
+    if spec.startswith("s3://"):
+        parts = urlsplit(spec)
+        options = {name: values[0] for name, values in parse_qs(parts.query).items()}
+        region = options.get("region", "us-east-1")
+        endpoint = options.get("endpoint", f"https://s3.{region}.amazonaws.com")
+        return S3Backend(endpoint, parts.netloc, parts.path, region, client=client)
+    if spec.startswith(("http://", "https://")):
+        return HttpBackend(spec, client)
+    return DirectoryBackend(os.path.expanduser(spec))
+
+
+class ArtifactCache:
+    """Verified reads from, and publishes to, one cache backend"""
+
+    def __init__(self, backend, publish=True, log=None):
+        self.backend = open_backend(backend) if isinstance(backend, str) else backend
+        self.publish_enabled = publish
+        self._log = log
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.published = 0
+        self.errors = 0
+
+    def log(self, message, msg_type="info"):
+        if self._log:
+            self._log(message, msg_type)
+
+    def describe(self):
+        return self.backend.describe()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def lookup(self, full_name, version):
+        """(sha256, size) of the cached archive of full_name at version, or None"""
+        stream = self.backend.open(record_key(full_name, version))
+        if stream is None:
+            return None
+        with stream:
+            data = json.loads(stream.read().decode("utf-8"))
+        return data["sha256"], data.get("size")
+
+    def fetch(self, full_name, version, dest_path, sha256=None, size=None, on_progress=None):
+        """Copy the cached archive to dest_path and return its TransferResult, or None on a miss.
+
+        With sha256 (a lockfile) only that exact archive counts; otherwise the
+        one the entry's record names. Either way the copy is hashed and
+        compared with the key it was stored under.
+        """
+        try:
+            if sha256 is None:
+                found = self.lookup(full_name, version)
+                if found is None:
+                    self._count("misses")
+                    return None
+                sha256, size = found
+            stream = self.backend.open(blob_key(full_name, version, sha256))
+            if stream is None:
+                self._count("misses")
+                return None
+            digest = hashlib.sha256()
+            written = 0
+            with stream, open(dest_path, "wb") as dest:
+                for chunk in iter(lambda: stream.read(COPY_BUFFER), b""):
+                    dest.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+                    if on_progress is not None:
+                        on_progress(written, size or 0)
+        except (ArtifactCacheError, OSError, ValueError, KeyError, TypeError) as e:
+            self._count("errors")
+            self.log(f"  ⚠️ Artifact cache unavailable for {full_name}: {str(e)}", "warning")
+            self._discard(dest_path)
+            return None
+
+        if digest.hexdigest() != sha256 or (size is not None and written != size):
+            self._count("errors")
+            self.log(f"  ⚠️ Cached {entry_name(full_name, version)} does not match its hash; "
+                     f"downloading it instead", "warning")
+            self._discard(dest_path)
+            return None
+        self._count("hits")
+        return TransferResult(written, sha256, written)
+
+    def reject(self, full_name, version, sha256):
+        """Drop a cached archive that matched its hash but failed the CRC check, so no one is served it again.
+
+        It counts as an error instead of the hit fetch counted. The record
+        goes first, and only while it still names this archive.
+        """
+        with self._lock:
+            self.hits -= 1
+            self.errors += 1
+        try:
+            found = self.lookup(full_name, version)
+            if found is not None and found[0] == sha256:
+                self.backend.delete(record_key(full_name, version))
+            self.backend.delete(blob_key(full_name, version, sha256))
+        except (ArtifactCacheError, ValueError, KeyError, TypeError) as e:
+            self.log(f"  ⚠️ Could not remove the damaged {entry_name(full_name, version)} from the artifact cache: "
+                     f"{str(e)}", "warning")
+            return False
+        return True
+
+    def _discard(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def publish(self, full_name, version, path, sha256, size):
+        """Store an archive (blob, then record); failures are logged, never raised"""
+        if not self.publish_enabled:
+            return False
+        try:
+            self.backend.put(blob_key(full_name, version, sha256), source_path=path)
+            self.backend.put(record_key(full_name, version),
+                             data=json.dumps({"sha256": sha256, "size": size}).encode("utf-8"))
+        except ArtifactCacheError as e:
+            self._count("errors")
+            self.log(f"  ⚠️ Could not publish {entry_name(full_name, version)} to the artifact cache: {str(e)}",
+                     "warning")
+            return False
+        self._count("published")
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "published": self.published, "errors": self.errors}
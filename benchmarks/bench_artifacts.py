@@ -0,0 +1,264 @@
+"""Shared artifact cache: Thunderstore traffic for a cold and a warm machine.
+
+Machine A installs a catalog into an empty mods folder with an empty
+artifact cache and publishes every archive; machine B then installs the
+same mods into its own folder from the same cache. Each backend is run:
+a shared directory, a plain HTTP GET/PUT server and an S3-style server that
+checks every request's Signature Version 4 and, like a private bucket,
+answers 403 AccessDenied for a missing key. Then one cached blob is
+corrupted (machine C must download it again instead of installing it), one
+entry is replaced by an archive that matches its hash but fails the CRC
+check (machine D, which does not publish, must reject it and delete it
+from the cache, so machine E simply misses it), and a last install against
+a server that corrupts downloads must publish nothing that fails the CRC
+check.
+
+    python benchmarks/bench_artifacts.py --mods 20 --size-mb 1 --jobs 4
+"""
+import os
+import sys
+import time
+import shutil
+import json
+import struct
+import hashlib
+import zipfile
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import artifacts  # noqa: E402
+from faults import FaultProfile  # noqa: E402
+from standin_server import Catalog, QuietHTTPServer, StandinServer  # noqa: E402
+from engine import ARTIFACT_SOURCE, ModEngine, STATUS_INSTALLED  # noqa: E402
+
+
+S3_ACCESS_KEY = "standin-access"
+S3_SECRET_KEY = "standin-secret"
+S3_REGION = "us-east-1"
+
+
+class CacheHandler(BaseHTTPRequestHandler):
+    """GET and PUT of files under server.root; with server.s3, every request must be signed"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def path_on_disk(self):
+        return os.path.join(self.server.root, *[part for part in self.path.split("?")[0].split("/") if part])
+
+    def signed(self, body=None):
+        if not self.server.s3:
+            return True
+        amz_date = self.headers.get("X-Amz-Date", "")
+        payload_hash = self.headers.get("X-Amz-Content-Sha256", "")
+        if body is not None and hashlib.sha256(body).hexdigest() != payload_hash:
+            return False
+        try:
+            now = datetime.strptime(amz_date, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return False
+        expected = artifacts.sign_v4(self.command, f"http://{self.headers['Host']}{self.path}", {}, payload_hash,
+                                     S3_ACCESS_KEY, S3_SECRET_KEY, S3_REGION, now=now)
+        return self.headers.get("Authorization") == expected["Authorization"]
+
+    def s3_error(self, code):
+        self.reply(403, f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><Error><Code>{code}</Code></Error>".encode())
+
+    def reply(self, status, body=b""):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if not self.signed():
+            return self.s3_error("SignatureDoesNotMatch")
+        try:
+            with open(self.path_on_disk(), "rb") as f:
+                body = f.read()
+        except OSError:
+            # Without s3:ListBucket, S3 does not say whether a key exists
+            return self.s3_error("AccessDenied") if self.server.s3 else self.reply(404)
+        self.server.gets += 1
+        self.reply(200, body)
+
+    def do_DELETE(self):
+        if not self.signed():
+            return self.s3_error("SignatureDoesNotMatch")
+        try:
+            os.remove(self.path_on_disk())
+        except OSError:
+            pass
+        self.reply(204)
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.signed(body):
+            return self.s3_error("SignatureDoesNotMatch")
+        path = self.path_on_disk()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(body)
+        self.server.puts += 1
+        self.reply(200)
+
+
+class CacheServer:
+    """A stand-in HTTP or S3 cache server in a background thread"""
+
+    def __init__(self, root, s3=False):
+        self.httpd = QuietHTTPServer(("127.0.0.1", 0), CacheHandler)
+        self.httpd.root = root
+        self.httpd.s3 = s3
+        self.httpd.gets = 0
+        self.httpd.puts = 0
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def make_backend(kind, root, server):
+    if kind == "directory":
+        return artifacts.DirectoryBackend(root)
+    if kind == "http":
+        return artifacts.HttpBackend(f"{server.base_url}/webloader")
+    return artifacts.S3Backend(server.base_url, "bucket", "webloader", S3_REGION, S3_ACCESS_KEY, S3_SECRET_KEY)
+
+
+def install(server, dest, cache, jobs, log):
+    started = time.perf_counter()
+    sent = server.bytes_sent
+    batch = ModEngine(dest, base_url=server.base_url, jobs=jobs, log=log, artifact_cache=cache).run(server.mod_urls())
+    return {
+        "seconds": time.perf_counter() - started,
+        "installed": sum(1 for result in batch.results if result.status == STATUS_INSTALLED),
+        "from_cache": sum(1 for result in batch.results if result.record.source == ARTIFACT_SOURCE),
+        "thunderstore_bytes": server.bytes_sent - sent,
+    }
+
+
+def cached_blobs(root):
+    return [os.path.join(folder, name) for folder, _, names in os.walk(root) for name in names if name.endswith(".zip")]
+
+
+def fails_crc(path):
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return archive.testzip() is not None
+    except Exception:
+        return True
+
+
+def poison_entry(root):
+    """Replace one entry with a CRC-broken copy of its archive, published under its own (matching) hash"""
+    record_path = next(os.path.join(folder, name) for folder, _, names in os.walk(root)
+                       for name in names if name.endswith(".json"))
+    with open(record_path, "r", encoding="utf-8") as f:
+        entry = json.load(f)
+    blob_dir = record_path[:-len(".json")]
+    with open(os.path.join(blob_dir, f"{entry['sha256']}.zip"), "rb") as f:
+        data = bytearray(f.read())
+    with zipfile.ZipFile(os.path.join(blob_dir, f"{entry['sha256']}.zip")) as archive:
+        member = max(archive.infolist(), key=lambda info: info.compress_size)
+    name_length, extra_length = struct.unpack("<HH", data[member.header_offset + 26:member.header_offset + 30])
+    data[member.header_offset + 30 + name_length + extra_length + member.compress_size // 2] ^= 0xFF
+    sha256 = hashlib.sha256(data).hexdigest()
+    with open(os.path.join(blob_dir, f"{sha256}.zip"), "wb") as f:
+        f.write(data)
+    with open(record_path, "w", encoding="utf-8") as f:
+        json.dump({"sha256": sha256, "size": len(data)}, f)
+
+
+def run_backend(catalog, kind, jobs, verbose):
+    log = (lambda message, msg_type="info": print(message, file=sys.stderr)) if verbose else None
+    work = tempfile.mkdtemp(prefix=f"bench_artifacts_{kind}_")
+    root = os.path.join(work, "cache")
+    try:
+        with StandinServer(catalog) as server, CacheServer(root, s3=kind == "s3") as cache_server:
+            server.prepare_archives()
+            rows = {}
+            for machine in ("A", "B"):
+                cache = artifacts.ArtifactCache(make_backend(kind, root, cache_server), log=log)
+                rows[machine] = install(server, os.path.join(work, f"mods_{machine}"), cache, jobs, log)
+                rows[machine]["stats"] = cache.stats()
+
+            # Damage one cached blob: machine C must download that archive again and republish it
+            blob = cached_blobs(root)[0]
+            with open(blob, "r+b") as f:
+                f.seek(100)
+                f.write(b"\0" * 16)
+            cache = artifacts.ArtifactCache(make_backend(kind, root, cache_server), log=log)
+            rows["C"] = install(server, os.path.join(work, "mods_C"), cache, jobs, log)
+            rows["C"]["stats"] = cache.stats()
+
+            # An archive that matches its hash but not its CRCs, as published by an older client,
+            # met by machines that only read the cache (--no-publish)
+            poison_entry(root)
+            for machine in ("D", "E"):
+                cache = artifacts.ArtifactCache(make_backend(kind, root, cache_server), publish=False, log=log)
+                rows[machine] = install(server, os.path.join(work, f"mods_{machine}"), cache, jobs, log)
+                rows[machine]["stats"] = cache.stats()
+
+        # A server that corrupts downloads: only archives that pass the CRC check may be published
+        corrupt_root = os.path.join(work, "cache_corrupt")
+        faults = FaultProfile("corrupt", corrupt_rate=0.3, seed=2)
+        with StandinServer(catalog, faults=faults) as server, \
+                CacheServer(corrupt_root, s3=kind == "s3") as cache_server:
+            server.prepare_archives()
+            cache = artifacts.ArtifactCache(make_backend(kind, corrupt_root, cache_server), log=log)
+            rows["F"] = install(server, os.path.join(work, "mods_F"), cache, jobs, log)
+            rows["F"]["stats"] = cache.stats()
+            rows["F"]["bad_blobs"] = sum(fails_crc(path) for path in cached_blobs(corrupt_root))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure Thunderstore traffic with a shared artifact cache")
+    parser.add_argument("--backend", nargs="+", choices=("directory", "http", "s3"),
+                        default=["directory", "http", "s3"])
+    parser.add_argument("--mods", type=int, default=12)
+    parser.add_argument("--size-mb", type=float, default=0.5)
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Print engine log lines to stderr")
+    args = parser.parse_args(argv)
+
+    catalog = Catalog.generate(args.mods, int(args.size_mb * 1024 * 1024), seed=args.seed)
+    failed = False
+    for kind in args.backend:
+        rows = run_backend(catalog, kind, args.jobs, args.verbose)
+        for machine, row in rows.items():
+            print(f"{kind:<10} {machine}  installed {row['installed']:>3}  from cache {row['from_cache']:>3}  "
+                  f"thunderstore {row['thunderstore_bytes'] / 1048576:7.2f} MB  {row['seconds']:6.2f}s  "
+                  f"{row['stats']}")
+        warm, damaged, poisoned, after = rows["B"], rows["C"], rows["D"], rows["E"]
+        others = rows["A"]["installed"] - 1
+        if rows["A"]["stats"]["errors"] or warm["from_cache"] != warm["installed"] or damaged["stats"]["errors"] != 1 \
+                or damaged["installed"] != rows["A"]["installed"] \
+                or poisoned["installed"] != rows["A"]["installed"] \
+                or (poisoned["stats"]["hits"], poisoned["stats"]["errors"]) != (others, 1) \
+                or (after["stats"]["hits"], after["stats"]["misses"], after["stats"]["errors"]) != (others, 1, 0) \
+                or rows["F"]["bad_blobs"]:
+            print(f"{kind}: unexpected result", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
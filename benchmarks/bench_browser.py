@@ -0,0 +1,246 @@
+"""Mod browser benchmark: search, category and details latency against large catalogs.
+
+Loads a synthetic catalog (benchmarks/standin_server.py, long-tailed version
+lists) into the real WebFishingModManager window and drives the browser the
+way a user would: typing a search, switching the category box and clicking
+rows in the mod list. Each catalog size runs in a fresh child process so
+memory figures belong to that size alone. Icons are served by the stand-in.
+
+    python benchmarks/bench_browser.py
+    python benchmarks/bench_browser.py --sizes 1000 10000 --samples 20 --json browser.json
+
+Needs a display. Without $DISPLAY an Xvfb server is started for the run
+(apt install xvfb / dnf install xorg-x11-server-Xvfb).
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from standin_server import Catalog, StandinServer  # noqa: E402
+from bench_download import peak_rss_bytes  # noqa: E402
+from metrics import percentile  # noqa: E402
+
+
+CATEGORIES = ("Popular", "Recently Updated", "Newest")
+SEARCH_TERMS = ("", "a", "fish", "Author1", "zzz-no-match")
+
+
+def current_rss_bytes():
+    """Resident set size right now (Linux only)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def start_virtual_display(width=1600, height=1000):
+    """Start Xvfb on a free display number and point $DISPLAY at it"""
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        raise RuntimeError("no $DISPLAY and Xvfb is not installed")
+    for number in range(99, 140):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}") or os.path.exists(f"/tmp/.X{number}-lock"):
+            continue
+        proc = subprocess.Popen(
+            [xvfb, f":{number}", "-screen", "0", f"{width}x{height}x24", "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                os.environ["DISPLAY"] = f":{number}"
+                return proc
+            if proc.poll() is not None:
+                break
+            time.sleep(0.05)
+        proc.kill()
+    raise RuntimeError("could not start Xvfb")
+
+
+def isolated_appdata():
+    """Temp app-data folder so the run never touches the user's config or logs"""
+    appdata = tempfile.mkdtemp(prefix="bench_browser_")
+    os.makedirs(os.path.join(appdata, "WebLoader"))
+    with open(os.path.join(appdata, "WebLoader", "config.json"), "w") as f:
+        json.dump({"suppress_welcome_popup": True}, f)
+    os.environ["APPDATA"] = appdata
+    return appdata
+
+
+def timed(root, action):
+    """Run action and let Tk process the resulting events and redraws"""
+    started = time.perf_counter()
+    action()
+    root.update()
+    return time.perf_counter() - started
+
+
+def summarize(samples):
+    ms = [s * 1000 for s in samples]
+    if not ms:
+        return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+    return {
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "max_ms": round(max(ms), 2),
+    }
+
+
+def run_once(size, samples, versions, seed):
+    """Load one catalog into the browser in this process and return its measurements"""
+    import tkinter as tk
+
+    appdata = isolated_appdata()
+    import WebLoader
+
+    catalog = Catalog.generate(size, archive_size=0, versions=versions, seed=seed, realistic_versions=True)
+    version_count = sum(len(p["versions"]) for p in catalog.packages)
+    try:
+        with StandinServer(catalog, seed=seed) as server:
+            packages = server.listing()
+
+            class BenchManager(WebLoader.WebFishingModManager):
+                def refresh_mod_browser(self):
+                    self.current_mods = packages
+                    self.search_mods()
+
+            root = tk.Tk()
+            root.update()
+            rss_before = current_rss_bytes()
+            load_seconds = timed(root, lambda: setattr(root, "app", BenchManager(root)))
+            app = root.app
+            rss_loaded = current_rss_bytes()
+            rng = random.Random(seed)
+
+            def search(term):
+                app.search_entry.delete(0, tk.END)
+                app.search_entry.insert(0, term)
+                app.search_mods()
+
+            search_times = {}
+            for term in SEARCH_TERMS:
+                search_times[term or "<empty>"] = [timed(root, lambda: search(term)) for _ in range(samples)]
+            search(SEARCH_TERMS[0])
+            root.update()
+
+            def switch(category):
+                app.category_combobox.set(category)
+                app.search_mods()
+
+            category_times = []
+            for i in range(samples):
+                category = CATEGORIES[(i + 1) % len(CATEGORIES)]
+                category_times.append(timed(root, lambda: switch(category)))
+
+            rows = app.mod_tree.get_children()
+
+            def click(item):
+                app.mod_tree.selection_set(item)
+                app.mod_tree.see(item)
+
+            detail_times = [timed(root, lambda: click(rng.choice(rows))) for _ in range(samples)] if rows else []
+            rss_after = current_rss_bytes()
+            root.destroy()
+    finally:
+        shutil.rmtree(appdata, ignore_errors=True)
+
+    mb = 1024 * 1024
+    return {
+        "packages": size,
+        "versions": version_count,
+        "rows": len(rows),
+        "load_seconds": round(load_seconds, 3),
+        "search": {term: summarize(times) for term, times in search_times.items()},
+        "search_all": summarize([t for times in search_times.values() for t in times]),
+        "category_switch": summarize(category_times),
+        "details_click": summarize(detail_times),
+        "browser_rss_mb": round((rss_loaded - rss_before) / mb, 1) if rss_before is not None else None,
+        "final_rss_mb": round(rss_after / mb, 1) if rss_after is not None else None,
+        "peak_rss_mb": round(peak_rss_bytes() / mb, 1) if peak_rss_bytes() else None,
+    }
+
+
+def run_child(size, samples, versions, seed):
+    """Run one catalog size in a fresh interpreter and parse its JSON result"""
+    payload = json.dumps({"size": size, "samples": samples, "versions": versions, "seed": seed})
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child"],
+        input=payload, capture_output=True, text=True, check=False
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark child failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def format_row(result):
+    def pair(stats):
+        if stats["p50_ms"] is None:
+            return f"{'-':>8}/{'-':<8}"
+        return f"{stats['p50_ms']:>8.1f}/{stats['p95_ms']:<8.1f}"
+    return (
+        f"packages={result['packages']:<6} load={result['load_seconds']:>7.2f}s "
+        f"search p50/p95={pair(result['search_all'])}ms "
+        f"category={pair(result['category_switch'])}ms "
+        f"details={pair(result['details_click'])}ms "
+        f"browser_rss={result['browser_rss_mb']}MB peak={result['peak_rss_mb']}MB"
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the mod browser against synthetic catalogs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="Catalog sizes to load (packages)")
+    parser.add_argument("--samples", type=int, default=10, help="Repetitions per measured action")
+    parser.add_argument("--versions", type=int, default=5, help="Mean versions per package")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="Also write all results to PATH")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.child:
+        request = json.loads(sys.stdin.read())
+        result = run_once(request["size"], request["samples"], request["versions"], request["seed"])
+        print(json.dumps(result))
+        return 0
+
+    display = None
+    if not os.environ.get("DISPLAY"):
+        try:
+            display = start_virtual_display()
+        except RuntimeError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+
+    results = []
+    try:
+        for size in args.sizes:
+            result = run_child(size, args.samples, args.versions, args.seed)
+            results.append(result)
+            print(format_row(result))
+    finally:
+        if display:
+            display.terminate()
+            display.wait()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"samples": args.samples, "versions": args.versions, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""End-to-end download benchmark against the local Thunderstore stand-in.
+
+Starts benchmarks/standin_server.py in-process, then runs the engine batch
+(plan -> resolve -> fetch -> install) once per --jobs value in a fresh child
+process so peak RSS and I/O counters belong to that run alone.
+
+    python benchmarks/bench_download.py --mods 50 --size-mb 2 --jobs 1 4 8
+    python benchmarks/bench_download.py --mods 200 --size-mb 0.5 --json results.json
+
+Reports mods/s, MB/s, peak RSS and bytes written to disk for each run.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from standin_server import Catalog, StandinServer  # noqa: E402
+
+
+def peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def io_write_bytes():
+    """Bytes this process caused to be written to storage (Linux only)"""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("write_bytes:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def tree_bytes(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def run_once(base_url, mod_urls, dest, jobs):
+    """Run one batch in this process and return its measurements"""
+    from engine import ModEngine
+
+    writes_before = io_write_bytes()
+    started = time.perf_counter()
+    engine = ModEngine(dest, base_url=base_url, jobs=jobs)
+    batch = engine.run(mod_urls)
+    elapsed = time.perf_counter() - started
+    writes_after = io_write_bytes()
+
+    summary = batch.summary()
+    transferred = summary["metrics"]["bytes_transferred"]
+    return {
+        "jobs": jobs,
+        "mods": len(mod_urls),
+        "successful": batch.successful,
+        "failed": batch.failed,
+        "seconds": round(elapsed, 3),
+        "mods_per_second": round(len(mod_urls) / elapsed, 2) if elapsed else None,
+        "mb_per_second": round(transferred / elapsed / (1024 * 1024), 2) if elapsed else None,
+        "bytes_transferred": transferred,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "disk_write_bytes": (writes_after - writes_before) if writes_before is not None else None,
+        "installed_bytes": tree_bytes(dest),
+        "phase_seconds": {k: v["total"] for k, v in summary["metrics"]["phase_seconds"].items()},
+        "connections": {group: stats["connections"] for group, stats in summary["http"].items()},
+    }
+
+
+def run_child(base_url, mod_urls, jobs, keep=False):
+    """Run one batch in a fresh interpreter and parse its JSON result"""
+    dest = tempfile.mkdtemp(prefix="bench_mods_")
+    try:
+        payload = json.dumps({"base_url": base_url, "mod_urls": mod_urls, "dest": dest, "jobs": jobs})
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child"],
+            input=payload, capture_output=True, text=True, check=False
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"benchmark child failed:\n{proc.stderr}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        if not keep:
+            shutil.rmtree(dest, ignore_errors=True)
+
+
+def format_row(result):
+    rss = result["peak_rss_bytes"]
+    written = result["disk_write_bytes"]
+    return (
+        f"jobs={result['jobs']:<3} mods={result['mods']:<5} ok={result['successful']:<5} "
+        f"failed={result['failed']:<4} {result['seconds']:>8.2f}s "
+        f"{result['mods_per_second']:>8.2f} mods/s {result['mb_per_second']:>8.2f} MB/s "
+        f"rss={rss / (1024 * 1024) if rss else float('nan'):>7.1f}MB "
+        f"written={written / (1024 * 1024) if written is not None else float('nan'):>8.1f}MB"
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark mod batches against a local stand-in server")
+    parser.add_argument("--mods", type=int, default=20, help="Packages in the catalog and batch")
+    parser.add_argument("--size-mb", type=float, default=1.0, help="Archive size per mod")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 4], help="Worker counts to compare")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per worker count")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="Also write all results to PATH")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.child:
+        request = json.loads(sys.stdin.read())
+        result = run_once(request["base_url"], request["mod_urls"], request["dest"], request["jobs"])
+        print(json.dumps(result))
+        return 0
+
+    catalog = Catalog.generate(args.mods, int(args.size_mb * 1024 * 1024), seed=args.seed)
+    results = []
+    with StandinServer(catalog, seed=args.seed) as server:
+        server.prepare_archives()
+        mod_urls = server.mod_urls()
+        print(f"Stand-in at {server.base_url}: {args.mods} mods x {args.size_mb} MB", file=sys.stderr)
+        for jobs in args.jobs:
+            for _ in range(args.repeat):
+                result = run_child(server.base_url, mod_urls, jobs)
+                results.append(result)
+                print(format_row(result))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"mods": args.mods, "size_mb": args.size_mb, "results": results}, f, indent=2)
+    return 0 if all(r["failed"] == 0 for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Resilience benchmark: batch goodput and time-to-completion under fault profiles.
+
+Each profile (benchmarks/faults.py) gets a fresh stand-in server and a fresh
+mods folder. The batch is run, and with --passes > 1 the failed mods are
+re-run, the way a user would press "Download Mods" again.
+
+    python benchmarks/bench_faults.py --mods 20 --size-mb 1 --jobs 4
+    python benchmarks/bench_faults.py --profile flaky corrupt --passes 3 --json faults.json
+
+Goodput counts only archives that ended up installed; wire throughput counts
+every byte the server sent, including retries, dropped and corrupt transfers.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import faults as fault_profiles  # noqa: E402
+from standin_server import Catalog, StandinServer  # noqa: E402
+from engine import ModEngine, STATUS_FAILED, STATUS_INSTALLED  # noqa: E402
+
+
+def run_profile(catalog, profile, jobs, passes, seed, verbose=False):
+    dest = tempfile.mkdtemp(prefix=f"bench_faults_{profile.name}_")
+    log = (lambda message, msg_type="info": print(message, file=sys.stderr)) if verbose else None
+    try:
+        with StandinServer(catalog, seed=seed, faults=profile) as server:
+            server.prepare_archives()
+            pending = server.mod_urls()
+            installed_bytes = 0
+            installed = 0
+            pass_times = []
+            started = time.perf_counter()
+            for _ in range(passes):
+                pass_started = time.perf_counter()
+                batch = ModEngine(dest, base_url=server.base_url, jobs=jobs, log=log).run(pending)
+                pass_times.append(round(time.perf_counter() - pass_started, 3))
+                for result in batch.results:
+                    if result.status == STATUS_INSTALLED:
+                        installed += 1
+                        installed_bytes += result.record.archive_size
+                pending = [r.mod_url for r in batch.results if r.status == STATUS_FAILED]
+                if not pending:
+                    break
+            elapsed = time.perf_counter() - started
+            wire_bytes = server.bytes_sent
+            requests = server.requests
+    finally:
+        shutil.rmtree(dest, ignore_errors=True)
+
+    mb = 1024 * 1024
+    return {
+        "profile": profile.name,
+        "faults": profile.describe(),
+        "mods": len(catalog.packages),
+        "installed": installed,
+        "failed": len(pending),
+        "passes": len(pass_times),
+        "pass_seconds": pass_times,
+        "time_to_completion": round(elapsed, 3) if not pending else None,
+        "seconds": round(elapsed, 3),
+        "goodput_mb_per_second": round(installed_bytes / elapsed / mb, 2) if elapsed else None,
+        "wire_mb_per_second": round(wire_bytes / elapsed / mb, 2) if elapsed else None,
+        "wasted_bytes": max(wire_bytes - installed_bytes, 0),
+        "requests": requests,
+        "injected": dict(sorted(profile.injected.items())),
+    }
+
+
+def format_row(result):
+    completion = f"{result['time_to_completion']:.2f}s" if result["time_to_completion"] is not None else "incomplete"
+    injected = ", ".join(f"{k}={v}" for k, v in result["injected"].items()) or "-"
+    return (
+        f"{result['profile']:<13} {result['installed']:>4}/{result['mods']:<4} "
+        f"passes={result['passes']} done={completion:<11} "
+        f"goodput={result['goodput_mb_per_second']:>7.2f} MB/s wire={result['wire_mb_per_second']:>7.2f} MB/s "
+        f"requests={result['requests']:<5} injected: {injected}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure batch resilience under injected faults")
+    parser.add_argument("--profile", nargs="+", choices=fault_profiles.PROFILE_NAMES,
+                        default=list(fault_profiles.PROFILE_NAMES), help="Profiles to run (default: all)")
+    parser.add_argument("--mods", type=int, default=20)
+    parser.add_argument("--size-mb", type=float, default=0.5)
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--passes", type=int, default=1, help="Batch attempts; later passes re-run failed mods")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Print engine log lines to stderr")
+    parser.add_argument("--json", metavar="PATH", help="Also write all results to PATH")
+    args = parser.parse_args(argv)
+
+    catalog = Catalog.generate(args.mods, int(args.size_mb * 1024 * 1024), seed=args.seed)
+    results = []
+    for name in args.profile:
+        profile = fault_profiles.get_profile(name, seed=args.seed)
+        result = run_profile(catalog, profile, args.jobs, max(args.passes, 1), args.seed, args.verbose)
+        results.append(result)
+        print(format_row(result))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"mods": args.mods, "size_mb": args.size_mb, "jobs": args.jobs,
+                       "passes": args.passes, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Fault-injection profiles for the Thunderstore stand-in.
+
+A FaultProfile describes how badly the stand-in should behave: added
+latency, a per-connection bandwidth cap, error responses (429/503 carry
+Retry-After), connections reset partway through an archive, archives that
+arrive truncated or with flipped bytes, and whole endpoints being down.
+"""
+import time
+import random
+import threading
+
+
+# Endpoint kinds the stand-in reports to the profile
+KIND_LISTING = "listing"
+KIND_API = "api"
+KIND_PAGE = "page"
+KIND_ARCHIVE = "archive"
+KIND_ICON = "icon"
+
+
+class FaultProfile:
+    """Knobs for one fault scenario; all probabilities are per request"""
+
+    def __init__(self, name="clean", latency=0.0, jitter=0.0, bandwidth=None,
+                 error_rate=0.0, error_statuses=(503,), retry_after=None,
+                 drop_rate=0.0, corrupt_rate=0.0, down=(), seed=1):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.retry_after = retry_after
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self.down = set(down)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.injected = {}
+
+    def _roll(self, probability):
+        if probability <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < probability
+
+    def _uniform(self, low, high):
+        with self._lock:
+            return self._rng.uniform(low, high)
+
+    def _count(self, fault):
+        with self._lock:
+            self.injected[fault] = self.injected.get(fault, 0) + 1
+
+    def delay(self):
+        """Sleep for the configured response latency"""
+        if self.latency or self.jitter:
+            time.sleep(max(self.latency + self._uniform(-self.jitter, self.jitter), 0))
+
+    def error_for(self, kind):
+        """Status code to answer with instead of the real response, or None"""
+        if kind in self.down:
+            self._count(f"{kind}_down")
+            return 503
+        if kind != KIND_ICON and self._roll(self.error_rate):
+            with self._lock:
+                status = self._rng.choice(self.error_statuses)
+            self._count(f"http_{status}")
+            return status
+        return None
+
+    def drop_after(self, size):
+        """Byte offset at which to reset an archive transfer, or None"""
+        if self._roll(self.drop_rate):
+            self._count("dropped")
+            return int(size * self._uniform(0.05, 0.95))
+        return None
+
+    def corruption(self, size):
+        """("truncate", new_size) or ("flip", offset) for a corrupted archive, or None"""
+        if not self._roll(self.corrupt_rate):
+            return None
+        with self._lock:
+            mode = self._rng.choice(("truncate", "flip"))
+            point = int(size * self._rng.uniform(0.2, 0.8))
+        self._count(f"corrupt_{mode}")
+        return mode, point
+
+    def describe(self):
+        parts = []
+        if self.latency or self.jitter:
+            parts.append(f"latency {self.latency * 1000:.0f}±{self.jitter * 1000:.0f}ms")
+        if self.bandwidth:
+            parts.append(f"{self.bandwidth / (1024 * 1024):.1f} MB/s per connection")
+        if self.error_rate:
+            statuses = "/".join(str(s) for s in self.error_statuses)
+            parts.append(f"{self.error_rate:.0%} {statuses}")
+        if self.drop_rate:
+            parts.append(f"{self.drop_rate:.0%} resets")
+        if self.corrupt_rate:
+            parts.append(f"{self.corrupt_rate:.0%} corrupt zips")
+        if self.down:
+            parts.append("down: " + ",".join(sorted(self.down)))
+        return ", ".join(parts) or "no faults"
+
+
+def _profiles():
+    return {
+        "clean": dict(),
+        "slow": dict(latency=0.25, jitter=0.1, bandwidth=2 * 1024 * 1024),
+        "rate_limited": dict(error_rate=0.3, error_statuses=(429,), retry_after=1),
+        "flaky": dict(error_rate=0.15, error_statuses=(500, 502, 503), drop_rate=0.1),
+        "corrupt": dict(corrupt_rate=0.2),
+        "api_down": dict(down=(KIND_API,)),
+        "hostile": dict(latency=0.15, jitter=0.1, bandwidth=4 * 1024 * 1024, error_rate=0.1,
+                        error_statuses=(429, 503), retry_after=1, drop_rate=0.05, corrupt_rate=0.05),
+    }
+
+
+PROFILE_NAMES = tuple(_profiles())
+
+
+def get_profile(name, seed=1):
+    """Build a fresh FaultProfile by name (fresh, so injected counts start at zero)"""
+    try:
+        options = _profiles()[name]
+    except KeyError:
+        raise ValueError(f"Unknown fault profile {name!r}; choose from {', '.join(PROFILE_NAMES)}")
+    return FaultProfile(name=name, seed=seed, **options)
@@ -0,0 +1,286 @@
+"""Memory budget checks for the mod browser's catalog and icon state.
+
+Loads a synthetic catalog through the browser (fetched over HTTP from the
+stand-in, like refresh_mod_browser does), clicks through --clicks mods so
+icons are fetched and cached, and traces Python allocations with tracemalloc.
+Each catalog size runs in a fresh child process. A size fails when
+
+    peak traced memory      > base_mb + peak_mb_per_1k * packages / 1000
+    retained traced memory  > base_mb + retained_mb_per_1k * packages / 1000
+    cached icons            > max_cached_icons
+
+and the report then lists the allocation sites that grew the most.
+
+    python benchmarks/memory_budget.py
+    python benchmarks/memory_budget.py --sizes 1000 10000 50000 --clicks 100 --budgets budgets.json
+
+Exits 1 when any size is over budget, 2 when no display can be found
+(tests/test_memory_budget.py checks the same budgets without a display). Tk
+image data and Treeview tag strings live in Tcl's heap, which tracemalloc
+cannot see; rss_delta_mb is reported alongside for those.
+"""
+import gc
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import linecache
+import subprocess
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from standin_server import Catalog, StandinServer  # noqa: E402
+from bench_browser import current_rss_bytes, isolated_appdata, start_virtual_display  # noqa: E402
+
+
+DEFAULT_BUDGETS = {
+    "base_mb": 8.0,
+    "peak_mb_per_1k": 24.0,
+    "retained_mb_per_1k": 12.0,
+    "max_cached_icons": 64,
+}
+TRACE_FRAMES = 10
+TOP_SITES = 15
+ICON_WAIT_SECONDS = 2.0
+
+
+def budget_for(size, budgets):
+    """Peak and retained limits in bytes for a catalog of size packages"""
+    mb = 1024 * 1024
+    return {
+        "peak_bytes": int((budgets["base_mb"] + budgets["peak_mb_per_1k"] * size / 1000) * mb),
+        "retained_bytes": int((budgets["base_mb"] + budgets["retained_mb_per_1k"] * size / 1000) * mb),
+        "max_cached_icons": budgets["max_cached_icons"],
+    }
+
+
+def budget_failures(size, peak_growth, retained, cached_icons, budgets):
+    """Why a catalog of size packages is over budget; empty when it is within"""
+    limits = budget_for(size, budgets)
+    mb = 1024 * 1024
+    failures = []
+    if peak_growth > limits["peak_bytes"]:
+        failures.append(f"peak {peak_growth / mb:.1f}MB > budget {limits['peak_bytes'] / mb:.1f}MB")
+    if retained > limits["retained_bytes"]:
+        failures.append(f"retained {retained / mb:.1f}MB > budget {limits['retained_bytes'] / mb:.1f}MB")
+    if cached_icons > limits["max_cached_icons"]:
+        failures.append(f"{cached_icons} cached icons > budget {limits['max_cached_icons']}")
+    return failures
+
+
+def top_sites(snapshot, baseline, limit=TOP_SITES):
+    """Allocation sites that grew most since baseline, with the line of source"""
+    filters = [tracemalloc.Filter(False, "<frozen *"), tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = snapshot.filter_traces(filters).compare_to(baseline.filter_traces(filters), "lineno")
+    sites = []
+    for stat in diff[:limit]:
+        frame = stat.traceback[0]
+        sites.append({
+            "site": f"{os.path.relpath(frame.filename, ROOT) if frame.filename.startswith(ROOT) else frame.filename}:{frame.lineno}",
+            "code": linecache.getline(frame.filename, frame.lineno).strip(),
+            "size_diff_bytes": stat.size_diff,
+            "count_diff": stat.count_diff,
+        })
+    return sites
+
+
+def state_breakdown(app):
+    """What the browser is holding: catalog records, tag JSON and cached icons"""
+    versions = sum(len(mod.get("versions", [])) for mod in app.current_mods)
+    tag_bytes = 0
+    for item in app.mod_tree.get_children():
+        tag_bytes += sum(len(str(tag)) for tag in app.mod_tree.item(item, "tags"))
+    icon_pixels = sum(img.width() * img.height() for img in app.current_mod_images.values())
+    return {
+        "current_mods": len(app.current_mods),
+        "current_mods_versions": versions,
+        "tree_rows": len(app.mod_tree.get_children()),
+        "tree_tag_bytes": tag_bytes,
+        "cached_icons": len(app.current_mod_images),
+        "cached_icon_bytes": icon_pixels * 4,
+    }
+
+
+def run_once(size, clicks, versions, seed, budgets):
+    """Load, click through and measure one catalog in this process"""
+    import tkinter as tk
+    import requests
+
+    appdata = isolated_appdata()
+    import WebLoader
+
+    catalog = Catalog.generate(size, archive_size=0, versions=versions, seed=seed, realistic_versions=True)
+    try:
+        with StandinServer(catalog, seed=seed) as server:
+            listing_url = f"{server.base_url}/c/webfishing/api/v1/package/"
+
+            class BudgetManager(WebLoader.WebFishingModManager):
+                def refresh_mod_browser(self):
+                    response = requests.get(listing_url, timeout=60)
+                    response.raise_for_status()
+                    self.current_mods = response.json()
+                    self.search_mods()
+
+            root = tk.Tk()
+            root.update()
+            gc.collect()
+            rss_before = current_rss_bytes()
+            tracemalloc.start(TRACE_FRAMES)
+            baseline = tracemalloc.take_snapshot()
+            baseline_bytes = tracemalloc.get_traced_memory()[0]
+
+            app = BudgetManager(root)
+            root.update()
+
+            rng = random.Random(seed)
+            rows = app.mod_tree.get_children()
+            for item in rng.sample(rows, min(clicks, len(rows))):
+                app.mod_tree.selection_set(item)
+                app.mod_tree.see(item)
+                root.update()
+                icon_url = json.loads(app.mod_tree.item(item, "tags")[1])["versions"][0].get("icon")
+                deadline = time.monotonic() + ICON_WAIT_SECONDS
+                while icon_url and icon_url not in app.current_mod_images and time.monotonic() < deadline:
+                    root.update()
+                    time.sleep(0.01)
+            root.update()
+
+            gc.collect()
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            rss_after = current_rss_bytes()
+            state = state_breakdown(app)
+            root.destroy()
+    finally:
+        shutil.rmtree(appdata, ignore_errors=True)
+
+    limits = budget_for(size, budgets)
+    retained = current - baseline_bytes
+    peak_growth = peak - baseline_bytes
+    failures = budget_failures(size, peak_growth, retained, state["cached_icons"], budgets)
+
+    return {
+        "packages": size,
+        "clicks": min(clicks, len(rows)),
+        "peak_bytes": peak_growth,
+        "retained_bytes": retained,
+        "rss_delta_mb": round((rss_after - rss_before) / 1024 / 1024, 1) if rss_before is not None else None,
+        "limits": limits,
+        "state": state,
+        "failures": failures,
+        "top_sites": top_sites(snapshot, baseline),
+    }
+
+
+def run_child(size, clicks, versions, seed, budgets):
+    """Run one catalog size in a fresh interpreter and parse its JSON result"""
+    payload = json.dumps({"size": size, "clicks": clicks, "versions": versions, "seed": seed, "budgets": budgets})
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child"],
+        input=payload, capture_output=True, text=True, check=False
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"memory check child failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def format_report(result):
+    mb = 1024 * 1024
+    status = "FAIL" if result["failures"] else "ok"
+    lines = [
+        f"{status:<4} packages={result['packages']:<6} clicks={result['clicks']:<4} "
+        f"peak={result['peak_bytes'] / mb:>7.1f}MB/{result['limits']['peak_bytes'] / mb:.0f}MB "
+        f"retained={result['retained_bytes'] / mb:>7.1f}MB/{result['limits']['retained_bytes'] / mb:.0f}MB "
+        f"icons={result['state']['cached_icons']}/{result['limits']['max_cached_icons']} "
+        f"rss_delta={result['rss_delta_mb']}MB"
+    ]
+    if result["failures"]:
+        for failure in result["failures"]:
+            lines.append(f"     {failure}")
+        state = result["state"]
+        lines.append(
+            f"     state: {state['current_mods']} mods with {state['current_mods_versions']} versions, "
+            f"{state['tree_rows']} rows carrying {state['tree_tag_bytes'] / mb:.1f}MB of tags, "
+            f"{state['cached_icons']} icons ({state['cached_icon_bytes'] / mb:.1f}MB of pixels)"
+        )
+        lines.append("     top allocation sites since load:")
+        for site in result["top_sites"]:
+            lines.append(
+                f"     {site['size_diff_bytes'] / 1024:>10.1f} KiB {site['count_diff']:>8} blocks  "
+                f"{site['site']}  {site['code']}"
+            )
+    return "\n".join(lines)
+
+
+def load_budgets(path):
+    budgets = dict(DEFAULT_BUDGETS)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        unknown = set(overrides) - set(DEFAULT_BUDGETS)
+        if unknown:
+            raise ValueError(f"unknown budget keys: {', '.join(sorted(unknown))}")
+        budgets.update(overrides)
+    return budgets
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Check browser memory against budgets")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Catalog sizes (packages)")
+    parser.add_argument("--clicks", type=int, default=100, help="Mods to click through per catalog")
+    parser.add_argument("--versions", type=int, default=5, help="Mean versions per package")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--budgets", metavar="PATH", help="JSON file overriding " + ", ".join(DEFAULT_BUDGETS))
+    parser.add_argument("--json", metavar="PATH", help="Also write all results to PATH")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.child:
+        request = json.loads(sys.stdin.read())
+        result = run_once(request["size"], request["clicks"], request["versions"], request["seed"], request["budgets"])
+        print(json.dumps(result))
+        return 0
+
+    try:
+        budgets = load_budgets(args.budgets)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    display = None
+    if not os.environ.get("DISPLAY"):
+        try:
+            display = start_virtual_display()
+        except RuntimeError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+
+    results = []
+    try:
+        for size in args.sizes:
+            result = run_child(size, args.clicks, args.versions, args.seed, budgets)
+            results.append(result)
+            print(format_report(result))
+    finally:
+        if display:
+            display.terminate()
+            display.wait()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"budgets": budgets, "results": results}, f, indent=2)
+    return 1 if any(r["failures"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
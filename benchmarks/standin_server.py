@@ -0,0 +1,384 @@
+"""Local stand-in for the parts of thunderstore.io that WebLoader talks to.
+
+Serves, for a synthetic catalog:
+
+    /c/webfishing/api/v1/package/            package listing (mod browser)
+    /api/v1/package/<Author>/<Name>/         package JSON (engine resolve)
+    /c/webfishing/p/<Author>/<Name>/         mod page HTML (scrape fallback)
+    /package/download/<Author>/<Name>/<v>/   generated zip archive
+    /icons/<Author>-<Name>.png               tiny icon
+
+Archives are written once to a temp directory and streamed from disk, so
+large catalogs do not live in memory; "Range: bytes=N-" requests get the
+rest of an archive (206) unless ranges=False. A FaultProfile (benchmarks/faults.py)
+can make the server slow, rate-limited, flaky or corrupting.
+
+    python benchmarks/standin_server.py --mods 20 --size-mb 2 --port 8765
+    python benchmarks/standin_server.py --profile flaky
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import struct
+import zipfile
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import faults as fault_profiles
+
+
+WORDS = ("Reel", "Lure", "Bait", "Tackle", "Skate", "Chat", "Hat", "Horns", "Faces", "Weed",
+         "Boat", "Rod", "Hook", "Net", "Float", "Cosmetics", "API", "Fix", "Plus", "Tweaks")
+
+# 1x1 transparent PNG
+ICON_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000100ffff03000006000557bfabd4"
+    "0000000049454e44ae426082"
+)
+
+
+class Catalog:
+    """A synthetic set of packages shaped like the Thunderstore v1 API"""
+
+    def __init__(self, packages, archive_size):
+        self.packages = packages
+        self.archive_size = archive_size
+        self.by_full_name = {p["full_name"]: p for p in packages}
+
+    @classmethod
+    def generate(cls, count, archive_size=256 * 1024, versions=3, seed=1, dependency_rate=0.3,
+                 realistic_versions=False):
+        """Build count packages. With realistic_versions, version counts follow a long tail
+        (most packages have a handful, a few have dozens) with versions as the mean."""
+        rng = random.Random(seed)
+        base_date = datetime(2024, 10, 1)
+        packages = []
+        for i in range(count):
+            owner = f"Author{i % max(count // 3, 1)}"
+            name = f"{rng.choice(WORDS)}{rng.choice(WORDS)}{i}"
+            full_name = f"{owner}-{name}"
+            created = base_date + timedelta(hours=rng.randint(0, 24 * 300))
+            version_count = versions
+            if realistic_versions:
+                version_count = min(1 + int(rng.expovariate(1 / max(versions - 1, 1))), 60)
+            version_list = []
+            for v in range(version_count, 0, -1):
+                version_number = f"1.{v - 1}.0"
+                dependencies = ["NotNet-GDWeave-2.0.0"]
+                if packages and rng.random() < dependency_rate:
+                    dep = rng.choice(packages)
+                    dependencies.append(f"{dep['full_name']}-{dep['versions'][0]['version_number']}")
+                version_list.append({
+                    "name": name,
+                    "full_name": f"{full_name}-{version_number}",
+                    "description": " ".join(rng.choice(WORDS).lower() for _ in range(rng.randint(8, 30))),
+                    "icon": f"/icons/{full_name}.png",
+                    "version_number": version_number,
+                    "dependencies": dependencies,
+                    "download_url": f"/package/download/{owner}/{name}/{version_number}/",
+                    "downloads": rng.randint(0, 50000),
+                    "date_created": (created + timedelta(days=v)).isoformat() + "Z",
+                    "website_url": "",
+                    "is_active": True,
+                    "uuid4": f"{seed:08x}-{i:04x}-{v:04x}-0000-000000000000",
+                    "file_size": archive_size,
+                })
+            packages.append({
+                "name": name,
+                "full_name": full_name,
+                "owner": owner,
+                "package_url": f"/c/webfishing/p/{owner}/{name}/",
+                "date_created": created.isoformat() + "Z",
+                "date_updated": version_list[0]["date_created"],
+                "uuid4": f"{seed:08x}-{i:04x}-0000-0000-000000000000",
+                "rating_score": rng.randint(0, 500),
+                "is_pinned": False,
+                "is_deprecated": False,
+                "has_nsfw_content": False,
+                "categories": [rng.choice(("Mods", "Cosmetics", "Libraries", "Tools"))],
+                "downloads": sum(v["downloads"] for v in version_list),
+                "versions": version_list,
+            })
+        return cls(packages, archive_size)
+
+    def absolute(self, base_url):
+        """Copy of the packages with URLs pointing at base_url"""
+        data = json.loads(json.dumps(self.packages))
+        for package in data:
+            package["package_url"] = base_url + package["package_url"]
+            for version in package["versions"]:
+                version["icon"] = base_url + version["icon"]
+                version["download_url"] = base_url + version["download_url"]
+        return data
+
+
+def build_archive(path, owner, name, size, seed):
+    """Write a GDWeave-style mod zip with roughly size bytes of incompressible payload"""
+    rng = random.Random(f"{seed}-{owner}-{name}")
+    manifest = {"Id": f"{owner}.{name}", "AssemblyPath": f"{name}.dll", "Dependencies": []}
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+        archive.writestr(f"GDWeave/mods/{name}/manifest.json", json.dumps(manifest))
+        archive.writestr(f"GDWeave/mods/{name}/{name}.dll", rng.randbytes(max(size - 512, 1)))
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = "ThunderstoreStandin/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        standin = self.server.standin
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        standin.count_request()
+
+        if parts[:5] == ["c", "webfishing", "api", "v1", "package"]:
+            kind = fault_profiles.KIND_LISTING
+        elif parts[:3] == ["api", "v1", "package"] and len(parts) >= 5:
+            kind = fault_profiles.KIND_API
+        elif parts[:3] == ["c", "webfishing", "p"] and len(parts) >= 5:
+            kind = fault_profiles.KIND_PAGE
+        elif parts[:2] == ["package", "download"] and len(parts) >= 5:
+            kind = fault_profiles.KIND_ARCHIVE
+        elif parts[:1] == ["icons"]:
+            kind = fault_profiles.KIND_ICON
+        else:
+            return self.send_error(404)
+
+        try:
+            faults = standin.faults
+            if faults is not None:
+                faults.delay()
+                status = faults.error_for(kind)
+                if status:
+                    return self.send_fault(status, faults.retry_after)
+
+            if kind == fault_profiles.KIND_LISTING:
+                return self.send_json(standin.listing())
+            if kind == fault_profiles.KIND_API:
+                package = standin.package(parts[3], parts[4])
+                return self.send_json(package) if package else self.send_error(404)
+            if kind == fault_profiles.KIND_PAGE:
+                package = standin.package(parts[3], parts[4])
+                return self.send_page(package) if package else self.send_error(404)
+            if kind == fault_profiles.KIND_ARCHIVE:
+                path = standin.archive_path(parts[2], parts[3], parts[4])
+                return self.send_file(path) if path else self.send_error(404)
+            return self.send_bytes(ICON_PNG, "image/png")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def send_fault(self, status, retry_after=None):
+        body = json.dumps({"detail": "Injected fault"}).encode("utf-8")
+        self.send_response(status)
+        if retry_after is not None and status in (429, 503):
+            self.send_header("Retry-After", str(retry_after))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, data):
+        self.send_bytes(json.dumps(data).encode("utf-8"), "application/json")
+
+    def send_page(self, package):
+        latest = package["versions"][0]
+        body = (
+            "<html><head><title>{name}</title></head><body>"
+            "<h1>{name}</h1><p>{description}</p>"
+            '<a class="button" href="{download}">Manual Download</a>'
+            '<script>var pkg = {{"version_number":"{version}"}};</script>'
+            "</body></html>"
+        ).format(name=package["name"], description=latest["description"],
+                 download=latest["download_url"], version=latest["version_number"])
+        self.send_bytes(body.encode("utf-8"), "text/html; charset=utf-8")
+
+    def send_bytes(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.standin.count_bytes(len(body))
+
+    def range_start(self, size):
+        """Offset asked for by a "Range: bytes=N-" header, or 0"""
+        value = self.headers.get("Range", "")
+        if not self.server.standin.ranges or not value.startswith("bytes=") or not value.endswith("-"):
+            return 0
+        try:
+            start = int(value[len("bytes="):-1])
+        except ValueError:
+            return 0
+        return start if 0 < start < size else 0
+
+    def send_file(self, path):
+        size = os.path.getsize(path)
+        faults = self.server.standin.faults
+        drop_at = flip_at = None
+        length = size
+        if faults is not None:
+            drop_at = faults.drop_after(size)
+            corruption = faults.corruption(size)
+            if corruption and corruption[0] == "truncate":
+                length = corruption[1]
+            elif corruption:
+                flip_at = corruption[1]
+
+        start = self.range_start(length)
+        if drop_at is not None and drop_at <= start:
+            drop_at = None
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Content-Length", str(length - start))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{length - 1}/{length}")
+        self.end_headers()
+
+        block = 64 * 1024
+        bandwidth = faults.bandwidth if faults is not None else None
+        sent = start
+        started = time.monotonic()
+        with open(path, "rb") as f:
+            f.seek(start)
+            while sent < length:
+                chunk = f.read(min(block, length - sent))
+                if not chunk:
+                    break
+                if flip_at is not None and sent <= flip_at < sent + len(chunk):
+                    chunk = bytearray(chunk)
+                    chunk[flip_at - sent] ^= 0xFF
+                    chunk = bytes(chunk)
+                if drop_at is not None and sent + len(chunk) > drop_at:
+                    self.wfile.write(chunk[:drop_at - sent])
+                    self.server.standin.count_bytes(drop_at - sent)
+                    return self.reset_connection()
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                self.server.standin.count_bytes(len(chunk))
+                if bandwidth:
+                    ahead = (sent - start) / bandwidth - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+
+    def reset_connection(self):
+        """Abort the connection with a TCP RST, like a proxy or CDN dropping it"""
+        self.wfile.flush()
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        self.connection.close()
+        self.close_connection = True
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """Does not print a traceback when a client drops its connection (paused or cancelled downloads)"""
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class StandinServer:
+    """Run the stand-in on a background thread; use as a context manager"""
+
+    def __init__(self, catalog, host="127.0.0.1", port=0, seed=1, faults=None, handler=StandinHandler, ranges=True):
+        self.catalog = catalog
+        self.seed = seed
+        self.faults = faults
+        self.ranges = ranges
+        self.archive_dir = tempfile.mkdtemp(prefix="standin_archives_")
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.httpd = QuietHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.standin = self
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._packages = self.catalog.absolute(self.base_url)
+        self._by_key = {(p["owner"], p["name"]): p for p in self._packages}
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def count_bytes(self, n):
+        with self._lock:
+            self.bytes_sent += n
+
+    def listing(self):
+        return self._packages
+
+    def package(self, owner, name):
+        return self._by_key.get((owner, name))
+
+    def archive_path(self, owner, name, version):
+        if (owner, name) not in self._by_key:
+            return None
+        path = os.path.join(self.archive_dir, f"{owner}-{name}-{version}.zip")
+        with self._lock:
+            if not os.path.exists(path):
+                build_archive(path, owner, name, self.catalog.archive_size, self.seed)
+        return path
+
+    def prepare_archives(self):
+        """Build every latest-version archive up front so runs measure transfer, not generation"""
+        for package in self.catalog.packages:
+            self.archive_path(package["owner"], package["name"], package["versions"][0]["version_number"])
+
+    def mod_urls(self, count=None):
+        """thunderstore.io-style page URLs for the first count packages"""
+        packages = self.catalog.packages[:count]
+        return [f"https://thunderstore.io/c/webfishing/p/{p['owner']}/{p['name']}/" for p in packages]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a synthetic Thunderstore catalog")
+    parser.add_argument("--mods", type=int, default=20)
+    parser.add_argument("--size-mb", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--profile", choices=fault_profiles.PROFILE_NAMES, default="clean",
+                        help="Fault profile to apply (default: clean)")
+    args = parser.parse_args(argv)
+
+    catalog = Catalog.generate(args.mods, int(args.size_mb * 1024 * 1024), seed=args.seed)
+    faults = fault_profiles.get_profile(args.profile, seed=args.seed)
+    server = StandinServer(catalog, port=args.port, seed=args.seed, faults=faults)
+    print(f"Serving {args.mods} packages at {server.base_url} [{args.profile}: {faults.describe()}] "
+          "(Ctrl+C to stop)", file=sys.stderr)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
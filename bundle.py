@@ -0,0 +1,204 @@
+"""Offline install bundles: a preset, its dependency closure and every archive in one file.
+
+A bundle is a zip file (members stored uncompressed; the archives are zips
+already) laid out as:
+
+    bundle.json                         index: name, the pinned preset, and
+                                        per mod the member path, size, sha256
+    archives/<Author-Name-version>.zip  one per mod, dependencies included
+
+bundle.json's "preset" is an ordinary lockfile (see lockfile.py), so a
+bundle carries exact versions and hashes. Installing from a bundle
+(ModEngine with bundle=Bundle) copies each archive out of the file,
+checking its SHA-256, and never talks to Thunderstore.
+
+    export_bundle(engine, "event.wlbundle", mod_urls=urls, name="LAN party")
+    with Bundle("event.wlbundle") as b:
+        ModEngine("mods", bundle=b).run_locked(b.lockfile)
+"""
+import os
+import json
+import shutil
+import hashlib
+import zipfile
+import tempfile
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import lockfile
+import metrics
+from engine import EngineError, PresetError
+from transfer import TransferResult
+
+
+BUNDLE_EXTENSION = ".wlbundle"
+BUNDLE_INDEX = "bundle.json"
+ARCHIVE_DIR = "archives"
+FORMAT_VERSION = 1
+COPY_BUFFER = 1024 * 1024
+
+
+class BundleError(EngineError):
+    """A bundle is missing, unreadable or does not match its index"""
+
+
+def member_name(mod):
+    return f"{ARCHIVE_DIR}/{mod.filename}"
+
+
+def write_bundle(path, locked, archive_dir):
+    """Pack locked (a lockfile.Lockfile) and its archives from archive_dir into a bundle at path"""
+    index = {
+        "format_version": FORMAT_VERSION,
+        "name": locked.name,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "created_by": "WebFishing Mod Manager",
+        "preset": locked.to_dict(),
+        "archives": {mod.full_name: {"path": member_name(mod), "size": mod.size, "sha256": mod.sha256}
+                     for mod in locked.mods},
+    }
+    tmp_path = path + ".tmp"
+    try:
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED, allowZip64=True) as bundle:
+            bundle.writestr(BUNDLE_INDEX, json.dumps(index, indent=2))
+            for mod in locked.mods:
+                bundle.write(os.path.join(archive_dir, mod.filename), member_name(mod))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise BundleError(f"Could not write bundle {path}: {str(e)}") from e
+    return index
+
+
+def export_bundle(engine, path, mod_urls=(), locked=None, name=None):
+    """Resolve mod_urls (or take locked as is), download every archive and write a bundle; returns the Lockfile.
+
+    A lockfile's archives are checked against its hashes as they are downloaded.
+    """
+    staging = tempfile.mkdtemp(prefix="webloader_bundle_", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        if locked is None:
+            locked = lockfile.lock(engine, mod_urls, name or os.path.splitext(os.path.basename(path))[0],
+                                   archive_dir=staging)
+        else:
+            fetch_locked(engine, locked, staging)
+            if name:
+                locked.name = name
+        engine.log(f"📦 Writing {len(locked.mods)} archives to {path}...", "info")
+        write_bundle(path, locked, staging)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return locked
+
+
+def fetch_locked(engine, locked, archive_dir):
+    """Download a lockfile's archives into archive_dir as LockedMod.filename, verifying and CRC-checking each.
+
+    Raises EngineError naming every mod that failed.
+    """
+    plan = {entry.key: entry for entry in engine.plan_locked(locked)}
+
+    def fetch(mod):
+        entry = plan[mod.full_name]
+        record = metrics.ModMetrics(mod.full_name)
+        record.version = mod.version
+        # The locked resolution's filename is LockedMod.filename already
+        try:
+            zip_path = engine.fetch(mod.full_name, entry.resolution, archive_dir, record, mod.sha256, mod.size)
+            engine.verify(zip_path, record, mod.sha256, mod.size)
+            engine.test_archive(zip_path)
+        except EngineError as e:
+            return f"{mod.full_name}: {str(e)}"
+        engine.publish_archive(mod.full_name, zip_path, record)
+        return None
+
+    with ThreadPoolExecutor(max_workers=engine.jobs) as pool:
+        failures = [error for error in pool.map(fetch, locked.mods) if error]
+    if failures:
+        raise EngineError("Could not fetch " + "; ".join(failures))
+
+
+class Bundle:
+    """An open bundle file: its index, its Lockfile and its archives"""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            self._zip = zipfile.ZipFile(path, "r")
+        except (OSError, zipfile.BadZipFile) as e:
+            raise BundleError(f"Not a WebLoader bundle: {path} ({str(e)})") from e
+        try:
+            self.index = json.loads(self._zip.read(BUNDLE_INDEX).decode("utf-8"))
+            if self.index.get("format_version") != FORMAT_VERSION:
+                raise BundleError(f"Unsupported bundle format in {path}")
+            self.lockfile = lockfile.from_dict(self.index.get("preset"), self.index.get("name", "Bundle"))
+        except (KeyError, ValueError, PresetError, AttributeError) as e:
+            self._zip.close()
+            raise BundleError(f"Invalid bundle index in {path}: {str(e)}") from e
+        if self.lockfile is None:
+            self._zip.close()
+            raise BundleError(f"Bundle {path} has no pinned preset")
+        self.archives = self.index.get("archives", {})
+
+    @property
+    def name(self):
+        return self.lockfile.name
+
+    @property
+    def total_size(self):
+        return sum(entry.get("size", 0) for entry in self.archives.values())
+
+    def __contains__(self, full_name):
+        return full_name in self.archives
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def extract(self, full_name, dest_path, on_progress=None):
+        """Copy a mod's archive to dest_path, checking size and SHA-256; returns a TransferResult"""
+        entry = self.archives.get(full_name)
+        if entry is None:
+            raise BundleError(f"{full_name} is not in the bundle")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with self._zip.open(entry["path"]) as source, open(dest_path, "wb") as dest:
+                while True:
+                    chunk = source.read(COPY_BUFFER)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                    if on_progress is not None:
+                        on_progress(size, entry.get("size", 0))
+        except (KeyError, OSError, zipfile.BadZipFile) as e:
+            raise BundleError(f"Could not read {full_name} from the bundle: {str(e)}") from e
+        result = TransferResult(size, digest.hexdigest(), entry.get("size", 0))
+        if result.sha256 != entry.get("sha256") or size != entry.get("size"):
+            os.remove(dest_path)
+            raise BundleError(f"{full_name} in the bundle does not match its index (damaged bundle?)")
+        return result
+
+    def verify(self):
+        """full_names whose archives are missing or do not match the index"""
+        bad = []
+        for full_name, entry in self.archives.items():
+            digest = hashlib.sha256()
+            try:
+                with self._zip.open(entry["path"]) as source:
+                    for chunk in iter(lambda: source.read(COPY_BUFFER), b""):
+                        digest.update(chunk)
+            except (KeyError, OSError, zipfile.BadZipFile):
+                bad.append(full_name)
+                continue
+            if digest.hexdigest() != entry.get("sha256"):
+                bad.append(full_name)
+        return bad
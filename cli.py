@@ -0,0 +1,541 @@
+"""Headless command-line installer.
+
+    python WebLoader.py install --preset Testpreset.json --dest <mods dir> --jobs 8
+    python cli.py install --url https://thunderstore.io/c/webfishing/p/Author/Mod/ --dest mods
+    python cli.py install --preset Testpreset.json --dest mods --limit-rate 2M --limit-per-download 512K
+    python cli.py install --preset Testpreset.json --dest mods --mirror http://192.168.1.20:8080
+    python cli.py install --preset Testpreset.json --dest mods --artifact-cache /mnt/team/webloader-cache
+    python cli.py apply --preset Testpreset.json --dest mods [--remove-extras] [--dry-run]
+    python cli.py lock --preset Testpreset.json --out Testpreset.lock.json
+    python cli.py bundle export --preset Testpreset.json --out Testpreset.wlbundle
+    python cli.py bundle info Testpreset.wlbundle [--verify]
+    python cli.py install --bundle Testpreset.wlbundle --dest mods
+    python cli.py rollback --dest mods --mod Author-Mod [--list] [--snapshot NAME]
+    python cli.py rollback --game-folder <WEBFISHING folder>
+    python cli.py profile --dest mods save|switch|delete NAME
+    python cli.py profile --dest mods list|gc
+
+Progress goes to stdout as one JSON object per line; human-readable log lines
+go to stderr. During install and apply, Ctrl+C (or SIGTERM) cancels the batch
+and cleans up its partial files (a second Ctrl+C aborts at once); SIGUSR1
+pauses it and SIGUSR2 resumes it where the platform has them. Exit codes:
+
+    0  every mod installed or already present
+    1  some mods failed
+    2  bad arguments or unreadable preset
+    3  nothing could be installed (all mods failed or a critical error)
+    130 interrupted or cancelled
+"""
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import contextlib
+import dataclasses
+
+import progress_events as events
+import artifacts
+import bundle
+import delta
+import ingest
+import lockfile
+import mirrors
+import scheduler
+import snapshots
+import store
+import throttle
+from control import BatchControl
+from engine import EngineError, ModEngine, PresetError, THUNDERSTORE_URL, load_preset, is_gdweave_url
+
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+EXIT_FAILED = 3
+EXIT_INTERRUPTED = 130
+
+
+class JsonProgressPrinter:
+    """Bus callback that writes events as JSON lines, throttling byte updates"""
+
+    def __init__(self, stream=None, interval=0.5):
+        self.stream = stream or sys.stdout
+        self.interval = interval
+        self._last_bytes = {}
+
+    def __call__(self, event):
+        if isinstance(event, events.BytesTransferred):
+            now = time.monotonic()
+            done = event.total and event.downloaded >= event.total
+            if not done and now - self._last_bytes.get(event.mod, 0) < self.interval:
+                return
+            self._last_bytes[event.mod] = now
+        self.write(type(event).__name__, dataclasses.asdict(event))
+
+    def write(self, name, payload):
+        line = json.dumps({"event": name, **payload}, ensure_ascii=False)
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+
+@contextlib.contextmanager
+def batch_signals(control, log):
+    """Route Ctrl+C/SIGTERM to control.cancel() and SIGUSR1/SIGUSR2 to pause/resume while the block runs"""
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def cancel(signum, frame):
+        if control.cancelled:
+            raise KeyboardInterrupt
+        log("⏹️ Cancelling; press Ctrl+C again to stop at once", "warning")
+        control.cancel()
+
+    handlers = {signal.SIGINT: cancel, signal.SIGTERM: cancel}
+    if hasattr(signal, "SIGUSR1"):
+        handlers[signal.SIGUSR1] = lambda signum, frame: control.pause()
+        handlers[signal.SIGUSR2] = lambda signum, frame: control.resume()
+    previous = {signum: signal.signal(signum, handler) for signum, handler in handlers.items()}
+    try:
+        yield
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+
+def add_transfer_arguments(parser):
+    parser.add_argument("--limit-rate", type=throttle.parse_rate, default=0, metavar="RATE",
+                        help="Total download bandwidth, e.g. 500K or 2M bytes/s (default: unlimited)")
+    parser.add_argument("--limit-per-download", type=throttle.parse_rate, default=0, metavar="RATE",
+                        help="Bandwidth of each download (default: unlimited)")
+    parser.add_argument("--schedule", choices=scheduler.SCHEDULES, default=scheduler.SCHEDULE_SMALL_FIRST,
+                        help="Download order: dependencies and small archives first, or list order "
+                             "(default: %(default)s)")
+    parser.add_argument("--mirror", action="append", default=[], dest="mirrors", metavar="URL",
+                        help="Archive mirror or caching proxy, tried by measured speed before download_url "
+                             "(repeatable)")
+    parser.add_argument("--mirror-cache", default=mirrors.default_cache_path(), metavar="PATH",
+                        help="Where mirror measurements are kept (default: %(default)s)")
+    add_cache_arguments(parser)
+
+
+def add_cache_arguments(parser):
+    parser.add_argument("--artifact-cache", default=os.getenv("WEBLOADER_ARTIFACT_CACHE"), metavar="LOCATION",
+                        help="Shared archive cache checked before Thunderstore: a directory, an http(s) URL or "
+                             "s3://bucket/prefix?endpoint=URL (default: $WEBLOADER_ARTIFACT_CACHE)")
+    parser.add_argument("--no-publish", action="store_true",
+                        help="Read from the artifact cache but do not upload new archives to it "
+                             "(damaged entries are still deleted)")
+
+
+def mirror_set(args, log):
+    """The MirrorSet for --mirror, or None without mirrors"""
+    if not args.mirrors:
+        return None
+    return mirrors.MirrorSet(args.mirrors, args.mirror_cache, log=log)
+
+
+def artifact_cache(args, log):
+    """The ArtifactCache for --artifact-cache, or None without one"""
+    if not args.artifact_cache:
+        return None
+    return artifacts.ArtifactCache(args.artifact_cache, publish=not args.no_publish, log=log)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="WebLoader", description="WebFishing mod manager")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    install = commands.add_parser("install", help="Download and install mods without the GUI")
+    install.add_argument("--preset", action="append", default=[],
+                         help="Preset JSON file with mod_urls (repeatable)")
+    install.add_argument("--url", action="append", default=[],
+                         help="Thunderstore mod page URL (repeatable)")
+    install.add_argument("--list", action="append", default=[], dest="lists",
+                         help="Text file of URLs or Author-Name entries, or an r2modman .r2z export (repeatable)")
+    install.add_argument("--bundle", help="Install from an offline bundle instead of Thunderstore")
+    install.add_argument("--dest", required=True, help="Mods folder to install into")
+    install.add_argument("--jobs", type=int, default=4, help="Mods processed in parallel (default: 4)")
+    install.add_argument("--base-url", default=THUNDERSTORE_URL,
+                         help="Thunderstore base URL (default: %(default)s)")
+    install.add_argument("--retry-passes", type=int, default=1,
+                         help="Extra passes over mods that failed (default: 1)")
+    install.add_argument("--snapshot-keep", type=int, default=5,
+                         help="Snapshots kept per mod folder before a reinstall replaces it; 0 disables (default: 5)")
+    install.add_argument("--ignore-lock", action="store_true",
+                         help="Resolve the latest versions even when a preset is a lockfile")
+    install.add_argument("--store", action="store_true",
+                         help="Link installed files from the shared file store instead of copying them")
+    install.add_argument("--quiet", action="store_true", help="Do not print log lines to stderr")
+    install.add_argument("--progress-interval", type=float, default=0.5,
+                         help="Seconds between byte progress lines per mod (default: 0.5)")
+    add_transfer_arguments(install)
+
+    apply = commands.add_parser("apply", help="Install only the mods that differ between a preset and a mods folder")
+    apply.add_argument("--preset", action="append", default=[], required=True,
+                       help="Preset or lockfile JSON (repeatable)")
+    apply.add_argument("--dest", required=True, help="Mods folder to update")
+    apply.add_argument("--remove-extras", action="store_true",
+                       help="Remove mods installed by WebLoader that are not in the preset")
+    apply.add_argument("--dry-run", action="store_true", help="Print the plan and change nothing")
+    apply.add_argument("--ignore-lock", action="store_true",
+                       help="Compare against the latest versions even when a preset is a lockfile")
+    apply.add_argument("--jobs", type=int, default=4, help="Mods processed in parallel (default: 4)")
+    apply.add_argument("--base-url", default=THUNDERSTORE_URL,
+                       help="Thunderstore base URL (default: %(default)s)")
+    apply.add_argument("--quiet", action="store_true", help="Do not print log lines to stderr")
+    add_transfer_arguments(apply)
+
+    lock = commands.add_parser("lock", help="Pin mods and their dependencies to exact versions and hashes")
+    lock.add_argument("--preset", action="append", default=[], help="Preset JSON file with mod_urls (repeatable)")
+    lock.add_argument("--url", action="append", default=[], help="Thunderstore mod page URL (repeatable)")
+    lock.add_argument("--out", required=True, help="Lockfile to write")
+    lock.add_argument("--name", help="Preset name stored in the lockfile")
+    lock.add_argument("--jobs", type=int, default=4, help="Archives hashed in parallel (default: 4)")
+    lock.add_argument("--base-url", default=THUNDERSTORE_URL,
+                      help="Thunderstore base URL (default: %(default)s)")
+    add_cache_arguments(lock)
+
+    bundles = commands.add_parser("bundle", help="Pack a preset with every archive into one file for offline installs")
+    bundle_commands = bundles.add_subparsers(dest="bundle_command", required=True)
+    export = bundle_commands.add_parser("export", help="Resolve, download and pack mods and their dependencies")
+    export.add_argument("--preset", action="append", default=[],
+                        help="Preset or lockfile JSON (repeatable); a lockfile is packed as pinned")
+    export.add_argument("--url", action="append", default=[], help="Thunderstore mod page URL (repeatable)")
+    export.add_argument("--out", required=True, help=f"Bundle to write (usually *{bundle.BUNDLE_EXTENSION})")
+    export.add_argument("--name", help="Name stored in the bundle")
+    export.add_argument("--jobs", type=int, default=4, help="Archives downloaded in parallel (default: 4)")
+    export.add_argument("--base-url", default=THUNDERSTORE_URL,
+                        help="Thunderstore base URL (default: %(default)s)")
+    add_cache_arguments(export)
+    info = bundle_commands.add_parser("info", help="Show what a bundle contains")
+    info.add_argument("file", help="Bundle file")
+    info.add_argument("--verify", action="store_true", help="Check every archive against its SHA-256")
+
+    rollback = commands.add_parser("rollback", help="Restore a mod folder or GDWeave from a snapshot")
+    target = rollback.add_mutually_exclusive_group(required=True)
+    target.add_argument("--mod", help="Installed mod folder name (with --dest)")
+    target.add_argument("--game-folder", help="Game folder whose GDWeave install to restore")
+    rollback.add_argument("--dest", help="Mods folder the mod is installed in")
+    rollback.add_argument("--snapshot", help="Snapshot name (default: the newest)")
+    rollback.add_argument("--list", action="store_true", help="List snapshots instead of restoring one")
+    rollback.add_argument("--keep", type=int, default=5, help="Snapshots kept afterwards (default: 5)")
+
+    profile = commands.add_parser("profile", help="Save and switch link-based profiles of a mods folder")
+    profile.add_argument("action", choices=("list", "save", "switch", "delete", "gc"))
+    profile.add_argument("name", nargs="?", help="Profile name (save, switch, delete)")
+    profile.add_argument("--dest", required=True, help="Mods folder the profiles belong to")
+    return parser
+
+
+def read_presets(presets):
+    """(mod_urls, lockfiles) from preset files; lockfiles is empty unless every preset is locked"""
+    mod_urls = []
+    lockfiles = []
+    for preset in presets:
+        try:
+            mod_urls.extend(load_preset(preset))
+            lockfiles.append(lockfile.load_lockfile(preset))
+        except PresetError as e:
+            raise PresetError(f"{preset}: {e}") from e
+    if None in lockfiles:
+        lockfiles = []
+    return mod_urls, lockfiles
+
+
+def run_install(args):
+    if args.bundle and (args.preset or args.url or args.lists):
+        print("error: --bundle cannot be combined with --preset, --url or --list", file=sys.stderr)
+        return EXIT_USAGE
+    if args.bundle:
+        try:
+            with bundle.Bundle(args.bundle) as bundled:
+                return install_mods(args, bundled.lockfile.mod_urls, bundled.lockfile, bundled)
+        except bundle.BundleError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return EXIT_USAGE
+
+    try:
+        mod_urls, lockfiles = read_presets(args.preset)
+    except PresetError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    mod_urls.extend(args.url)
+    try:
+        for path in args.lists:
+            mod_urls.extend(ingest.parse_file(path).urls())
+    except ingest.IngestError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    locked = None
+    if lockfiles and not args.url and not args.lists and not args.ignore_lock:
+        locked = lockfile.merge(lockfiles)
+    return install_mods(args, mod_urls, locked)
+
+
+def install_mods(args, mod_urls, locked, bundled=None):
+    """The install command once its mods are known; bundled (a bundle.Bundle) supplies the archives"""
+    # Keep order, drop duplicates
+    mod_urls = list(dict.fromkeys(url.strip() for url in mod_urls if url.strip()))
+    if not mod_urls and locked is None:
+        print("error: no mods given (use --preset or --url)", file=sys.stderr)
+        return EXIT_USAGE
+
+    gdweave_urls = [url for url in mod_urls if is_gdweave_url(url)]
+    mod_urls = [url for url in mod_urls if url not in gdweave_urls]
+
+    def log(message, msg_type="info"):
+        if not args.quiet:
+            print(message, file=sys.stderr)
+
+    printer = JsonProgressPrinter(interval=args.progress_interval)
+    if gdweave_urls:
+        log("⚠️ GDWeave is installed into the game folder, not the mods folder - skipping it", "warning")
+        printer.write("Skipped", {"mods": gdweave_urls, "reason": "GDWeave must be installed from the GUI"})
+
+    engine = ModEngine(args.dest, log=log, jobs=args.jobs, base_url=args.base_url,
+                       retry_passes=args.retry_passes, snapshot_keep=args.snapshot_keep,
+                       store=store.FileStore(store.store_root(args.dest)) if args.store else None,
+                       bandwidth=throttle.Bandwidth(args.limit_rate, args.limit_per_download),
+                       schedule=args.schedule, control=BatchControl(), mirror_set=mirror_set(args, log),
+                       bundle=bundled, artifact_cache=artifact_cache(args, log))
+    engine.bus.subscribe(printer)
+    engine.control.subscribe(lambda state: printer.write("BatchState", {"state": state}))
+
+    try:
+        with batch_signals(engine.control, log):
+            if bundled is not None:
+                log(f"📦 Installing {len(locked.mods)} mods from {args.bundle}", "info")
+                batch = engine.run_locked(locked)
+            elif locked is not None:
+                log(f"🔒 Installing {len(locked.mods)} pinned mods from the lockfile", "info")
+                batch = engine.run_locked(locked)
+            else:
+                batch = engine.run(mod_urls)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        printer.write("Error", {"error": str(e)})
+        return EXIT_FAILED
+
+    summary = batch.summary()
+    printer.write("Summary", {
+        "successful": batch.successful,
+        "failed": batch.failed,
+        "skipped": batch.skipped,
+        "cancelled": batch.cancelled,
+        "download_folder": batch.download_folder,
+        "metrics": summary["metrics"],
+        "http": summary["http"],
+    })
+
+    if batch.cancelled:
+        return EXIT_INTERRUPTED
+    if batch.failed == 0:
+        return EXIT_OK
+    if batch.successful or batch.skipped:
+        return EXIT_PARTIAL
+    return EXIT_FAILED
+
+
+def run_apply(args):
+    try:
+        mod_urls, lockfiles = read_presets(args.preset)
+    except PresetError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    locked = lockfile.merge(lockfiles) if lockfiles and not args.ignore_lock else None
+
+    def log(message, msg_type="info"):
+        if not args.quiet:
+            print(message, file=sys.stderr)
+
+    printer = JsonProgressPrinter()
+    engine = ModEngine(args.dest, log=log, jobs=args.jobs, base_url=args.base_url,
+                       bandwidth=throttle.Bandwidth(args.limit_rate, args.limit_per_download),
+                       schedule=args.schedule, control=BatchControl(), mirror_set=mirror_set(args, log),
+                       artifact_cache=artifact_cache(args, log))
+    plan = delta.plan_delta(engine, mod_urls, locked, remove_extras=args.remove_extras)
+    log(plan.describe())
+    printer.write("Plan", plan.to_dict())
+    if args.dry_run:
+        return EXIT_OK if not plan.failed else EXIT_PARTIAL
+
+    engine.bus.subscribe(printer)
+    engine.control.subscribe(lambda state: printer.write("BatchState", {"state": state}))
+    try:
+        with batch_signals(engine.control, log):
+            batch = delta.apply_delta(engine, plan)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    if batch is None:
+        return EXIT_OK if not plan.failed else EXIT_PARTIAL
+    printer.write("Summary", {
+        "successful": batch.successful,
+        "failed": batch.failed,
+        "removed": len(plan.remove),
+        "cancelled": batch.cancelled,
+        "download_folder": batch.download_folder,
+        "metrics": batch.summary()["metrics"],
+    })
+    if batch.cancelled:
+        return EXIT_INTERRUPTED
+    if batch.failed == 0 and not plan.failed:
+        return EXIT_OK
+    return EXIT_PARTIAL if batch.successful else EXIT_FAILED
+
+
+def run_lock(args):
+    try:
+        mod_urls, _ = read_presets(args.preset)
+    except PresetError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    mod_urls = list(dict.fromkeys(url.strip() for url in mod_urls + args.url if url.strip()))
+    if not mod_urls:
+        print("error: no mods given (use --preset or --url)", file=sys.stderr)
+        return EXIT_USAGE
+
+    def log(message, msg_type="info"):
+        print(message, file=sys.stderr)
+
+    engine = ModEngine(".", log=log, jobs=args.jobs, base_url=args.base_url, artifact_cache=artifact_cache(args, log))
+    printer = JsonProgressPrinter()
+    try:
+        locked = lockfile.lock(engine, mod_urls, args.name or os.path.splitext(os.path.basename(args.out))[0])
+        lockfile.save_lockfile(args.out, locked)
+    except (EngineError, PresetError) as e:
+        printer.write("Error", {"error": str(e)})
+        return EXIT_FAILED
+    printer.write("Locked", {"out": args.out, "mods": len(locked.mods), "bytes": locked.total_size})
+    return EXIT_OK
+
+
+def run_bundle(args):
+    printer = JsonProgressPrinter()
+    if args.bundle_command == "info":
+        try:
+            with bundle.Bundle(args.file) as bundled:
+                locked = bundled.lockfile
+                for mod in locked.mods:
+                    printer.write("Mod", {"full_name": mod.full_name, "version": mod.version, "size": mod.size,
+                                          "sha256": mod.sha256})
+                printer.write("Bundle", {"name": locked.name, "created_at": bundled.index.get("created_at"),
+                                         "mods": len(locked.mods), "bytes": bundled.total_size})
+                damaged = bundled.verify() if args.verify else []
+        except bundle.BundleError as e:
+            printer.write("Error", {"error": str(e)})
+            return EXIT_FAILED
+        if damaged:
+            printer.write("Damaged", {"mods": damaged})
+            return EXIT_FAILED
+        return EXIT_OK
+
+    try:
+        mod_urls, lockfiles = read_presets(args.preset)
+    except PresetError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    mod_urls = list(dict.fromkeys(url.strip() for url in mod_urls + args.url if url.strip()))
+    locked = lockfile.merge(lockfiles) if lockfiles and not args.url else None
+    if not mod_urls and locked is None:
+        print("error: no mods given (use --preset or --url)", file=sys.stderr)
+        return EXIT_USAGE
+
+    def log(message, msg_type="info"):
+        print(message, file=sys.stderr)
+
+    engine = ModEngine(".", log=log, jobs=args.jobs, base_url=args.base_url, artifact_cache=artifact_cache(args, log))
+    try:
+        locked = bundle.export_bundle(engine, args.out, mod_urls, locked, args.name)
+    except (EngineError, PresetError) as e:
+        printer.write("Error", {"error": str(e)})
+        return EXIT_FAILED
+    printer.write("Bundled", {"out": args.out, "mods": len(locked.mods), "bytes": locked.total_size,
+                              "file_bytes": os.path.getsize(args.out)})
+    return EXIT_OK
+
+
+def run_rollback(args):
+    if args.mod:
+        if not args.dest:
+            print("error: --mod needs --dest", file=sys.stderr)
+            return EXIT_USAGE
+        snapshot_store = snapshots.mod_store(args.dest, args.mod, args.keep)
+    else:
+        import gdweave
+        snapshot_store = gdweave.snapshot_store(args.game_folder, args.keep)
+
+    printer = JsonProgressPrinter()
+    if args.list:
+        for snapshot in snapshot_store.list():
+            printer.write("Snapshot", {"name": snapshot.name, "label": snapshot.label,
+                                       "created_at": snapshot.created_at, "items": snapshot.items,
+                                       "files": snapshot.files, "modes": snapshot.modes})
+        return EXIT_OK
+
+    try:
+        snapshot = snapshot_store.rollback(args.snapshot)
+    except snapshots.SnapshotError as e:
+        printer.write("Error", {"error": str(e)})
+        return EXIT_FAILED
+    printer.write("RolledBack", {"name": snapshot.name, "label": snapshot.label, "items": snapshot.items})
+    return EXIT_OK
+
+
+def run_profile(args):
+    if args.action in ("save", "switch", "delete") and not args.name:
+        print(f"error: profile {args.action} needs a name", file=sys.stderr)
+        return EXIT_USAGE
+    printer = JsonProgressPrinter()
+    profiles = store.ProfileManager(args.dest, log=lambda message, msg_type="info": print(message, file=sys.stderr))
+    try:
+        if args.action == "list":
+            active = profiles.active()
+            for name in profiles.list():
+                profile = profiles.get(name)
+                printer.write("Profile", {"name": name, "active": name == active, "files": len(profile.files),
+                                          "bytes": profile.size, "created_at": profile.created_at})
+            printer.write("Store", profiles.store.stats())
+        elif args.action == "save":
+            profile = profiles.save(args.name)
+            printer.write("Saved", {"name": args.name, "files": len(profile.files), "bytes": profile.size})
+        elif args.action == "switch":
+            started = time.perf_counter()
+            profile = profiles.switch(args.name)
+            printer.write("Switched", {"name": args.name, "files": len(profile.files),
+                                       "seconds": round(time.perf_counter() - started, 3)})
+        elif args.action == "delete":
+            profiles.delete(args.name)
+            printer.write("Deleted", {"name": args.name})
+        else:
+            removed, freed = profiles.gc()
+            printer.write("Collected", {"objects": removed, "bytes": freed})
+    except (store.StoreError, OSError) as e:
+        printer.write("Error", {"error": str(e)})
+        return EXIT_FAILED
+    return EXIT_OK
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "install":
+        return run_install(args)
+    if args.command == "apply":
+        return run_apply(args)
+    if args.command == "lock":
+        return run_lock(args)
+    if args.command == "bundle":
+        return run_bundle(args)
+    if args.command == "rollback":
+        return run_rollback(args)
+    if args.command == "profile":
+        return run_profile(args)
+    return EXIT_USAGE
+
+
+if __name__ == "__main__":
+    sys.exit(main())
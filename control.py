@@ -0,0 +1,121 @@
+"""Pause, resume and cancel for a running batch.
+
+The engine calls checkpoint(mod) between steps (before resolving, before
+and during the download, between extracted files, before copying into the
+mods folder). While the batch is paused a checkpoint blocks; once the
+batch or that mod is cancelled it raises Cancelled, and the engine deletes
+the mod's staging files before reporting it. Copying into the mods folder
+is not interrupted halfway: a cancel takes effect once the copy is done, so
+no half-written mod folder is left behind.
+
+A download does not hold its connection open while paused: the transfer
+checkpoint raises TransferPaused, the engine closes the response, waits,
+and asks for the rest of the file with a Range request (starting over only
+if the server ignores it). Retry back-offs wait through sleep(), which
+returns as soon as the batch or the mod is cancelled.
+
+    control = BatchControl()
+    engine = ModEngine("mods", control=control)
+    # from another thread
+    control.pause(); control.resume(); control.cancel()
+"""
+import time
+import threading
+
+
+class Cancelled(Exception):
+    """The batch, or this mod, was cancelled"""
+
+
+class TransferPaused(Exception):
+    """A download stopped at a pause; it resumes from its byte offset"""
+
+
+class BatchControl:
+    """Thread-safe pause/resume/cancel state shared by a batch's workers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Notified on every cancel, so sleep() returns at once
+        self._changed = threading.Condition(self._lock)
+        # Set while running, cleared while paused
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = False
+        self._cancelled_mods = set()
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """listener(state) is called with "paused", "running" or "cancelled" on each change"""
+        self._listeners.append(listener)
+
+    def _notify(self, state):
+        for listener in self._listeners:
+            listener(state)
+
+    @property
+    def paused(self):
+        return not self._running.is_set() and not self._cancelled
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def pause(self):
+        if self._cancelled or not self._running.is_set():
+            return
+        self._running.clear()
+        self._notify("paused")
+
+    def resume(self):
+        if self._cancelled or self._running.is_set():
+            return
+        self._running.set()
+        self._notify("running")
+
+    def cancel(self, mod=None):
+        """Cancel one mod, or the whole batch when mod is None"""
+        with self._lock:
+            if mod is not None:
+                self._cancelled_mods.add(mod)
+            else:
+                self._cancelled = True
+            self._changed.notify_all()
+        if mod is None:
+            # Wake paused workers so they see the cancel; a mod's own cancel leaves the batch paused,
+            # and its checkpoint notices it within one wait
+            self._running.set()
+            self._notify("cancelled")
+
+    def is_cancelled(self, mod=None):
+        return self._cancelled or (mod is not None and mod in self._cancelled_mods)
+
+    def raise_if_cancelled(self, mod=None):
+        if self._cancelled:
+            raise Cancelled("Cancelled")
+        if mod is not None and mod in self._cancelled_mods:
+            raise Cancelled(f"{mod} was cancelled")
+
+    def checkpoint(self, mod=None):
+        """Block while paused; raise Cancelled if the batch or mod was cancelled"""
+        self.raise_if_cancelled(mod)
+        while not self._running.wait(0.5):
+            self.raise_if_cancelled(mod)
+        self.raise_if_cancelled(mod)
+
+    def sleep(self, seconds, mod=None):
+        """Wait seconds, then while the batch is paused; raise Cancelled as soon as the batch or mod is cancelled"""
+        deadline = time.monotonic() + seconds
+        with self._changed:
+            while not self.is_cancelled(mod):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        self.checkpoint(mod)
+
+    def transfer_checkpoint(self, mod=None):
+        """For a running download: raise TransferPaused (or Cancelled) instead of blocking"""
+        self.raise_if_cancelled(mod)
+        if not self._running.is_set():
+            raise TransferPaused()
@@ -0,0 +1,211 @@
+"""Apply a preset to a mods folder by installing only what differs.
+
+plan_delta compares the preset's mods with the install index (see
+installed.py) and sorts each one into install (missing), update (another
+version is installed) or keep. Mods the index knows about that are not in
+the preset are extras, removed only when asked. Only the package API is
+queried to learn the latest versions (nothing at all for a lockfile), so
+the dry-run plan, with its byte estimate, costs no downloads.
+
+    delta = plan_delta(engine, mod_urls, remove_extras=True)
+    print(delta.describe())
+    apply_delta(engine, delta)
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import installed
+import snapshots
+from engine import EngineError, PlannedMod, extract_mod_info_from_url, is_gdweave_url
+
+
+class DeltaPlan:
+    """What applying a preset will change"""
+
+    def __init__(self, install, update, keep, remove, unmanaged, failed):
+        # PlannedMods to install; updates carry replace=True
+        self.install = install
+        self.update = update
+        # (full_name, version or None)
+        self.keep = keep
+        # (full_name, folder)
+        self.remove = remove
+        # Folders in the mods folder that no index entry accounts for; never touched
+        self.unmanaged = unmanaged
+        # (mod_url or full_name, reason)
+        self.failed = failed
+
+    @property
+    def transfers(self):
+        return self.install + self.update
+
+    @property
+    def estimated_bytes(self):
+        """Sum of known archive sizes, and how many transfers have no size"""
+        known = unknown = 0
+        for entry in self.transfers:
+            size = entry.size or (entry.resolution.size if entry.resolution else None)
+            if size:
+                known += size
+            else:
+                unknown += 1
+        return known, unknown
+
+    @property
+    def empty(self):
+        return not (self.transfers or self.remove)
+
+    def to_dict(self):
+        known, unknown = self.estimated_bytes
+        return {
+            "install": [entry.key for entry in self.install],
+            "update": [{"mod": entry.key, "from": entry.reason, "to": entry.resolution.version}
+                       for entry in self.update],
+            "keep": [name for name, _ in self.keep],
+            "remove": [name for name, _ in self.remove],
+            "unmanaged": self.unmanaged,
+            "failed": [{"mod": mod, "error": error} for mod, error in self.failed],
+            "estimated_bytes": known,
+            "unknown_sizes": unknown,
+        }
+
+    def describe(self):
+        """The plan as console lines"""
+        lines = []
+        for entry in self.install:
+            lines.append(f"  + {entry.key} {entry.resolution.version or ''}".rstrip())
+        for entry in self.update:
+            lines.append(f"  ↑ {entry.key} {entry.reason or '?'} → {entry.resolution.version}")
+        for full_name, folder in self.remove:
+            lines.append(f"  - {full_name} ({folder})")
+        for mod, error in self.failed:
+            lines.append(f"  ❌ {mod}: {error}")
+        known, unknown = self.estimated_bytes
+        estimate = _format_bytes(known) + (f" + {unknown} of unknown size" if unknown else "")
+        lines.append(f"  {len(self.install)} to install, {len(self.update)} to update, {len(self.keep)} unchanged, "
+                     f"{len(self.remove)} to remove; about {estimate} to download")
+        if self.unmanaged:
+            lines.append(f"  Left alone (not installed by WebLoader): {', '.join(self.unmanaged)}")
+        return "\n".join(lines)
+
+
+def _format_bytes(n):
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024.0
+    return f"{n:.1f} GB"
+
+
+def plan_delta(engine, mod_urls=(), lock=None, remove_extras=False):
+    """Diff a preset (page URLs, or a lockfile.Lockfile) against engine.download_folder"""
+    index = installed.InstalledIndex(engine.download_folder)
+    if lock is not None:
+        targets = engine.plan_locked(lock)
+        failed = []
+    else:
+        targets, failed = _resolve_latest(engine, mod_urls)
+
+    install, update, keep = [], [], []
+    for entry in targets:
+        full_name = entry.key
+        version = entry.resolution.version
+        current = index.get(full_name)
+        folder = index.folder(full_name, entry.mod_info["name"])
+        entry.replace = False
+        if folder is None:
+            entry.action = PlannedMod.ACTION_INSTALL
+            install.append(entry)
+        elif current and current.get("version") and current["version"] == version:
+            keep.append((full_name, version))
+        elif current is None and lock is None:
+            # Installed before the index existed: the version is unknown, so leave it
+            keep.append((full_name, None))
+        else:
+            entry.action = PlannedMod.ACTION_INSTALL
+            entry.reason = (current or {}).get("version") or "unknown version"
+            entry.replace = True
+            update.append(entry)
+
+    wanted = {entry.key for entry in targets}
+    remove = []
+    if remove_extras:
+        remove = sorted((full_name, entry["folder"]) for full_name, entry in index.installed().items()
+                        if full_name not in wanted)
+    known_folders = {entry["folder"] for entry in index.installed().values()}
+    known_folders.update(index.folder(entry.key, entry.mod_info["name"]) for entry in targets)
+    unmanaged = sorted(name for name in os.listdir(engine.download_folder)
+                       if os.path.isdir(os.path.join(engine.download_folder, name))
+                       and name not in known_folders and name != "temp_extract") \
+        if os.path.isdir(engine.download_folder) else []
+    return DeltaPlan(install, update, keep, remove, unmanaged, failed)
+
+
+def _resolve_latest(engine, mod_urls):
+    """PlannedMods pinned to each URL's latest version (API first, page scrape as a fallback)"""
+    entries = []
+    seen = set()
+    failed = []
+    for mod_url in mod_urls:
+        mod_url = mod_url.strip()
+        if not mod_url or is_gdweave_url(mod_url):
+            continue
+        mod_info = extract_mod_info_from_url(mod_url)
+        if not mod_info:
+            failed.append((mod_url, "Invalid mod URL"))
+            continue
+        if mod_info["full_name"] in seen:
+            continue
+        seen.add(mod_info["full_name"])
+        entries.append((mod_url, mod_info))
+
+    def resolve(item):
+        mod_url, mod_info = item
+        try:
+            return PlannedMod(mod_url, mod_info, PlannedMod.ACTION_INSTALL,
+                              resolution=engine.resolve(mod_info, mod_url)), None
+        except EngineError as e:
+            return None, (mod_info["full_name"], str(e))
+
+    with ThreadPoolExecutor(max_workers=engine.jobs) as pool:
+        results = list(pool.map(resolve, entries))
+    targets = [entry for entry, _ in results if entry is not None]
+    failed.extend(error for _, error in results if error is not None)
+    return targets, failed
+
+
+def remove_mods(engine, removals):
+    """Delete extra mod folders (snapshotting each first) and drop them from the index"""
+    index = installed.InstalledIndex(engine.download_folder)
+    for full_name, folder in removals:
+        path = os.path.join(engine.download_folder, folder)
+        if engine.snapshot_keep and os.path.isdir(path):
+            try:
+                snapshots.mod_store(engine.download_folder, folder, engine.snapshot_keep).create("before removal")
+            except snapshots.SnapshotError as e:
+                engine.log(f"  ⚠️ {str(e)}", "warning")
+        snapshots.remove_tree(path, ignore_errors=True)
+        index.remove(full_name)
+        engine.log(f"  🗑️ Removed {full_name} ({folder})", "info")
+    index.save()
+
+
+def apply_delta(engine, delta):
+    """Remove extras, then install and update what the plan lists; returns the BatchResult (None if nothing to fetch)"""
+    if delta.remove:
+        remove_mods(engine, delta.remove)
+    if not delta.transfers:
+        engine.log("✅ The mods folder already matches the preset", "success")
+        return None
+
+    previous = {entry.key: installed.InstalledIndex(engine.download_folder).folder(entry.key, entry.mod_info["name"])
+                for entry in delta.update}
+    batch = engine.run_plan(delta.transfers)
+
+    # An update that unpacked under a new folder name leaves the old folder behind
+    for result in batch.results:
+        old_folder = previous.get(result.record.mod)
+        if old_folder and result.folder_name and old_folder != result.folder_name:
+            snapshots.remove_tree(os.path.join(engine.download_folder, old_folder), ignore_errors=True)
+            engine.log(f"  🗑️ Removed the old folder {old_folder} of {result.record.mod}", "info")
+    return batch
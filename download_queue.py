@@ -0,0 +1,232 @@
+"""The download list as data: mods keyed by full_name, in user order, with priorities.
+
+The GUI's url_tree is a view of a DownloadQueue. Items are indexed by
+full_name and linked to their neighbours, so adding, finding, removing and
+moving a mod one step are O(1) however long the list is, and each URL is
+parsed once when it is added. Listeners are told about each change so the
+view can update just that row. The queue is saved as JSON in the app-data
+folder and restored on the next start.
+
+Priorities only affect download order: download_order() lists higher
+priorities first and keeps the list order within a priority.
+"""
+import os
+import json
+import time
+
+from engine import extract_mod_info_from_url
+
+
+QUEUE_FILE = "queue.json"
+
+CHANGE_ADD = "add"
+CHANGE_REMOVE = "remove"
+CHANGE_MOVE = "move"
+CHANGE_UPDATE = "update"
+CHANGE_CLEAR = "clear"
+
+
+class QueueItem:
+    """One mod in the list, parsed once"""
+
+    __slots__ = ("url", "full_name", "author", "name", "priority", "added_at", "prev", "next")
+
+    def __init__(self, url, mod_info, priority=0, added_at=None):
+        self.url = url
+        self.full_name = mod_info["full_name"]
+        self.author = mod_info["author"]
+        self.name = mod_info["name"]
+        self.priority = priority
+        self.added_at = added_at or time.time()
+        self.prev = None
+        self.next = None
+
+    @property
+    def mod_info(self):
+        return {"community": "webfishing", "author": self.author, "name": self.name, "full_name": self.full_name}
+
+    def to_dict(self):
+        return {"url": self.url, "priority": self.priority, "added_at": self.added_at}
+
+
+class DownloadQueue:
+    """Ordered, indexed list of mods to download"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._index = {}
+        self._head = None
+        self._tail = None
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """listener(change, item, before) is called after each change; before is the item it now precedes"""
+        self._listeners.append(listener)
+
+    def _notify(self, change, item=None, before=None):
+        for listener in self._listeners:
+            listener(change, item, before)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, full_name):
+        return full_name in self._index
+
+    def __iter__(self):
+        node = self._head
+        while node is not None:
+            yield node
+            node = node.next
+
+    def get(self, full_name):
+        return self._index.get(full_name)
+
+    def find_url(self, url):
+        """The item for a mod page URL, or None"""
+        mod_info = extract_mod_info_from_url(url)
+        return self._index.get(mod_info["full_name"]) if mod_info else None
+
+    def urls(self):
+        return [item.url for item in self]
+
+    def download_order(self):
+        """URLs with higher priorities first, list order within a priority"""
+        return [item.url for item in sorted(self, key=lambda item: -item.priority)]
+
+    def _link_before(self, item, before):
+        if before is None:
+            item.prev, item.next = self._tail, None
+            if self._tail is not None:
+                self._tail.next = item
+            else:
+                self._head = item
+            self._tail = item
+        else:
+            item.prev, item.next = before.prev, before
+            if before.prev is not None:
+                before.prev.next = item
+            else:
+                self._head = item
+            before.prev = item
+
+    def _unlink(self, item):
+        if item.prev is not None:
+            item.prev.next = item.next
+        else:
+            self._head = item.next
+        if item.next is not None:
+            item.next.prev = item.prev
+        else:
+            self._tail = item.prev
+        item.prev = item.next = None
+
+    def add(self, url, priority=0, mod_info=None, added_at=None):
+        """Append a mod; returns (item, added), or (None, False) for a URL that is not a mod page"""
+        mod_info = mod_info or extract_mod_info_from_url(url)
+        if not mod_info:
+            return None, False
+        existing = self._index.get(mod_info["full_name"])
+        if existing is not None:
+            return existing, False
+        item = QueueItem(url, mod_info, priority, added_at)
+        self._index[item.full_name] = item
+        self._link_before(item, None)
+        self._notify(CHANGE_ADD, item)
+        return item, True
+
+    def add_many(self, urls):
+        """Add each URL; returns the items that were new"""
+        added = []
+        for url in urls:
+            item, is_new = self.add(url)
+            if is_new:
+                added.append(item)
+        return added
+
+    def remove(self, full_name):
+        item = self._index.pop(full_name, None)
+        if item is None:
+            return None
+        self._unlink(item)
+        self._notify(CHANGE_REMOVE, item)
+        return item
+
+    def clear(self):
+        self._index.clear()
+        self._head = self._tail = None
+        self._notify(CHANGE_CLEAR)
+
+    def move_up(self, full_name):
+        item = self._index.get(full_name)
+        if item is None or item.prev is None:
+            return False
+        before = item.prev
+        self._unlink(item)
+        self._link_before(item, before)
+        self._notify(CHANGE_MOVE, item, before)
+        return True
+
+    def move_down(self, full_name):
+        item = self._index.get(full_name)
+        if item is None or item.next is None:
+            return False
+        after = item.next
+        before = after.next
+        self._unlink(item)
+        self._link_before(item, before)
+        self._notify(CHANGE_MOVE, item, before)
+        return True
+
+    def move_to_top(self, full_name):
+        item = self._index.get(full_name)
+        if item is None or item.prev is None:
+            return False
+        before = self._head
+        self._unlink(item)
+        self._link_before(item, before)
+        self._notify(CHANGE_MOVE, item, before)
+        return True
+
+    def move_to_bottom(self, full_name):
+        item = self._index.get(full_name)
+        if item is None or item.next is None:
+            return False
+        self._unlink(item)
+        self._link_before(item, None)
+        self._notify(CHANGE_MOVE, item, None)
+        return True
+
+    def set_priority(self, full_name, priority):
+        item = self._index.get(full_name)
+        if item is None:
+            return False
+        item.priority = int(priority)
+        self._notify(CHANGE_UPDATE, item)
+        return True
+
+    def to_dict(self):
+        return {"version": 1, "items": [item.to_dict() for item in self]}
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        """Queue saved at path; empty if there is none or it cannot be read"""
+        queue = cls(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return queue
+        for entry in data.get("items", []) if isinstance(data, dict) else ():
+            if isinstance(entry, dict) and entry.get("url"):
+                queue.add(entry["url"], int(entry.get("priority", 0) or 0), added_at=entry.get("added_at"))
+        return queue
@@ -0,0 +1,896 @@
+"""UI-free mod download/install engine.
+
+This is the logic behind the "Download Mods" button and presets, without Tk.
+The GUI and the headless CLI both drive ModEngine; progress goes out through
+a log callback and a progress_events.EventBus, errors as EngineError.
+A control.BatchControl pauses, resumes or cancels a batch from another
+thread.
+"""
+import os
+import json
+import time
+import shutil
+import zipfile
+import threading
+import traceback
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import http_client
+import installed
+import metrics
+import mirrors
+import resolver
+import scheduler
+import snapshots
+import throttle
+import progress_events as events
+from control import BatchControl, Cancelled, TransferPaused
+from retry import CircuitOpenError, Retrier
+from transfer import PartialTransfer, stream_to_file
+
+
+THUNDERSTORE_URL = "https://thunderstore.io"
+
+STATUS_INSTALLED = "installed"
+STATUS_SKIPPED = "skipped"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+# ModMetrics.source of an archive copied out of an offline bundle
+BUNDLE_SOURCE = "bundle"
+# ModMetrics.source of an archive read from the shared artifact cache
+ARTIFACT_SOURCE = "artifact-cache"
+
+
+def extract_mod_info_from_url(url):
+    """Extract WebFishing mod info from URL"""
+    parsed_url = urlparse(url)
+
+    if "thunderstore.io" not in parsed_url.netloc:
+        return None
+
+    path_parts = [p for p in parsed_url.path.split("/") if p]
+
+    if len(path_parts) >= 5 and path_parts[0] == "c" and path_parts[1] == "webfishing" and path_parts[2] == "p":
+        return {
+            "community": "webfishing",
+            "author": path_parts[3],
+            "name": path_parts[4],
+            "full_name": f"{path_parts[3]}-{path_parts[4]}"
+        }
+
+    return None
+
+
+def find_mod_folder(root_path):
+    """Find the innermost folder containing mod files"""
+    mod_folders = []
+    for root, dirs, files in os.walk(root_path):
+        if any(file.endswith(('.dll', '.pck', '.json')) for file in files):
+            mod_folders.append(root)
+
+    if mod_folders:
+        mod_folders.sort(key=lambda x: -len(x.split(os.sep)))
+        return mod_folders[0]
+    return None
+
+
+class EngineError(Exception):
+    """Raised by engine steps; the message is what gets logged and reported"""
+
+
+class PresetError(EngineError):
+    """A preset file is missing, unreadable or has no mod list"""
+
+
+class ArchiveError(EngineError):
+    """An archive failed its CRC check (or is not a zip at all)"""
+
+
+def load_preset(preset_path):
+    """Read the mod_urls list from a preset saved by Save Preset"""
+    try:
+        with open(preset_path, "r", encoding="utf-8") as f:
+            preset_data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise PresetError(f"Failed to load preset: {str(e)}") from e
+    if not isinstance(preset_data, dict) or "mod_urls" not in preset_data:
+        raise PresetError("The selected file is not a valid mod preset.")
+    return list(preset_data["mod_urls"])
+
+
+def save_preset(preset_path, preset_name, mod_urls):
+    """Write a named preset holding mod page URLs"""
+    preset_data = {
+        "name": preset_name,
+        "mod_urls": list(mod_urls),
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "created_by": "WebFishing Mod Manager"
+    }
+    try:
+        with open(preset_path, 'w') as f:
+            json.dump(preset_data, f, indent=2)
+    except OSError as e:
+        raise PresetError(f"Failed to save preset: {str(e)}") from e
+    return preset_data
+
+
+def is_gdweave_url(url):
+    return "gdweave" in url.lower()
+
+
+class Resolution:
+    """Where to download a mod archive from and how that was found"""
+
+    def __init__(self, download_url, filename, strategy, version=None, dependencies=(), size=None):
+        self.download_url = download_url
+        self.filename = filename
+        self.strategy = strategy
+        self.version = version
+        self.dependencies = list(dependencies)
+        self.size = size
+
+
+class PlannedMod:
+    """One entry of a batch plan: the URL, parsed info and what will happen to it"""
+
+    ACTION_INSTALL = "install"
+    ACTION_SKIP = "skip"
+    ACTION_INVALID = "invalid"
+
+    def __init__(self, mod_url, mod_info, action, reason="", resolution=None, sha256=None, size=None):
+        self.mod_url = mod_url
+        self.mod_info = mod_info
+        self.action = action
+        self.reason = reason
+        # Pinned by a lockfile: no lookup, and the archive must match sha256 and size
+        self.resolution = resolution
+        self.sha256 = sha256
+        self.size = size
+        # Installed in place of an older version: its folder is emptied first
+        self.replace = False
+        # Download First (1) / Last (-1) from the list; see scheduler.order
+        self.priority = 0
+        # From resolve_ahead: the ModMetrics its lookup was timed in, and the EngineError if it failed
+        self.record = None
+        self.resolve_error = None
+
+    @property
+    def key(self):
+        return self.mod_info["full_name"] if self.mod_info else self.mod_url
+
+
+class ModResult:
+    """Outcome of processing one mod URL"""
+
+    def __init__(self, mod_url, status, record, folder_name=None):
+        self.mod_url = mod_url
+        self.status = status
+        self.record = record
+        self.folder_name = folder_name
+
+
+class BatchResult:
+    """Counts, installed folders and the download_summary.json payload of a batch"""
+
+    def __init__(self, results, download_folder, wall_seconds, http_stats=None):
+        self.results = results
+        self.download_folder = download_folder
+        self.successful = sum(1 for r in results if r.status == STATUS_INSTALLED)
+        self.failed = sum(1 for r in results if r.status == STATUS_FAILED)
+        self.skipped = sum(1 for r in results if r.status == STATUS_SKIPPED)
+        self.cancelled = sum(1 for r in results if r.status == STATUS_CANCELLED)
+        self.downloaded_mods = {r.folder_name for r in results if r.status == STATUS_INSTALLED}
+        self.wall_seconds = wall_seconds
+        self.http_stats = http_stats or {}
+
+    def summary(self):
+        records = [r.record for r in self.results]
+        return {
+            "successful_downloads": self.successful,
+            "failed_downloads": self.failed,
+            "skipped_downloads": self.skipped,
+            "cancelled_downloads": self.cancelled,
+            "downloaded_mods": list(self.downloaded_mods),
+            "download_folder": self.download_folder,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "metrics": metrics.batch_metrics(records, self.wall_seconds),
+            "http": self.http_stats,
+            "mods": [record.to_dict() for record in records]
+        }
+
+
+class ModEngine:
+    """Resolve, download, extract and install Thunderstore mods into a folder.
+
+    The steps are usable on their own:
+
+        engine = ModEngine("mods", log=print, on_event=handle_event)
+        plan = engine.plan(urls)                 # parse, dedupe, mark installed
+        resolution = engine.resolve(mod_info)    # API, then page scrape
+        zip_path = engine.fetch(mod_key, resolution, staging_dir)
+        folder = engine.install(mod_key, zip_path, staging_dir)
+
+    or all at once with run(urls). Nothing here touches Tk; progress goes to
+    the log callback and to the EventBus in self.bus.
+    """
+
+    def __init__(self, download_folder, log=None, bus=None, on_event=None,
+                 base_url=THUNDERSTORE_URL, jobs=1, client=None, retrier=None, retry_passes=1,
+                 page_cache=None, snapshot_keep=5, store=None, bandwidth=None,
+                 schedule=scheduler.SCHEDULE_SMALL_FIRST, control=None, mirror_set=None, bundle=None,
+                 artifact_cache=None):
+        self.download_folder = download_folder
+        self._log = log
+        self.bus = bus or events.EventBus()
+        if on_event is not None:
+            self.bus.subscribe(on_event)
+        self.base_url = base_url.rstrip("/")
+        self.jobs = max(1, int(jobs))
+        self.client = client or http_client.get_client()
+        self.retrier = retrier or Retrier(log=self.log)
+        self.page_cache = page_cache or resolver.get_cache()
+        self.retry_passes = max(0, int(retry_passes))
+        self.snapshot_keep = max(0, int(snapshot_keep))
+        # A store.FileStore: installed files become links into it instead of copies
+        self.store = store
+        # A throttle.Bandwidth; shared with the caller so it can change the limits mid-batch
+        self.bandwidth = bandwidth or throttle.Bandwidth()
+        self.schedule = schedule
+        # Pause/resume/cancel from another thread; checked between steps and between chunks
+        self.control = control or BatchControl()
+        # A mirrors.MirrorSet: archives come from the fastest healthy source instead of download_url alone
+        self.mirrors = mirror_set
+        self._probe_lock = threading.Lock()
+        # A bundle.Bundle: archives it holds are copied out of it instead of downloaded
+        self.bundle = bundle
+        # An artifacts.ArtifactCache: checked before downloading, and downloads are published to it
+        self.artifacts = artifact_cache
+
+    def log(self, message, msg_type="info"):
+        if self._log:
+            self._log(message, msg_type)
+
+    def page_url(self, mod_url):
+        """Map a thunderstore.io mod page URL onto the configured base URL"""
+        if self.base_url == THUNDERSTORE_URL:
+            return mod_url
+        return f"{self.base_url}{urlparse(mod_url).path}"
+
+    def mod_page_url(self, mod_info):
+        return f"{THUNDERSTORE_URL}/c/webfishing/p/{mod_info['author']}/{mod_info['name']}/"
+
+    def plan(self, mod_urls):
+        """Parse and dedupe URLs and decide what each one needs (GDWeave is left to the caller)"""
+        planned = []
+        seen = set()
+        index = installed.InstalledIndex(self.download_folder)
+        for mod_url in mod_urls:
+            mod_info = extract_mod_info_from_url(mod_url)
+            if not mod_info:
+                planned.append(PlannedMod(mod_url, None, PlannedMod.ACTION_INVALID, "Invalid mod URL"))
+                continue
+            if mod_info["full_name"] in seen:
+                continue
+            seen.add(mod_info["full_name"])
+
+            if index.folder(mod_info["full_name"]):
+                planned.append(PlannedMod(mod_url, mod_info, PlannedMod.ACTION_SKIP, "Already installed"))
+            else:
+                planned.append(PlannedMod(mod_url, mod_info, PlannedMod.ACTION_INSTALL))
+        return planned
+
+    def resolve(self, mod_info, mod_url=None, record=None, version=None):
+        """Find the archive URL for a mod (the latest, or version): package API first, then the mod page"""
+        filename = f"{mod_info['full_name']}.zip"
+        api_url = f"{self.base_url}/api/v1/package/{mod_info['author']}/{mod_info['name']}/"
+
+        if record is not None:
+            record.enter_phase(metrics.PHASE_API)
+        on_retry = record.count_retry if record is not None else None
+        try:
+            response = self.retrier.call(api_url, "api",
+                                         lambda: self.client.get(api_url, kind=http_client.KIND_API), on_retry,
+                                         control=self.control, mod=mod_info["full_name"])
+            if response.status_code == 200:
+                package_data = response.json()
+                versions = package_data.get('versions', [])
+                if not versions and 'latest' in package_data:
+                    versions = [package_data['latest']]
+
+                if version is not None:
+                    versions = [v for v in versions if v.get("version_number") == version]
+                if versions and versions[0].get("download_url"):
+                    return Resolution(versions[0]["download_url"],
+                                      versions[0].get("filename", filename), "api",
+                                      versions[0].get("version_number"), versions[0].get("dependencies", ()),
+                                      versions[0].get("file_size"))
+        except CircuitOpenError as e:
+            self.log(f"  API skipped: {str(e)}", "info")
+        except Cancelled:
+            raise
+        except Exception as e:
+            self.log(f"  API attempt failed: {str(e)}", "info")
+
+        if version is not None:
+            # A known version needs no page: its download path is fixed
+            return Resolution(f"{self.base_url}{resolver.download_path(mod_info['author'], mod_info['name'], version)}",
+                              filename, "pinned", version)
+
+        if record is not None:
+            record.enter_phase(metrics.PHASE_SCRAPE)
+        download_url, strategy = self.get_download_url_from_page(mod_url or self.mod_page_url(mod_info), mod_info,
+                                                                 on_retry)
+        if not download_url:
+            raise EngineError("No download URL found")
+        match = resolver.PACKAGE_DOWNLOAD_PATH.search(download_url)
+        return Resolution(download_url, filename, strategy, match.group(3) if match else None)
+
+    def fetch(self, mod_key, resolution, staging_dir, record=None, sha256=None, size=None, use_cache=True):
+        """Stream the archive into staging_dir and return its path.
+
+        An archive in self.bundle is copied out of it, then the artifact cache
+        is asked for it (unless use_cache is False). With mirrors, the best
+        source is tried first and the next one on an error. With sha256 (a
+        lockfile), an archive that does not match also counts as an error of
+        that source. Downloads are published to the artifact cache only once
+        they pass test_archive (see publish_archive).
+        """
+        self.bus.emit(events.PhaseChanged(mod_key, events.PHASE_DOWNLOAD))
+        if record is not None:
+            record.enter_phase(metrics.PHASE_TRANSFER)
+        zip_path = os.path.join(staging_dir, resolution.filename)
+        if self.bundle is not None and mod_key in self.bundle:
+            result = self.bundle.extract(
+                mod_key, zip_path, lambda done, total: self.bus.emit(events.BytesTransferred(mod_key, done, total)))
+            if record is not None:
+                record.archive_size = result.size
+                record.sha256 = result.sha256
+                record.source = BUNDLE_SOURCE
+            self.log(f"  ✅ Unpacked from bundle: {resolution.filename} ({result.size} bytes)", "success")
+            return zip_path
+        if self.artifacts is not None and resolution.version and use_cache:
+            result = self.artifacts.fetch(
+                mod_key, resolution.version, zip_path, sha256, size,
+                lambda done, total: self.bus.emit(events.BytesTransferred(mod_key, done, total)))
+            if result is not None:
+                if record is not None:
+                    record.bytes_transferred = result.size
+                    record.archive_size = result.size
+                    record.sha256 = result.sha256
+                    record.source = ARTIFACT_SOURCE
+                self.log(f"  ✅ From the artifact cache: {resolution.filename} ({result.size} bytes)", "success")
+                return zip_path
+        if self.mirrors is not None:
+            self.probe_mirrors(resolution, mod_key)
+            sources = self.mirrors.candidates(resolution, mod_key)
+        else:
+            sources = [(None, resolution.download_url)]
+
+        for attempt, (source, url) in enumerate(sources, 1):
+            started = time.perf_counter()
+            try:
+                result = self.download(mod_key, url, zip_path, resolution.filename, record)
+                if sha256 and source not in (None, mirrors.ORIGIN):
+                    if result.sha256 != sha256 or (size is not None and result.size != size):
+                        raise EngineError(f"Archive from {source} does not match the lockfile")
+                elif source not in (None, mirrors.ORIGIN) and not zipfile.is_zipfile(zip_path):
+                    raise EngineError(f"Archive from {source} is not a zip file")
+            except Cancelled:
+                raise
+            except EngineError as e:
+                if source is None:
+                    raise
+                self.mirrors.record_failure(source)
+                if attempt == len(sources):
+                    raise
+                self.log(f"  ↪️ {source} failed ({str(e)}); trying {sources[attempt][0]}", "warning")
+                continue
+            if source is not None:
+                self.mirrors.record_success(source, result.size, time.perf_counter() - started)
+            break
+
+        if record is not None:
+            record.bytes_transferred = result.size
+            record.archive_size = result.size
+            record.sha256 = result.sha256
+            record.source = source
+        self.log(f"  ✅ Downloaded: {resolution.filename} ({result.size} bytes"
+                 f"{f' from {source}' if source not in (None, mirrors.ORIGIN) else ''})", "success")
+        return zip_path
+
+    def publish_archive(self, mod_key, zip_path, record):
+        """Publish a downloaded archive that passed test_archive (and its lockfile hash) to the artifact cache.
+
+        A good download replaces whatever the cache's record named before,
+        including an archive from the cache that failed its CRC check.
+        """
+        if self.artifacts is None or not record.version or not record.sha256 or \
+                record.source in (BUNDLE_SOURCE, ARTIFACT_SOURCE):
+            return
+        if self.artifacts.publish(mod_key, record.version, zip_path, record.sha256, record.archive_size):
+            self.log(f"  📤 Published {os.path.basename(zip_path)} to the artifact cache", "info")
+
+    def probe_mirrors(self, resolution, mod_key):
+        """Measure sources not measured recently, once, on the first archive fetched; other workers wait for it"""
+        with self._probe_lock:
+            stale = self.mirrors.stale()
+            if stale:
+                self.log(f"🪞 Measuring {len(stale)} archive sources...", "info")
+                self.mirrors.probe(resolution, mod_key)
+
+    def download(self, mod_key, url, zip_path, filename, record=None):
+        """Stream url into zip_path through the retrier, pausing when asked; returns the TransferResult"""
+        result = None
+        # Set while paused: what was written, so the next request asks only for the rest
+        paused = None
+
+        def on_progress(downloaded, total):
+            self.bus.emit(events.BytesTransferred(mod_key, downloaded, total))
+
+        def checkpoint():
+            self.control.transfer_checkpoint(mod_key)
+
+        def transfer():
+            # A reset partway through raises here and the retrier starts the file over
+            nonlocal result, paused
+            resume, paused = paused, None
+            headers = {"Range": f"bytes={resume.size}-"} if resume is not None else None
+            r = self.client.get(url, kind=http_client.KIND_DOWNLOAD, stream=True, headers=headers)
+            if r.status_code == 206 and (resume is None or
+                                         not r.headers.get("Content-Range", "").startswith(f"bytes {resume.size}-")):
+                # Not the range that was asked for: start over with a plain request
+                r.close()
+                self.log(f"  ↻ The server sent an unusable range; starting {filename} over", "info")
+                resume = None
+                r = self.client.get(url, kind=http_client.KIND_DOWNLOAD, stream=True)
+            if r.status_code == 206 and resume is not None:
+                partial = resume
+            elif r.status_code == 200:
+                if resume is not None:
+                    self.log(f"  ↻ The server does not resume downloads; starting {filename} over", "info")
+                partial = PartialTransfer()
+            elif r.status_code >= 400:
+                # Retried, or raised by raise_for_status below
+                return r
+            else:
+                r.close()
+                raise EngineError(f"Unexpected HTTP {r.status_code} for {filename}")
+            with r, self.bandwidth.transfer() as limit:
+                try:
+                    result = stream_to_file(r, zip_path, on_progress, throttle=limit, checkpoint=checkpoint,
+                                            partial=partial)
+                except TransferPaused:
+                    paused = partial
+                    raise
+            return r
+
+        while True:
+            try:
+                response = self.retrier.call(url, "download", transfer,
+                                             record.count_retry if record is not None else None,
+                                             control=self.control, mod=mod_key)
+                response.raise_for_status()
+                return result
+            except TransferPaused:
+                self.log(f"  ⏸️ {filename} paused at {paused.size} bytes", "info")
+                # Blocks until resumed; raises Cancelled if cancelled instead
+                self.control.checkpoint(mod_key)
+                self.log(f"  ▶️ Resuming {filename} from {paused.size} bytes", "info")
+            except Cancelled:
+                raise
+            except Exception as e:
+                raise EngineError(f"Download failed: {str(e)}") from e
+
+    def verify(self, zip_path, record, sha256, size=None):
+        """Check a downloaded archive against the hash (and size) it was locked with"""
+        if record.sha256 == sha256 and (size is None or record.archive_size == size):
+            self.log(f"  ✅ SHA-256 matches the lockfile", "info")
+            return
+        try:
+            os.remove(zip_path)
+        except OSError:
+            pass
+        raise EngineError(f"Archive does not match the lockfile: expected sha256 {sha256[:12]}… "
+                          f"({size} bytes), got {(record.sha256 or '')[:12]}… ({record.archive_size} bytes)")
+
+    def test_archive(self, zip_path):
+        """CRC-check every member of an archive; a bad archive is deleted and ArchiveError raised"""
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as test_zip:
+                bad_member = test_zip.testzip()
+            if bad_member:
+                raise zipfile.BadZipFile(f"CRC check failed for {bad_member}")
+            self.log(f"  ✅ Zip file verified", "info")
+        except Exception as zip_error:
+            try:
+                os.remove(zip_path)
+            except OSError:
+                pass
+            raise ArchiveError(f"Invalid zip file: {str(zip_error)}") from zip_error
+
+    def install(self, mod_key, zip_path, staging_dir, record=None, replace=False):
+        """Verify and extract an archive, then copy its mod folder into place; returns the folder name.
+
+        With replace, files left over in the folder from another version are removed.
+        """
+        self.bus.emit(events.PhaseChanged(mod_key, events.PHASE_VERIFY))
+        if record is not None:
+            record.enter_phase(metrics.PHASE_TESTZIP)
+        self.test_archive(zip_path)
+        if record is not None:
+            self.publish_archive(mod_key, zip_path, record)
+
+        self.log(f"  📦 Extracting {os.path.basename(zip_path)}...", "info")
+        self.bus.emit(events.PhaseChanged(mod_key, events.PHASE_EXTRACT))
+        if record is not None:
+            record.enter_phase(metrics.PHASE_EXTRACT)
+        extract_path = os.path.join(staging_dir, f"extract_{mod_key}")
+        os.makedirs(extract_path, exist_ok=True)
+
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                for member in zip_ref.infolist():
+                    self.control.checkpoint(mod_key)
+                    zip_ref.extract(member, extract_path)
+        except Cancelled:
+            raise
+        except Exception as extract_error:
+            raise EngineError(f"Extraction failed: {str(extract_error)}") from extract_error
+
+        mod_source_folder = find_mod_folder(extract_path)
+        if not mod_source_folder:
+            raise EngineError("No mod folder found with .dll, .pck, or .json files")
+        # Last chance to stop: the copy into the mods folder is not interrupted
+        self.control.checkpoint(mod_key)
+
+        actual_mod_folder_name = os.path.basename(mod_source_folder)
+        final_mod_folder = os.path.join(self.download_folder, actual_mod_folder_name)
+        self.bus.emit(events.PhaseChanged(mod_key, events.PHASE_INSTALL))
+        if record is not None:
+            record.enter_phase(metrics.PHASE_COPY)
+
+        if self.snapshot_keep and os.path.isdir(final_mod_folder):
+            try:
+                snapshot = snapshots.mod_store(self.download_folder, actual_mod_folder_name,
+                                               self.snapshot_keep).create("before reinstall")
+                if snapshot:
+                    self.log(f"  🔁 Snapshot of the existing '{actual_mod_folder_name}' kept as {snapshot.name}", "info")
+            except snapshots.SnapshotError as e:
+                self.log(f"  ⚠️ {str(e)}", "warning")
+
+        try:
+            if replace and os.path.isdir(final_mod_folder):
+                snapshots.remove_tree(final_mod_folder)
+            os.makedirs(final_mod_folder, exist_ok=True)
+
+            files_written = sum(len(files) for _, _, files in os.walk(mod_source_folder))
+            if self.store is not None:
+                _, shared = self.store.install_tree(mod_source_folder, final_mod_folder)
+                if shared:
+                    self.log(f"  🔗 {shared} of {files_written} files were already in the store", "info")
+            else:
+                for item in os.listdir(mod_source_folder):
+                    source_item = os.path.join(mod_source_folder, item)
+                    dest_item = os.path.join(final_mod_folder, item)
+
+                    # Replace files rather than overwrite them: snapshots may share their contents
+                    if os.path.isdir(source_item):
+                        shutil.copytree(source_item, dest_item, dirs_exist_ok=True,
+                                        copy_function=snapshots.copy_unlinked)
+                    else:
+                        snapshots.copy_unlinked(source_item, dest_item)
+        except Exception as install_error:
+            raise EngineError(f"Installation failed: {str(install_error)}") from install_error
+
+        if record is not None:
+            record.files_written = files_written
+        self.log(f"  ✅ Installed WebFishing mod '{actual_mod_folder_name}' to: {final_mod_folder}", "success")
+
+        try:
+            if os.path.exists(zip_path):
+                os.remove(zip_path)
+            if os.path.exists(extract_path):
+                shutil.rmtree(extract_path)
+        except Exception as clean_error:
+            self.log(f"  ⚠️ Cleanup failed: {str(clean_error)}", "warning")
+
+        return actual_mod_folder_name
+
+    def run(self, mod_urls, priorities=None):
+        """Plan and process every URL, then write the summary and auto preset; returns a BatchResult.
+
+        priorities maps mod URLs to their Download First (1) / Last (-1) priority.
+        """
+        planned = self.plan(mod_urls)
+        for entry in planned:
+            entry.priority = (priorities or {}).get(entry.mod_url, 0)
+        return self.run_plan(planned)
+
+    def plan_locked(self, lockfile):
+        """Plan a lockfile's mods (dependencies included) with their pinned URLs and hashes"""
+        planned = []
+        index = installed.InstalledIndex(self.download_folder)
+        for mod in lockfile.mods:
+            mod_info = {"community": "webfishing", "author": mod.author, "name": mod.name,
+                        "full_name": mod.full_name}
+            action = PlannedMod.ACTION_INSTALL
+            reason = ""
+            entry = index.get(mod.full_name)
+            if entry and entry.get("version") == mod.version:
+                action, reason = PlannedMod.ACTION_SKIP, "Already installed"
+            resolution = Resolution(mod.download_url, mod.filename, "locked", mod.version, mod.dependencies,
+                                    mod.size)
+            planned_mod = PlannedMod(mod.mod_url or self.mod_page_url(mod_info), mod_info, action, reason,
+                                     resolution, mod.sha256, mod.size)
+            # Another version (or an unknown one) is in place: replace it rather than merge into it
+            planned_mod.replace = entry is not None
+            planned.append(planned_mod)
+        return planned
+
+    def run_locked(self, lockfile):
+        """Install a lockfile without any lookups, verifying every archive; returns a BatchResult"""
+        return self.run_plan(self.plan_locked(lockfile))
+
+    def run_plan(self, planned):
+        """Process planned mods, then write the summary and auto preset; returns a BatchResult"""
+        download_folder = self.download_folder
+        os.makedirs(download_folder, exist_ok=True)
+        temp_folder = os.path.join(download_folder, "temp_extract")
+        os.makedirs(temp_folder, exist_ok=True)
+
+        self.bus.emit(events.BatchStarted(len(planned)))
+        batch_started = time.perf_counter()
+        total = len(planned)
+
+        if self.schedule == scheduler.SCHEDULE_SMALL_FIRST:
+            self.resolve_ahead(planned)
+        order = scheduler.order(planned, self.schedule)
+        if not self.bandwidth.unlimited:
+            self.log(f"🚦 Bandwidth limit: {self.bandwidth.describe()}", "info")
+
+        # Results stay in planned order; the [n/total] numbers follow the download order
+        results = [None] * total
+        done = self.process_all([(n, planned[i]) for n, i in enumerate(order, 1)], total, temp_folder)
+        for i, result in zip(order, done):
+            results[i] = result
+
+        for pass_number in range(1, self.retry_passes + 1):
+            if self.control.cancelled:
+                break
+            retry = [i for i in order
+                     if results[i].status == STATUS_FAILED and planned[i].action != PlannedMod.ACTION_INVALID]
+            if not retry:
+                break
+            self.log(f"\n🔁 Retry pass {pass_number}: {len(retry)} failed mods", "info")
+            self.bus.emit(events.RetryPassStarted([planned[i].key for i in retry]))
+            # Give every strategy another chance; the first pass may have hit a transient outage
+            self.retrier.breaker.reset()
+            retried = self.process_all([(n, planned[i]) for n, i in enumerate(retry, 1)], len(retry), temp_folder)
+            for i, result in zip(retry, retried):
+                results[i] = result
+
+        try:
+            if os.path.exists(temp_folder):
+                shutil.rmtree(temp_folder)
+        except Exception as e:
+            self.log(f"  ⚠️ Could not clean up temp folder: {str(e)}", "warning")
+
+        self.record_installed(results)
+        if self.mirrors is not None:
+            self.mirrors.save()
+        if self.artifacts is not None:
+            cache_stats = self.artifacts.stats()
+            self.log(f"🗄️ Artifact cache ({self.artifacts.describe()}): {cache_stats['hits']} hits, "
+                     f"{cache_stats['misses']} misses, {cache_stats['published']} published", "info")
+        batch = BatchResult(results, download_folder, time.perf_counter() - batch_started, self.client.stats())
+        self.bus.emit(events.BatchFinished(batch.successful, batch.failed, batch.skipped))
+        if batch.cancelled:
+            self.log(f"\n⏹️ Cancelled: {batch.cancelled} mods were not installed", "warning")
+
+        self.save_preset_auto(batch.downloaded_mods)
+        self.write_summary(batch.summary())
+        return batch
+
+    def resolve_ahead(self, planned):
+        """Resolve installable entries that have no resolution yet, jobs at a time, so the scheduler knows sizes.
+
+        Each lookup is timed in the entry's own ModMetrics. A mod that fails
+        here keeps its EngineError, which process_mod reports without
+        looking it up (and paying its retries) a second time.
+        """
+        pending = [entry for entry in planned
+                   if entry.action == PlannedMod.ACTION_INSTALL and entry.resolution is None]
+        if not pending:
+            return
+
+        def resolve(entry):
+            entry.record = metrics.ModMetrics(entry.key)
+            try:
+                self.control.checkpoint(entry.key)
+                entry.resolution = self.resolve(entry.mod_info, entry.mod_url, entry.record)
+            except EngineError as e:
+                entry.resolve_error = e
+            except Cancelled:
+                # process_mod's checkpoint reports it
+                pass
+            entry.record.leave_phase()
+
+        if self.jobs > 1 and len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                list(pool.map(resolve, pending))
+        else:
+            for entry in pending:
+                resolve(entry)
+
+    def record_installed(self, results):
+        """Add this batch's installs to the mods folder's install index"""
+        done = [result for result in results if result.status == STATUS_INSTALLED]
+        if not done:
+            return
+        index = installed.InstalledIndex(self.download_folder)
+        for result in done:
+            record = result.record
+            index.record(record.mod, result.folder_name, record.version, record.sha256, record.archive_size)
+        try:
+            index.save()
+        except OSError as e:
+            self.log(f"  ⚠️ Could not update {installed.INDEX_FILE}: {str(e)}", "warning")
+
+    def process_all(self, entries, total, staging_dir):
+        """Process (index, PlannedMod) pairs, in parallel when jobs > 1; results keep entry order"""
+        if self.jobs > 1 and len(entries) > 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                return list(pool.map(
+                    lambda item: self.process_mod(item[1], item[0], total, staging_dir), entries
+                ))
+        return [self.process_mod(entry, index, total, staging_dir) for index, entry in entries]
+
+    def process_mod(self, entry, index, total, staging_dir):
+        """Run one PlannedMod through resolve, fetch and install"""
+        bus = self.bus
+        mod_key = entry.key
+        # A looked-ahead entry's record and error are used once; a retry pass starts afresh
+        record, entry.record = entry.record or metrics.ModMetrics(mod_key), None
+        resolve_error, entry.resolve_error = entry.resolve_error, None
+
+        if entry.action == PlannedMod.ACTION_INVALID:
+            self.log(f"\n[{index}/{total}] ❌ Invalid WebFishing mod URL: {entry.mod_url}", "error")
+            bus.emit(events.ModFailed(mod_key, entry.reason))
+            record.finish(STATUS_FAILED, entry.reason)
+            return ModResult(entry.mod_url, STATUS_FAILED, record)
+
+        mod_info = entry.mod_info
+        self.log(f"\n[{index}/{total}] 🔍 Processing: {mod_info['name']}", "info")
+        bus.emit(events.PhaseChanged(mod_key, events.PHASE_RESOLVE))
+
+        if entry.action == PlannedMod.ACTION_SKIP:
+            self.log(f"  ⏩ Already installed: {mod_info['name']}", "warning")
+            bus.emit(events.ModDone(mod_key, os.path.join(self.download_folder, mod_key), skipped=True))
+            record.finish(STATUS_SKIPPED)
+            return ModResult(entry.mod_url, STATUS_SKIPPED, record)
+
+        resolution = entry.resolution
+        try:
+            self.control.checkpoint(mod_key)
+            if resolve_error is not None:
+                raise resolve_error
+            resolution = resolution or self.resolve(mod_info, entry.mod_url, record)
+            record.strategy = resolution.strategy
+            record.version = resolution.version
+            self.control.checkpoint(mod_key)
+            if self.bundle is None or mod_key not in self.bundle:
+                self.log(f"  📥 Downloading from: {resolution.download_url}", "info")
+            zip_path = self.fetch(mod_key, resolution, staging_dir, record, entry.sha256, entry.size)
+            if entry.sha256:
+                self.verify(zip_path, record, entry.sha256, entry.size)
+            self.control.checkpoint(mod_key)
+            try:
+                folder_name = self.install(mod_key, zip_path, staging_dir, record, replace=entry.replace)
+            except ArchiveError as e:
+                if record.source != ARTIFACT_SOURCE:
+                    raise
+                # Matched its hash but is broken: download it, and the good copy replaces it in the cache
+                self.log(f"  ⚠️ The cached {resolution.filename} is damaged ({str(e)}); downloading it instead",
+                         "warning")
+                self.artifacts.reject(mod_key, resolution.version, record.sha256)
+                self.discard_staging(mod_key, resolution, staging_dir)
+                zip_path = self.fetch(mod_key, resolution, staging_dir, record, entry.sha256, entry.size,
+                                      use_cache=False)
+                if entry.sha256:
+                    self.verify(zip_path, record, entry.sha256, entry.size)
+                self.control.checkpoint(mod_key)
+                folder_name = self.install(mod_key, zip_path, staging_dir, record, replace=entry.replace)
+        except Cancelled as e:
+            self.discard_staging(mod_key, resolution, staging_dir)
+            self.log(f"  ⏹️ Cancelled: {mod_info['name']}", "warning")
+            bus.emit(events.ModFailed(mod_key, str(e)))
+            record.finish(STATUS_CANCELLED, str(e))
+            return ModResult(entry.mod_url, STATUS_CANCELLED, record)
+        except EngineError as e:
+            self.log(f"  ❌ {str(e)}", "error")
+            bus.emit(events.ModFailed(mod_key, str(e)))
+            record.finish(STATUS_FAILED, str(e))
+            return ModResult(entry.mod_url, STATUS_FAILED, record)
+        except Exception as e:
+            self.log(f"  ❌ Error processing WebFishing mod {mod_info['name']}: {str(e)}", "error")
+            self.log(f"  Error details:\n{traceback.format_exc()}", "error")
+            bus.emit(events.ModFailed(mod_key, str(e)))
+            record.finish(STATUS_FAILED, str(e))
+            return ModResult(entry.mod_url, STATUS_FAILED, record)
+
+        bus.emit(events.ModDone(mod_key, os.path.join(self.download_folder, folder_name)))
+        record.finish(STATUS_INSTALLED)
+        return ModResult(entry.mod_url, STATUS_INSTALLED, record, folder_name)
+
+    def discard_staging(self, mod_key, resolution, staging_dir):
+        """Delete a mod's partial archive and extraction folder"""
+        if resolution is not None:
+            try:
+                os.remove(os.path.join(staging_dir, resolution.filename))
+            except OSError:
+                pass
+        shutil.rmtree(os.path.join(staging_dir, f"extract_{mod_key}"), ignore_errors=True)
+
+    def get_download_url_from_page(self, mod_url, mod_info, on_retry=None):
+        """Get download URL from mod page (or the scrape cache); returns (url, strategy) or (None, None)"""
+        cached = self.page_cache.get(mod_info["full_name"])
+        if cached:
+            self.log(f"  Using cached page resolution ({cached[1]})", "info")
+            return cached[0], cached[1]
+
+        page_url = self.page_url(mod_url)
+        try:
+            page_response = self.retrier.call(
+                page_url, "html_scrape",
+                lambda: self.client.get(page_url, kind=http_client.KIND_PAGE, stream=True), on_retry,
+                control=self.control, mod=mod_info["full_name"]
+            )
+            if page_response.status_code != 200:
+                page_response.close()
+                return None, None
+
+            download_url, strategy, version = resolver.resolve_from_response(
+                page_response, mod_info["author"], mod_info["name"], self.base_url
+            )
+            if not download_url:
+                return None, None
+            self.page_cache.put(mod_info["full_name"], download_url, strategy, version)
+            return download_url, strategy
+
+        except CircuitOpenError as e:
+            self.log(f"  Page scrape skipped: {str(e)}", "info")
+            return None, None
+        except Cancelled:
+            raise
+        except Exception as e:
+            self.log(f"  ❌ Error parsing mod page: {str(e)}", "error")
+            return None, None
+
+    def save_preset_auto(self, downloaded_mods):
+        """Automatically save a preset file"""
+        preset_path = os.path.join(self.download_folder, "webfishing_mod_preset.json")
+
+        preset_data = {
+            "name": "Auto Preset",
+            "downloaded_mods": list(downloaded_mods),
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "created_by": "WebFishing Mod Manager"
+        }
+
+        try:
+            with open(preset_path, 'w') as f:
+                json.dump(preset_data, f, indent=2)
+        except Exception as e:
+            self.log(f"\n⚠️ Could not save auto-preset: {str(e)}", "error")
+
+    def write_summary(self, summary):
+        try:
+            summary_file = os.path.join(self.download_folder, "download_summary.json")
+            with open(summary_file, "w") as f:
+                json.dump(summary, f, indent=2)
+            self.log(f"\n📋 Summary saved to: {summary_file}", "info")
+        except Exception as e:
+            self.log(f"\n⚠️ Could not save summary: {str(e)}", "warning")
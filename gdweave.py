@@ -0,0 +1,298 @@
+"""GDWeave (the WebFishing mod loader) installer, without Tk.
+
+GDWeave goes into the game folder, not the mods folder: winmm.dll next to
+the game executable and a GDWeave folder holding the loader and mods/.
+
+Each install leaves a small marker in the GDWeave folder recording the
+version, so a later install compares it against the package listing and
+does nothing when the game already has the latest release. Archives are
+kept in a cache folder and reused. The new GDWeave folder is built next to
+the old one and renamed into place, so the game never sees a half-copied
+loader; the user's mods/ and configs/ are moved across, not copied. The
+previous loader is kept as a link snapshot (see snapshots.py) for rollback.
+"""
+import os
+import json
+import time
+import shutil
+import zipfile
+from datetime import datetime
+
+import http_client
+import resolver
+import snapshots
+from engine import EngineError, THUNDERSTORE_URL
+from transfer import stream_to_file
+
+
+OWNER = "NotNet"
+NAME = "GDWeave"
+FULL_NAME = f"{OWNER}-{NAME}"
+
+MARKER_FILE = ".webloader.json"
+# Kept from the installed GDWeave folder when a new version is swapped in
+PRESERVED_DIRS = ("mods", "configs", snapshots.SNAPSHOT_DIR)
+STAGING_DIR = ".webloader_gdweave_staging"
+
+STATUS_CURRENT = "current"
+STATUS_INSTALLED = "installed"
+STATUS_UPDATED = "updated"
+
+LATEST_TTL = 600.0
+
+
+class GDWeaveError(EngineError):
+    """GDWeave could not be resolved, downloaded or installed"""
+
+
+class Release:
+    """A GDWeave version on Thunderstore and where to download it"""
+
+    def __init__(self, version, download_url):
+        self.version = version
+        self.download_url = download_url
+
+    @property
+    def filename(self):
+        return f"{FULL_NAME}-{self.version}.zip"
+
+
+class InstallResult:
+    """What install() did and where things ended up"""
+
+    def __init__(self, status, version, previous_version, game_folder):
+        self.status = status
+        self.version = version
+        self.previous_version = previous_version
+        self.winmm_path = os.path.join(game_folder, "winmm.dll")
+        self.gdweave_path = os.path.join(game_folder, "GDWeave")
+        self.mods_path = os.path.join(self.gdweave_path, "mods")
+
+
+def snapshot_store(game_folder, keep=5):
+    """Snapshots of the loader (winmm.dll and GDWeave without the user's mods and configs)"""
+    return snapshots.SnapshotStore(
+        game_folder,
+        include=("GDWeave", "winmm.dll"),
+        root=os.path.join(game_folder, snapshots.SNAPSHOT_DIR, "GDWeave"),
+        keep=keep,
+        exclude=[os.path.join("GDWeave", name) for name in PRESERVED_DIRS],
+    )
+
+
+def rollback(game_folder, name=None, keep=5):
+    """Restore the newest (or the named) loader snapshot; returns the Snapshot"""
+    return snapshot_store(game_folder, keep).rollback(name)
+
+
+def installed_version(game_folder):
+    """Version recorded by the last install, or None if unknown or not installed"""
+    marker = os.path.join(game_folder, "GDWeave", MARKER_FILE)
+    if not os.path.exists(os.path.join(game_folder, "winmm.dll")):
+        return None
+    try:
+        with open(marker, "r", encoding="utf-8") as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+_latest = None
+
+
+def latest_release(client=None, base_url=THUNDERSTORE_URL, refresh=False):
+    """Newest GDWeave release from the package API, falling back to the mod page"""
+    global _latest
+    if not refresh and _latest and time.monotonic() - _latest[0] < LATEST_TTL:
+        return _latest[1]
+    client = client or http_client.get_client()
+    base_url = base_url.rstrip("/")
+    release = None
+
+    try:
+        response = client.get(f"{base_url}/api/v1/package/{OWNER}/{NAME}/", kind=http_client.KIND_API)
+        if response.status_code == 200:
+            package_data = response.json()
+            versions = package_data.get("versions") or [package_data.get("latest") or {}]
+            if versions[0].get("version_number") and versions[0].get("download_url"):
+                release = Release(versions[0]["version_number"], versions[0]["download_url"])
+    except Exception:
+        release = None
+
+    if release is None:
+        try:
+            page_response = client.get(f"{base_url}/c/webfishing/p/{OWNER}/{NAME}/",
+                                       kind=http_client.KIND_PAGE, stream=True)
+            if page_response.status_code == 200:
+                url, strategy, version = resolver.resolve_from_response(page_response, OWNER, NAME, base_url)
+                if url and version:
+                    resolver.get_cache().put(FULL_NAME, url, strategy, version)
+                    release = Release(version, url)
+            else:
+                page_response.close()
+        except Exception as e:
+            raise GDWeaveError(f"Could not look up the latest GDWeave: {str(e)}") from e
+
+    if release is None:
+        raise GDWeaveError("Could not find the latest GDWeave release")
+    _latest = (time.monotonic(), release)
+    return release
+
+
+def fetch_archive(release, cache_dir, client=None, log=None, bandwidth=None):
+    """Path to a verified archive for release, downloading it only when the cache lacks one
+
+    bandwidth is a throttle.Bandwidth to keep the download within, if any.
+    """
+    log = log or (lambda message, msg_type="info": None)
+    os.makedirs(cache_dir, exist_ok=True)
+    zip_path = os.path.join(cache_dir, release.filename)
+
+    if os.path.exists(zip_path):
+        if _zip_ok(zip_path):
+            log(f"♻️ Using cached {release.filename}", "info")
+            return zip_path
+        os.remove(zip_path)
+
+    client = client or http_client.get_client()
+    part_path = zip_path + ".part"
+    log(f"📥 Downloading GDWeave {release.version} from: {release.download_url}", "info")
+
+    def report(downloaded, total):
+        if total > 0:
+            log(f"    Progress: {int(downloaded / total * 100)}%", "info")
+
+    try:
+        with client.get(release.download_url, kind=http_client.KIND_DOWNLOAD, stream=True) as r:
+            r.raise_for_status()
+            if bandwidth is None:
+                result = stream_to_file(r, part_path, report, progress_interval=1.0)
+            else:
+                with bandwidth.transfer() as limit:
+                    result = stream_to_file(r, part_path, report, progress_interval=1.0, throttle=limit)
+    except Exception as e:
+        _remove(part_path)
+        raise GDWeaveError(f"Download failed: {str(e)}") from e
+
+    if not _zip_ok(part_path):
+        _remove(part_path)
+        raise GDWeaveError("Downloaded GDWeave archive is not a valid zip file")
+    os.replace(part_path, zip_path)
+    log(f"✅ Downloaded: {release.filename} ({result.size} bytes, sha256 {result.sha256[:12]}…)", "success")
+    return zip_path
+
+
+def install(game_folder, cache_dir, client=None, log=None, force=False, base_url=THUNDERSTORE_URL, keep=5,
+            bandwidth=None):
+    """Install or update GDWeave in game_folder; returns an InstallResult.
+
+    Nothing is downloaded or touched when the installed version is already
+    the latest, unless force is set.
+    """
+    log = log or (lambda message, msg_type="info": None)
+    release = latest_release(client, base_url)
+    previous = installed_version(game_folder)
+    gdweave_dest = os.path.join(game_folder, "GDWeave")
+
+    if previous == release.version and os.path.isdir(gdweave_dest) and not force:
+        log(f"✅ GDWeave {previous} is already up to date", "success")
+        return InstallResult(STATUS_CURRENT, previous, previous, game_folder)
+
+    zip_path = fetch_archive(release, cache_dir, client, log, bandwidth)
+    existed = os.path.isdir(gdweave_dest)
+
+    staging = os.path.join(game_folder, STAGING_DIR)
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        log("📦 Extracting GDWeave...", "info")
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            zip_ref.extractall(staging)
+
+        winmm_src, gdweave_src = _find_payload(staging)
+        if not winmm_src or not gdweave_src:
+            raise GDWeaveError("The downloaded GDWeave package is missing winmm.dll or the GDWeave folder")
+
+        with open(os.path.join(gdweave_src, MARKER_FILE), "w", encoding="utf-8") as f:
+            json.dump({"full_name": FULL_NAME, "version": release.version,
+                       "installed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}, f, indent=2)
+
+        snapshot = snapshot_store(game_folder, keep).create(f"before GDWeave {release.version}")
+        if snapshot:
+            log(f"🔁 Snapshot of the previous GDWeave kept as {snapshot.name} "
+                f"({snapshot.files} files, {', '.join(snapshot.modes) or 'empty'})", "info")
+
+        replaced = _swap_in(gdweave_src, gdweave_dest)
+        if replaced:
+            _carry_over_user_dirs(replaced, gdweave_dest, log)
+            shutil.rmtree(replaced, ignore_errors=True)
+        incoming = os.path.join(game_folder, "winmm.dll.new")
+        shutil.copy2(winmm_src, incoming)
+        os.replace(incoming, os.path.join(game_folder, "winmm.dll"))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    status = STATUS_UPDATED if existed else STATUS_INSTALLED
+    result = InstallResult(status, release.version, previous, game_folder)
+    os.makedirs(result.mods_path, exist_ok=True)
+    log(f"✅ GDWeave {release.version} installed" + (f" (was {previous})" if previous else ""), "success")
+    return result
+
+
+def _zip_ok(path):
+    try:
+        with zipfile.ZipFile(path, "r") as archive:
+            return archive.testzip() is None
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _find_payload(root_path):
+    winmm_src = gdweave_src = None
+    for root, dirs, files in os.walk(root_path):
+        if not winmm_src and "winmm.dll" in files:
+            winmm_src = os.path.join(root, "winmm.dll")
+        if not gdweave_src and "GDWeave" in dirs:
+            gdweave_src = os.path.join(root, "GDWeave")
+        if winmm_src and gdweave_src:
+            break
+    return winmm_src, gdweave_src
+
+
+def _carry_over_user_dirs(old_tree, new_tree, log):
+    """Move mods/ and configs/ from the replaced tree into the new one, adding any the package ships"""
+    for name in PRESERVED_DIRS:
+        installed = os.path.join(old_tree, name)
+        packaged = os.path.join(new_tree, name)
+        if not os.path.isdir(installed):
+            continue
+        if os.path.isdir(packaged):
+            for item in os.listdir(packaged):
+                if not os.path.exists(os.path.join(installed, item)):
+                    shutil.move(os.path.join(packaged, item), os.path.join(installed, item))
+            shutil.rmtree(packaged)
+        os.rename(installed, packaged)
+        log(f"📁 Kept existing {name} folder", "info")
+
+
+def _swap_in(new_tree, dest):
+    """Rename new_tree onto dest; returns where the previous tree was moved, or None"""
+    if not os.path.exists(dest):
+        os.rename(new_tree, dest)
+        return None
+    replaced = dest + ".replaced"
+    shutil.rmtree(replaced, ignore_errors=True)
+    os.rename(dest, replaced)
+    try:
+        os.rename(new_tree, dest)
+    except OSError:
+        os.rename(replaced, dest)
+        raise
+    return replaced
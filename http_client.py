@@ -0,0 +1,161 @@
+"""Application-wide HTTP client.
+
+Every network call (package listing, API lookups, mod pages, archives,
+icons) goes through one HttpClient so connections are pooled and kept
+alive instead of re-handshaking per request. Requests are grouped by what
+they fetch: "api" (JSON and HTML from thunderstore.io) and "cdn" (archives
+and icons, served from the CDN). Each group has its own requests.Session
+with pool sizes suited to it.
+
+    client = http_client.get_client()
+    packages = client.get(url, kind=http_client.KIND_API).json()
+    with client.get(archive_url, kind=http_client.KIND_DOWNLOAD, stream=True) as r: ...
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+USER_AGENT = "WebFishing Mod Manager/1.0"
+
+# What a request fetches; decides the pool, timeout and headers
+KIND_API = "api"
+KIND_PAGE = "page"
+KIND_DOWNLOAD = "download"
+KIND_ICON = "icon"
+
+GROUP_API = "api"
+GROUP_CDN = "cdn"
+
+KIND_GROUPS = {
+    KIND_API: GROUP_API,
+    KIND_PAGE: GROUP_API,
+    KIND_DOWNLOAD: GROUP_CDN,
+    KIND_ICON: GROUP_CDN,
+}
+
+# (connect, read) seconds
+TIMEOUTS = {
+    KIND_API: (5, 15),
+    KIND_PAGE: (5, 15),
+    KIND_DOWNLOAD: (5, 30),
+    KIND_ICON: (5, 10),
+}
+
+KIND_HEADERS = {
+    KIND_API: {"Accept": "application/json", "Accept-Encoding": "gzip, deflate"},
+    KIND_PAGE: {"Accept": "text/html,application/xhtml+xml", "Accept-Encoding": "gzip, deflate"},
+    # Archives and images are already compressed; identity keeps Content-Length usable for progress
+    KIND_DOWNLOAD: {"Accept": "*/*", "Accept-Encoding": "identity"},
+    KIND_ICON: {"Accept": "image/*", "Accept-Encoding": "identity"},
+}
+
+# pool_connections: hosts kept per group; pool_maxsize: connections kept per host
+POOL_SIZES = {
+    GROUP_API: {"pool_connections": 4, "pool_maxsize": 8},
+    GROUP_CDN: {"pool_connections": 8, "pool_maxsize": 16},
+}
+
+
+class HttpClient:
+    """Pooled, keep-alive sessions per request group with shared defaults and reuse stats"""
+
+    def __init__(self, pool_sizes=None, user_agent=USER_AGENT):
+        self.pool_sizes = {group: dict(sizes) for group, sizes in POOL_SIZES.items()}
+        for group, sizes in (pool_sizes or {}).items():
+            self.pool_sizes.setdefault(group, {}).update(sizes)
+        self.user_agent = user_agent
+        self._sessions = {}
+        self._adapters = {}
+        self._lock = threading.Lock()
+        self._requests = {group: 0 for group in self.pool_sizes}
+
+    def session(self, group):
+        """The requests.Session for a group, created on first use"""
+        with self._lock:
+            session = self._sessions.get(group)
+            if session is None:
+                sizes = self.pool_sizes[group]
+                adapter = HTTPAdapter(pool_connections=sizes["pool_connections"],
+                                      pool_maxsize=sizes["pool_maxsize"])
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"User-Agent": self.user_agent, "Connection": "keep-alive"})
+                self._sessions[group] = session
+                self._adapters[group] = adapter
+            return session
+
+    def request(self, method, url, kind=KIND_API, **kwargs):
+        """Send a request with the pool, timeout and headers for kind; extra kwargs go to requests"""
+        group = KIND_GROUPS[kind]
+        kwargs.setdefault("timeout", TIMEOUTS[kind])
+        headers = dict(KIND_HEADERS[kind])
+        headers.update(kwargs.pop("headers", None) or {})
+        session = self.session(group)
+        with self._lock:
+            self._requests[group] += 1
+        return session.request(method, url, headers=headers, **kwargs)
+
+    def get(self, url, kind=KIND_API, **kwargs):
+        """GET url with the pool, timeout and headers for kind; extra kwargs go to requests"""
+        return self.request("GET", url, kind, **kwargs)
+
+    def put(self, url, kind=KIND_DOWNLOAD, **kwargs):
+        """PUT to url (uploads go through the download pool unless kind says otherwise)"""
+        return self.request("PUT", url, kind, **kwargs)
+
+    def delete(self, url, kind=KIND_DOWNLOAD, **kwargs):
+        """DELETE url (through the download pool unless kind says otherwise)"""
+        return self.request("DELETE", url, kind, **kwargs)
+
+    def stats(self):
+        """Requests, connections opened and connections reused, per group and host"""
+        with self._lock:
+            adapters = dict(self._adapters)
+            requests_by_group = dict(self._requests)
+        stats = {}
+        for group, count in requests_by_group.items():
+            hosts = {}
+            adapter = adapters.get(group)
+            if adapter is not None:
+                pools = adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    host = f"{pool.host}:{pool.port}" if pool.port else pool.host
+                    hosts[host] = {
+                        "requests": pool.num_requests,
+                        "connections": pool.num_connections,
+                        "reused": max(pool.num_requests - pool.num_connections, 0),
+                    }
+            stats[group] = {
+                "requests": count,
+                "connections": sum(h["connections"] for h in hosts.values()),
+                "reused": sum(h["reused"] for h in hosts.values()),
+                "hosts": hosts,
+            }
+        return stats
+
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._adapters.clear()
+        for session in sessions:
+            session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The shared HttpClient, created on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -0,0 +1,211 @@
+"""Bulk import of mod lists: pasted text, text files, presets and r2modman profiles.
+
+Everything is reduced to Thunderstore page URLs in one pass, deduplicated by
+full_name with a set, then checked against the package listing (or the
+package API when no listing is loaded) with a thread pool.
+
+Accepted input:
+  * mod page URLs anywhere in the text, one or many per line
+  * "Author-Name" or "Author-Name-1.2.3" tokens (dependency strings, mod lists)
+  * JSON: WebLoader presets (mod_urls), Thunderstore manifests (dependencies)
+  * r2modman profile exports (.r2z) and profile codes shared through Thunderstore
+"""
+import io
+import re
+import json
+import base64
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+from engine import EngineError, THUNDERSTORE_URL, extract_mod_info_from_url, is_gdweave_url
+
+
+MOD_URL = re.compile(r"https?://(?:www\.)?thunderstore\.io/c/webfishing/p/[^/\s\"'<>]+/[^/\s\"'<>]+/?", re.IGNORECASE)
+# Author-Name with an optional -major.minor.patch; Thunderstore names are letters, digits and underscores
+PACKAGE_ID = re.compile(r"(?<![\w/.-])([A-Za-z0-9_]+)-([A-Za-z0-9_]+)(?:-(\d+\.\d+\.\d+))?(?![\w/-])")
+PROFILE_CODE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
+
+R2MODMAN_EXPORT = "export.r2x"
+R2MODMAN_HEADER = "#r2modman"
+
+VALIDATE_JOBS = 8
+
+
+class IngestError(EngineError):
+    """An import source could not be read"""
+
+
+class Ingested:
+    """Result of parsing: unique mods in input order, plus what was dropped and why"""
+
+    def __init__(self):
+        # full_name -> page URL, in first-seen order
+        self.mods = {}
+        self.duplicates = 0
+        self.skipped = []
+        self.invalid = []
+
+    def add(self, author, name):
+        full_name = f"{author}-{name}"
+        if is_gdweave_url(full_name):
+            self.skipped.append(full_name)
+            return
+        if full_name in self.mods:
+            self.duplicates += 1
+            return
+        self.mods[full_name] = page_url(author, name)
+
+    def add_url(self, url):
+        mod_info = extract_mod_info_from_url(url)
+        if mod_info:
+            self.add(mod_info["author"], mod_info["name"])
+        else:
+            self.invalid.append(url)
+
+    def urls(self):
+        return list(self.mods.values())
+
+
+def page_url(author, name):
+    return f"{THUNDERSTORE_URL}/c/webfishing/p/{author}/{name}/"
+
+
+def parse_text(text, result=None):
+    """Collect mod page URLs and Author-Name[-version] tokens from free text"""
+    result = result or Ingested()
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        urls = MOD_URL.findall(line)
+        for url in urls:
+            result.add_url(url)
+        tokens = MOD_URL.sub(" ", line).split()
+        result.invalid.extend(token for token in tokens if "://" in token)
+        rest = " ".join(token for token in tokens if "://" not in token)
+        for match in PACKAGE_ID.finditer(rest):
+            result.add(match.group(1), match.group(2))
+    return result
+
+
+def parse_json(data, result=None):
+    """Presets (mod_urls), lockfiles (lock.mods) and manifests (dependencies)"""
+    result = result or Ingested()
+    if isinstance(data, dict):
+        for url in data.get("mod_urls", []):
+            result.add_url(url)
+        for entry in data.get("lock", {}).get("mods", []) if isinstance(data.get("lock"), dict) else ():
+            parse_text(entry.get("full_name", ""), result)
+        for dependency in data.get("dependencies", []):
+            parse_text(str(dependency), result)
+    elif isinstance(data, list):
+        for item in data:
+            parse_text(item if isinstance(item, str) else json.dumps(item), result)
+    return result
+
+
+def parse_r2x(text, result=None):
+    """Enabled mods from an r2modman export.r2x (a small YAML file; no YAML parser needed)"""
+    result = result or Ingested()
+    entries = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("- name:"):
+            entries.append({"name": stripped[len("- name:"):].strip().strip("'\""), "enabled": True})
+        elif stripped.startswith("enabled:") and entries:
+            entries[-1]["enabled"] = stripped.split(":", 1)[1].strip().lower() != "false"
+    for entry in entries:
+        if entry["enabled"]:
+            parse_text(entry["name"], result)
+    return result
+
+
+def parse_r2z(data, result=None):
+    """An r2modman profile export (.r2z zip holding export.r2x)"""
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            text = archive.read(R2MODMAN_EXPORT).decode("utf-8", errors="replace")
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise IngestError(f"Not an r2modman profile export: {str(e)}") from e
+    return parse_r2x(text, result)
+
+
+def parse_file(path, result=None):
+    """Dispatch on content: zip (r2modman export), JSON, or plain text"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        raise IngestError(f"Could not read {path}: {str(e)}") from e
+    if data[:2] == b"PK":
+        return parse_r2z(data, result)
+    text = data.decode("utf-8-sig", errors="replace")
+    try:
+        return parse_json(json.loads(text), result)
+    except ValueError:
+        return parse_text(text, result)
+
+
+def fetch_profile_code(code, client=None, base_url=THUNDERSTORE_URL, result=None):
+    """Mods of an r2modman profile shared as a code"""
+    client = client or http_client.get_client()
+    url = f"{base_url.rstrip('/')}/api/experimental/legacyprofile/get/{code.strip()}/"
+    try:
+        response = client.get(url, kind=http_client.KIND_API)
+    except Exception as e:
+        raise IngestError(f"Could not fetch profile {code}: {str(e)}") from e
+    if response.status_code != 200:
+        raise IngestError(f"Profile {code} not found (HTTP {response.status_code})")
+    payload = response.text.strip()
+    if payload.startswith(R2MODMAN_HEADER):
+        payload = payload[len(R2MODMAN_HEADER):].strip()
+    try:
+        data = base64.b64decode(payload)
+    except ValueError as e:
+        raise IngestError(f"Profile {code} is not a valid export: {str(e)}") from e
+    return parse_r2z(data, result)
+
+
+def parse_input(text, client=None, base_url=THUNDERSTORE_URL):
+    """Parse pasted text; a lone profile code is fetched and expanded"""
+    stripped = text.strip()
+    if PROFILE_CODE.match(stripped):
+        return fetch_profile_code(stripped, client, base_url)
+    return parse_text(text)
+
+
+def listing_names(listing):
+    """Set of full_names in a package listing (the mod browser's data)"""
+    names = set()
+    for package in listing or ():
+        full_name = package.get("full_name") or f"{package.get('owner')}-{package.get('name')}"
+        names.add(full_name.lower())
+    return names
+
+
+def validate(full_names, listing=None, client=None, base_url=THUNDERSTORE_URL, jobs=VALIDATE_JOBS):
+    """(found, missing) full_names; checked against listing if given, else against the package API in parallel"""
+    full_names = list(full_names)
+    if listing:
+        known = listing_names(listing)
+        found = [name for name in full_names if name.lower() in known]
+        return found, [name for name in full_names if name.lower() not in known]
+
+    client = client or http_client.get_client()
+    base_url = base_url.rstrip("/")
+
+    def exists(full_name):
+        author, name = full_name.split("-", 1)
+        try:
+            response = client.get(f"{base_url}/api/v1/package/{author}/{name}/", kind=http_client.KIND_API)
+            response.close()
+        except Exception:
+            # Could not check; let the download report it
+            return True
+        return response.status_code != 404
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        checks = list(pool.map(exists, full_names))
+    found = [name for name, ok in zip(full_names, checks) if ok]
+    return found, [name for name, ok in zip(full_names, checks) if not ok]
@@ -0,0 +1,74 @@
+"""Which Thunderstore package is installed in which mods subfolder, at which version.
+
+Mod archives unpack to a folder named after the mod, not after the
+package, so the mods folder alone cannot say that "SkateFishing" is
+Lez-SkateFishing 1.2.0. The engine records every install in
+webloader_installed.json next to the mods it installed:
+
+    {"Lez-SkateFishing": {"folder": "SkateFishing", "version": "1.2.0",
+                          "sha256": "...", "size": 12345, "installed_at": "..."}}
+"""
+import os
+import json
+from datetime import datetime
+
+
+INDEX_FILE = "webloader_installed.json"
+
+
+class InstalledIndex:
+    """The install index of one mods folder"""
+
+    def __init__(self, download_folder):
+        self.download_folder = download_folder
+        self.path = os.path.join(download_folder, INDEX_FILE)
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.entries = data if isinstance(data, dict) else {}
+        return self
+
+    def save(self):
+        os.makedirs(self.download_folder, exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(self.path + ".tmp", self.path)
+
+    def record(self, full_name, folder, version=None, sha256=None, size=None):
+        self.entries[full_name] = {
+            "folder": folder,
+            "version": version,
+            "sha256": sha256,
+            "size": size,
+            "installed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def remove(self, full_name):
+        return self.entries.pop(full_name, None)
+
+    def get(self, full_name):
+        """The entry for full_name if its folder is still there, else None"""
+        entry = self.entries.get(full_name)
+        if entry and os.path.isdir(os.path.join(self.download_folder, entry.get("folder") or "")):
+            return entry
+        return None
+
+    def folder(self, full_name, name=None):
+        """Folder a package is installed in: from the index, else a folder named after it, else None"""
+        entry = self.get(full_name)
+        if entry:
+            return entry["folder"]
+        for candidate in (full_name, name):
+            if candidate and os.path.isdir(os.path.join(self.download_folder, candidate)):
+                return candidate
+        return None
+
+    def installed(self):
+        """full_name -> entry for every indexed package still present"""
+        return {full_name: entry for full_name, entry in self.entries.items() if self.get(full_name)}
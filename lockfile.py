@@ -0,0 +1,245 @@
+"""Pinned presets: exact versions, URLs and hashes for a mod list and its dependencies.
+
+A lockfile is an ordinary preset (it keeps mod_urls, so Load Preset and
+older versions still read it) with a "lock" section:
+
+    {
+      "name": "...",
+      "mod_urls": [...],
+      "lock": {
+        "format_version": 1,
+        "mods": [
+          {"full_name": "Author-Name", "version": "1.2.0",
+           "download_url": "...", "size": 12345, "sha256": "...",
+           "dependencies": ["Other-Mod-1.0.0"], "mod_url": "..."},
+          ...
+        ]
+      }
+    }
+
+Installing from it (ModEngine.run_locked) skips the API and page scraping
+entirely and rejects any archive whose SHA-256 or size differs.
+"""
+import os
+import json
+import shutil
+import tempfile
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from engine import EngineError, PresetError, extract_mod_info_from_url, is_gdweave_url
+
+
+FORMAT_VERSION = 1
+
+
+class LockedMod:
+    """One pinned archive"""
+
+    def __init__(self, full_name, version, download_url, size, sha256, dependencies=(), mod_url=None):
+        self.full_name = full_name
+        self.version = version
+        self.download_url = download_url
+        self.size = size
+        self.sha256 = sha256
+        self.dependencies = list(dependencies)
+        self.mod_url = mod_url
+
+    @property
+    def author(self):
+        return self.full_name.split("-", 1)[0]
+
+    @property
+    def name(self):
+        return self.full_name.split("-", 1)[1]
+
+    @property
+    def filename(self):
+        return f"{self.full_name}-{self.version}.zip"
+
+    def to_dict(self):
+        entry = {
+            "full_name": self.full_name,
+            "version": self.version,
+            "download_url": self.download_url,
+            "size": self.size,
+            "sha256": self.sha256,
+            "dependencies": self.dependencies,
+        }
+        if self.mod_url:
+            entry["mod_url"] = self.mod_url
+        return entry
+
+    @classmethod
+    def from_dict(cls, entry):
+        try:
+            mod = cls(entry["full_name"], entry["version"], entry["download_url"], int(entry["size"]),
+                      entry["sha256"].lower(), entry.get("dependencies", []), entry.get("mod_url"))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise PresetError(f"Invalid lockfile entry {entry!r}: {str(e)}") from e
+        if "-" not in mod.full_name or len(mod.sha256) != 64:
+            raise PresetError(f"Invalid lockfile entry for {mod.full_name}")
+        return mod
+
+
+class Lockfile:
+    """A named list of LockedMods; mod_urls are the mods that were asked for"""
+
+    def __init__(self, name, mods, mod_urls=(), created_at=None):
+        self.name = name
+        self.mods = list(mods)
+        self.mod_urls = list(mod_urls)
+        self.created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    @property
+    def total_size(self):
+        return sum(mod.size for mod in self.mods)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "mod_urls": self.mod_urls,
+            "created_at": self.created_at,
+            "created_by": "WebFishing Mod Manager",
+            "lock": {"format_version": FORMAT_VERSION, "mods": [mod.to_dict() for mod in self.mods]},
+        }
+
+
+def parse_dependency(dependency):
+    """("Author-Name", "1.0.0") from a Thunderstore dependency string"""
+    full_name, _, version = dependency.rpartition("-")
+    return full_name, version
+
+
+def version_key(version):
+    parts = []
+    for part in (version or "").split("."):
+        parts.append(int(part) if part.isdigit() else 0)
+    return tuple(parts)
+
+
+def load_lockfile(preset_path):
+    """The Lockfile in a preset file, or None for a plain preset"""
+    try:
+        with open(preset_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise PresetError(f"Failed to load preset: {str(e)}") from e
+    return from_dict(data, os.path.basename(preset_path))
+
+
+def from_dict(data, default_name="Locked preset"):
+    """The Lockfile in parsed preset JSON, or None for a plain preset"""
+    if not isinstance(data, dict) or "lock" not in data:
+        return None
+    lock = data["lock"]
+    if not isinstance(lock, dict) or lock.get("format_version") != FORMAT_VERSION:
+        raise PresetError("Unsupported lockfile format")
+    mods = [LockedMod.from_dict(entry) for entry in lock.get("mods", [])]
+    return Lockfile(data.get("name", default_name), mods, data.get("mod_urls", []), data.get("created_at"))
+
+
+def save_lockfile(preset_path, lockfile):
+    try:
+        with open(preset_path, "w", encoding="utf-8") as f:
+            json.dump(lockfile.to_dict(), f, indent=2)
+    except OSError as e:
+        raise PresetError(f"Failed to save lockfile: {str(e)}") from e
+
+
+def merge(lockfiles, name=None):
+    """One Lockfile with every mod of lockfiles, keeping the newest version of each"""
+    chosen = {}
+    mod_urls = []
+    for lockfile in lockfiles:
+        mod_urls.extend(url for url in lockfile.mod_urls if url not in mod_urls)
+        for mod in lockfile.mods:
+            current = chosen.get(mod.full_name)
+            if current is None or version_key(mod.version) > version_key(current.version):
+                chosen[mod.full_name] = mod
+    return Lockfile(name or "+".join(lockfile.name for lockfile in lockfiles), chosen.values(), mod_urls)
+
+
+def lock(engine, mod_urls, name="Locked preset", archive_dir=None):
+    """Resolve mod_urls and their dependencies to exact versions and hash every archive.
+
+    Each archive is downloaded once (in parallel, engine.jobs at a time),
+    CRC-checked and measured, then deleted or kept in archive_dir as
+    LockedMod.filename.
+    GDWeave is left out; it is installed into the game folder. Raises
+    EngineError naming every mod that failed.
+    """
+    resolved = {}
+    pending = []
+    for mod_url in dict.fromkeys(url.strip() for url in mod_urls if url.strip()):
+        if is_gdweave_url(mod_url):
+            continue
+        mod_info = extract_mod_info_from_url(mod_url)
+        if not mod_info:
+            raise EngineError(f"Invalid mod URL: {mod_url}")
+        pending.append((mod_info, None, mod_url))
+
+    failures = []
+    while pending:
+        mod_info, version, mod_url = pending.pop(0)
+        full_name = mod_info["full_name"]
+        current = resolved.get(full_name)
+        if current is not None and (version is None or version_key(version) <= version_key(current[1].version)):
+            continue
+        try:
+            resolution = engine.resolve(mod_info, mod_url, version=version)
+        except EngineError as e:
+            failures.append(f"{full_name}: {str(e)}")
+            continue
+        if not resolution.version:
+            failures.append(f"{full_name}: could not determine the version")
+            continue
+        engine.log(f"  🔒 {full_name} {resolution.version}", "info")
+        resolved[full_name] = (mod_info, resolution, mod_url or (current[2] if current else None))
+        for dependency in resolution.dependencies:
+            dep_name, dep_version = parse_dependency(dependency)
+            if is_gdweave_url(dep_name) or "-" not in dep_name:
+                continue
+            author, dep = dep_name.split("-", 1)
+            pending.append(({"community": "webfishing", "author": author, "name": dep, "full_name": dep_name},
+                            dep_version, None))
+
+    staging = tempfile.mkdtemp(prefix="webloader_lock_", dir=archive_dir)
+
+    def measure(item):
+        full_name, (mod_info, resolution, mod_url) = item
+        record = metrics.ModMetrics(full_name)
+        record.version = resolution.version
+        path = os.path.join(staging, resolution.filename)
+        try:
+            engine.fetch(full_name, resolution, staging, record)
+            # A hash is only worth pinning for an archive that will install
+            engine.test_archive(path)
+            engine.publish_archive(full_name, path, record)
+            mod = LockedMod(full_name, resolution.version, resolution.download_url, record.archive_size,
+                            record.sha256, resolution.dependencies, mod_url)
+            if archive_dir is not None:
+                os.replace(path, os.path.join(archive_dir, mod.filename))
+        except EngineError as e:
+            return full_name, str(e)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        return mod, None
+
+    try:
+        with ThreadPoolExecutor(max_workers=engine.jobs) as pool:
+            results = list(pool.map(measure, resolved.items()))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    mods = []
+    for mod, error in results:
+        if error:
+            failures.append(f"{mod}: {error}")
+        else:
+            mods.append(mod)
+    if failures:
+        raise EngineError("Could not lock " + "; ".join(failures))
+    return Lockfile(name, mods, [mod_url for mod_url in mod_urls if mod_url.strip()])
@@ -0,0 +1,150 @@
+"""Per-mod phase timings and batch statistics for download_summary.json."""
+import time
+
+
+# Phase names as they appear in the summary
+PHASE_API = "api"
+PHASE_SCRAPE = "scrape"
+PHASE_TRANSFER = "transfer"
+PHASE_TESTZIP = "testzip"
+PHASE_EXTRACT = "extract"
+PHASE_COPY = "copy"
+
+PHASES = (PHASE_API, PHASE_SCRAPE, PHASE_TRANSFER, PHASE_TESTZIP, PHASE_EXTRACT, PHASE_COPY)
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class ModMetrics:
+    """Wall time per phase plus transfer/install counters for one mod"""
+
+    def __init__(self, mod):
+        self.mod = mod
+        self.status = "pending"
+        self.strategy = None
+        self.error = None
+        self.bytes_transferred = 0
+        self.archive_size = 0
+        self.files_written = 0
+        self.retries = 0
+        self.sha256 = None
+        self.version = None
+        # Where the archive came from: "origin" or a mirror (see mirrors.py)
+        self.source = None
+        self.phases = {}
+        self._phase = None
+        self._phase_started = None
+        self._started = time.perf_counter()
+        self._finished = None
+
+    def enter_phase(self, phase):
+        """Close the running phase (if any) and start timing a new one"""
+        now = time.perf_counter()
+        self._close_phase(now)
+        self._phase = phase
+        self._phase_started = now
+
+    def leave_phase(self):
+        """Close the running phase without starting another (e.g. while a looked-ahead mod waits its turn)"""
+        self._close_phase(time.perf_counter())
+
+    def count_retry(self):
+        self.retries += 1
+
+    def finish(self, status, error=None):
+        now = time.perf_counter()
+        self._close_phase(now)
+        self._finished = now
+        self.status = status
+        if error:
+            self.error = str(error)
+
+    def _close_phase(self, now):
+        if self._phase is not None:
+            elapsed = now - self._phase_started
+            self.phases[self._phase] = self.phases.get(self._phase, 0.0) + elapsed
+            self._phase = None
+            self._phase_started = None
+
+    @property
+    def total_seconds(self):
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return end - self._started
+
+    def to_dict(self):
+        record = {
+            "mod": self.mod,
+            "status": self.status,
+            "resolution_strategy": self.strategy,
+            "bytes_transferred": self.bytes_transferred,
+            "archive_size": self.archive_size,
+            "files_written": self.files_written,
+            "retries": self.retries,
+            "total_seconds": round(self.total_seconds, 4),
+            "phase_seconds": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+        }
+        if self.sha256:
+            record["sha256"] = self.sha256
+        if self.version:
+            record["version"] = self.version
+        if self.source:
+            record["source"] = self.source
+        if self.error:
+            record["error"] = self.error
+        return record
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of values (pct in 0..100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * (pct / 100.0)
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _distribution(values):
+    stats = {f"p{pct}": round(percentile(values, pct), 4) for pct in PERCENTILES}
+    stats["max"] = round(max(values), 4)
+    stats["total"] = round(sum(values), 4)
+    return stats
+
+
+def batch_metrics(records, wall_seconds):
+    """Aggregate ModMetrics into batch totals and percentiles"""
+    bytes_total = sum(r.bytes_transferred for r in records)
+    timed = [r for r in records if r.status != "skipped"]
+
+    phases = {}
+    for phase in PHASES:
+        values = [r.phases[phase] for r in timed if phase in r.phases]
+        if values:
+            phases[phase] = _distribution(values)
+
+    strategies = {}
+    sources = {}
+    for r in records:
+        if r.strategy:
+            strategies[r.strategy] = strategies.get(r.strategy, 0) + 1
+        if r.source:
+            sources[r.source] = sources.get(r.source, 0) + 1
+
+    summary = {
+        "wall_seconds": round(wall_seconds, 4),
+        "bytes_transferred": bytes_total,
+        "archive_bytes": sum(r.archive_size for r in records),
+        "files_written": sum(r.files_written for r in records),
+        "retries": sum(r.retries for r in records),
+        "throughput_bytes_per_second": round(bytes_total / wall_seconds, 1) if wall_seconds > 0 else 0,
+        "resolution_strategies": strategies,
+        "phase_seconds": phases,
+    }
+    if sources:
+        summary["sources"] = sources
+    if timed:
+        summary["mod_seconds"] = _distribution([r.total_seconds for r in timed])
+    return summary
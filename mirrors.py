@@ -0,0 +1,231 @@
+"""Archive mirrors: send each download to the fastest healthy source.
+
+The package API gives one download_url per archive (the "origin"). A
+MirrorSet adds other sources for the same archives, e.g. a public mirror
+or a caching proxy on the local network. A mirror is either a base URL
+that serves Thunderstore's /package/download/<Author>/<Name>/<version>/
+paths, or a template using {author}, {name}, {version} and {full_name}:
+
+    http://192.168.1.20:8080
+    https://mirror.example/webfishing/{full_name}-{version}.zip
+
+probe() reads the first PROBE_BYTES of one archive from every source with
+a Range request, timing the first byte (latency) and the rest
+(throughput). Results are kept in a JSON cache for PROBE_TTL seconds, and
+every finished download updates its source's throughput. candidates()
+ranks the sources by the expected time for a TYPICAL_SIZE archive. A
+source that fails is put on hold for FAILURE_HOLD seconds, and the engine
+moves on to the next candidate.
+"""
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+import resolver
+
+
+ORIGIN = "origin"
+MIRRORS_CACHE_FILE = "mirrors.json"
+
+PROBE_BYTES = 256 * 1024
+PROBE_TTL = 3600.0
+PROBE_TIMEOUT = (3, 5)
+TYPICAL_SIZE = 2 * 1024 * 1024
+FAILURE_HOLD = 300.0
+# Weight of a new throughput measurement against the running figure
+SMOOTHING = 0.3
+# Downloads smaller than this say more about latency than throughput
+MIN_SAMPLE = 256 * 1024
+
+
+def default_cache_path():
+    """mirrors.json in the app-data cache (%APPDATA%\\WebLoader\\cache, ~/.cache/webloader elsewhere)"""
+    if os.getenv("APPDATA"):
+        return os.path.join(os.getenv("APPDATA"), "WebLoader", "cache", MIRRORS_CACHE_FILE)
+    return os.path.join(os.path.expanduser("~"), ".cache", "webloader", MIRRORS_CACHE_FILE)
+
+
+def parse_mirrors(text):
+    """Mirror URLs from a comma, space or newline separated string (or a list)"""
+    if isinstance(text, (list, tuple)):
+        items = text
+    else:
+        items = (text or "").replace(",", " ").split()
+    return [item.strip() for item in items if item.strip()]
+
+
+class SourceStats:
+    """What is known about one source"""
+
+    def __init__(self, latency=None, throughput=None, probed_at=0.0, failures=0):
+        self.latency = latency
+        self.throughput = throughput
+        self.probed_at = probed_at
+        self.failures = failures
+        self.hold_until = 0.0
+
+    def expected_seconds(self, size=TYPICAL_SIZE):
+        """Estimated time to fetch size bytes, or None if never measured"""
+        if self.latency is None or not self.throughput:
+            return None
+        return self.latency + size / self.throughput
+
+    def to_dict(self):
+        return {"latency": self.latency, "throughput": self.throughput, "probed_at": self.probed_at,
+                "failures": self.failures}
+
+
+class MirrorSet:
+    """Mirrors plus the origin, ranked by measured speed and health"""
+
+    def __init__(self, mirrors, cache_path=None, client=None, log=None, use_origin=True):
+        self.mirrors = [mirror.rstrip("/") if "{" not in mirror else mirror for mirror in parse_mirrors(mirrors)]
+        self.sources = self.mirrors + ([ORIGIN] if use_origin else [])
+        self.cache_path = cache_path
+        self.client = client or http_client.get_client()
+        self._log = log
+        self._lock = threading.Lock()
+        self.stats = {source: SourceStats() for source in self.sources}
+        self.load()
+
+    def log(self, message, msg_type="info"):
+        if self._log:
+            self._log(message, msg_type)
+
+    def load(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for source, entry in (data.get("sources", {}) if isinstance(data, dict) else {}).items():
+            if source in self.stats and isinstance(entry, dict):
+                self.stats[source] = SourceStats(entry.get("latency"), entry.get("throughput"),
+                                                 entry.get("probed_at", 0.0), entry.get("failures", 0))
+
+    def save(self):
+        if not self.cache_path:
+            return
+        with self._lock:
+            data = {"sources": {source: stats.to_dict() for source, stats in self.stats.items()}}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(self.cache_path + ".tmp", self.cache_path)
+        except OSError as e:
+            self.log(f"  ⚠️ Could not save mirror measurements: {str(e)}", "warning")
+
+    def url_for(self, source, resolution, mod_key):
+        """Where source serves the archive of resolution, or None if its version is unknown"""
+        if source == ORIGIN:
+            return resolution.download_url
+        match = resolver.PACKAGE_DOWNLOAD_PATH.search(resolution.download_url or "")
+        if match:
+            author, name, version = match.groups()
+        elif resolution.version and "-" in mod_key:
+            author, name = mod_key.split("-", 1)
+            version = resolution.version
+        else:
+            return None
+        if "{" in source:
+            return source.format(author=author, name=name, version=version, full_name=f"{author}-{name}")
+        return f"{source}{resolver.download_path(author, name, version)}"
+
+    def _rank(self, item):
+        position, source = item
+        stats = self.stats[source]
+        expected = stats.expected_seconds()
+        # Measured sources by speed, then unmeasured ones in the configured order
+        return (expected is None, expected or 0.0, position)
+
+    def candidates(self, resolution, mod_key):
+        """(source, url) pairs to try, best first; sources on hold go last"""
+        now = time.monotonic()
+        with self._lock:
+            ranked = [source for _, source in sorted(enumerate(self.sources), key=self._rank)]
+            healthy = [source for source in ranked if self.stats[source].hold_until <= now]
+            held = [source for source in ranked if self.stats[source].hold_until > now]
+        pairs = []
+        for source in healthy + held:
+            url = self.url_for(source, resolution, mod_key)
+            if url:
+                pairs.append((source, url))
+        return pairs
+
+    def record_success(self, source, size, seconds):
+        with self._lock:
+            stats = self.stats[source]
+            stats.failures = 0
+            stats.hold_until = 0.0
+            if size >= MIN_SAMPLE and seconds > 0:
+                rate = size / seconds
+                stats.throughput = rate if not stats.throughput else \
+                    (1 - SMOOTHING) * stats.throughput + SMOOTHING * rate
+
+    def record_failure(self, source):
+        with self._lock:
+            stats = self.stats[source]
+            stats.failures += 1
+            stats.hold_until = time.monotonic() + FAILURE_HOLD
+
+    def stale(self, now=None):
+        now = now or time.time()
+        return [source for source in self.sources if now - self.stats[source].probed_at > PROBE_TTL]
+
+    def probe(self, resolution, mod_key, force=False):
+        """Measure every source (only those not probed within PROBE_TTL unless force) on one archive"""
+        sources = self.sources if force else self.stale()
+        targets = [(source, self.url_for(source, resolution, mod_key)) for source in sources]
+        targets = [(source, url) for source, url in targets if url]
+        if not targets:
+            return
+        with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+            results = list(pool.map(lambda target: (target[0], self._probe_one(target[1])), targets))
+
+        now = time.time()
+        with self._lock:
+            for source, measured in results:
+                stats = self.stats[source]
+                stats.probed_at = now
+                if measured is None:
+                    stats.failures += 1
+                    stats.hold_until = time.monotonic() + FAILURE_HOLD
+                else:
+                    stats.latency, stats.throughput = measured
+                    stats.failures = 0
+                    stats.hold_until = 0.0
+        for source, measured in results:
+            if measured is None:
+                self.log(f"  🪞 {source}: unavailable", "warning")
+            else:
+                self.log(f"  🪞 {source}: {measured[0] * 1000:.0f} ms, {measured[1] / 1048576:.1f} MB/s", "info")
+        self.save()
+
+    def _probe_one(self, url):
+        """(latency seconds, bytes per second) for the first PROBE_BYTES of url, or None"""
+        started = time.perf_counter()
+        try:
+            with self.client.get(url, kind=http_client.KIND_DOWNLOAD, stream=True, timeout=PROBE_TIMEOUT,
+                                 headers={"Range": f"bytes=0-{PROBE_BYTES - 1}"}) as r:
+                if r.status_code not in (200, 206):
+                    return None
+                first = None
+                received = 0
+                for chunk in r.iter_content(64 * 1024):
+                    if first is None:
+                        first = time.perf_counter()
+                    received += len(chunk)
+                    if received >= PROBE_BYTES:
+                        break
+        except Exception:
+            return None
+        if first is None:
+            return None
+        finished = time.perf_counter()
+        return first - started, received / max(finished - first, 1e-3)
@@ -0,0 +1,225 @@
+"""Typed progress events for mod batches.
+
+The download worker emits events on an EventBus instead of touching Tk
+widgets. The GUI drains a queue at its own frame rate; headless consumers
+can subscribe a callback or a queue of their own.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+
+# Phases a mod moves through while it is processed
+PHASE_RESOLVE = "resolve"
+PHASE_DOWNLOAD = "download"
+PHASE_VERIFY = "verify"
+PHASE_EXTRACT = "extract"
+PHASE_INSTALL = "install"
+
+
+@dataclass
+class BatchStarted:
+    total_mods: int
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass
+class PhaseChanged:
+    mod: str
+    phase: str
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass
+class BytesTransferred:
+    mod: str
+    downloaded: int
+    total: int
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass
+class ModDone:
+    mod: str
+    folder: str = ""
+    skipped: bool = False
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass
+class ModFailed:
+    mod: str
+    error: str = ""
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass
+class RetryPassStarted:
+    mods: list
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass
+class BatchFinished:
+    successful: int
+    failed: int
+    skipped: int
+    timestamp: float = field(default_factory=time.time)
+
+
+class EventBus:
+    """Fan progress events out to queues and callbacks (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues = []
+        self._callbacks = []
+
+    def subscribe(self, callback=None):
+        """Register a callback, or return a new queue that receives every event"""
+        with self._lock:
+            if callback is not None:
+                self._callbacks.append(callback)
+                return callback
+            q = queue.Queue()
+            self._queues.append(q)
+            return q
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            if subscriber in self._queues:
+                self._queues.remove(subscriber)
+            if subscriber in self._callbacks:
+                self._callbacks.remove(subscriber)
+
+    def emit(self, event):
+        with self._lock:
+            queues = list(self._queues)
+            callbacks = list(self._callbacks)
+        for q in queues:
+            q.put(event)
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception:
+                pass
+
+
+def drain(event_queue, max_events=None):
+    """Pop everything currently waiting in event_queue without blocking"""
+    events = []
+    while max_events is None or len(events) < max_events:
+        try:
+            events.append(event_queue.get_nowait())
+        except queue.Empty:
+            break
+    return events
+
+
+class ModProgress:
+    """Progress of a single mod as seen from the event stream"""
+
+    def __init__(self, mod):
+        self.mod = mod
+        self.phase = PHASE_RESOLVE
+        self.downloaded = 0
+        self.total = 0
+
+    @property
+    def fraction(self):
+        if self.total > 0:
+            return min(self.downloaded / self.total, 1.0)
+        return 0.0
+
+
+class ProgressTracker:
+    """Fold events into batch state: per-mod progress, throughput and ETA"""
+
+    def __init__(self, window_seconds=5.0):
+        self.total_mods = 0
+        self.finished_mods = 0
+        self.failed_mods = 0
+        self.active = {}
+        self.bytes_done = 0
+        self.completed_bytes = 0
+        self.completed_with_size = 0
+        self.started_at = None
+        self.finished = False
+        self.window_seconds = window_seconds
+        self._samples = deque()
+
+    def apply(self, event):
+        """Update state from one event and return it"""
+        if isinstance(event, BatchStarted):
+            self.total_mods = event.total_mods
+            self.started_at = event.timestamp
+        elif isinstance(event, PhaseChanged):
+            self._mod(event.mod).phase = event.phase
+        elif isinstance(event, BytesTransferred):
+            progress = self._mod(event.mod)
+            delta = max(event.downloaded - progress.downloaded, 0)
+            progress.downloaded = event.downloaded
+            progress.total = event.total
+            self.bytes_done += delta
+            self._samples.append((event.timestamp, delta))
+        elif isinstance(event, (ModDone, ModFailed)):
+            progress = self.active.pop(event.mod, None)
+            self.finished_mods += 1
+            if isinstance(event, ModFailed):
+                self.failed_mods += 1
+            elif progress and progress.downloaded:
+                self.completed_bytes += progress.downloaded
+                self.completed_with_size += 1
+        elif isinstance(event, RetryPassStarted):
+            # Failed mods are being tried again; they are no longer finished
+            self.finished_mods -= len(event.mods)
+            self.failed_mods -= len(event.mods)
+        elif isinstance(event, BatchFinished):
+            self.finished = True
+        return event
+
+    def _mod(self, mod):
+        if mod not in self.active:
+            self.active[mod] = ModProgress(mod)
+        return self.active[mod]
+
+    @property
+    def overall_fraction(self):
+        if self.finished:
+            return 1.0
+        if not self.total_mods:
+            return 0.0
+        partial = sum(p.fraction for p in self.active.values())
+        return min((self.finished_mods + partial) / self.total_mods, 1.0)
+
+    def throughput(self, now=None):
+        """Bytes per second over the sliding window"""
+        now = now or time.time()
+        while self._samples and now - self._samples[0][0] > self.window_seconds:
+            self._samples.popleft()
+        if not self._samples:
+            return 0.0
+        span = max(now - self._samples[0][0], 1.0)
+        return sum(delta for _, delta in self._samples) / span
+
+    def eta(self, now=None):
+        """Estimated seconds left, or None while there is not enough data"""
+        rate = self.throughput(now)
+        if rate <= 0 or not self.total_mods:
+            return None
+        remaining_active = sum(max(p.total - p.downloaded, 0) for p in self.active.values())
+        waiting = max(self.total_mods - self.finished_mods - len(self.active), 0)
+        if waiting and self.completed_with_size:
+            remaining_active += waiting * (self.completed_bytes / self.completed_with_size)
+        elif waiting:
+            return None
+        return remaining_active / rate
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}"
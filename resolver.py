@@ -0,0 +1,120 @@
+"""HTML fallback for finding a mod's download URL when the package API fails.
+
+The mod page is scanned as it streams in, with patterns compiled once at
+import. Reading stops at the first download link or version_number, so the
+rest of the page is never downloaded or searched. Results are cached per
+full_name and version, so a retry pass or a second batch does not fetch the
+same pages again.
+"""
+import re
+import time
+import threading
+
+
+STRATEGY_SCRAPE = "html_scrape"
+STRATEGY_VERSION_GUESS = "version_guess"
+
+# Tried in order on each window of the page; each match is closed by a quote or slash,
+# so a match cut off at the end of a window is never accepted
+LINK_PATTERNS = (
+    re.compile(r'href="(https://[^"]*thunderstore[^"]*download[^"]*)"', re.IGNORECASE),
+    re.compile(r'"download_url":"([^"]*)"', re.IGNORECASE),
+    re.compile(r'data-download-url="([^"]*)"', re.IGNORECASE),
+)
+PACKAGE_DOWNLOAD_PATH = re.compile(r'/package/download/([^/"\s<>]+)/([^/"\s<>]+)/([^/"\s<>]+)/', re.IGNORECASE)
+VERSION_NUMBER = re.compile(r'"version_number"\s*:\s*"([^"]+)"')
+
+CHUNK_SIZE = 16 * 1024
+# Characters carried into the next window so matches spanning two chunks are found
+OVERLAP = 2048
+
+
+def download_path(author, name, version):
+    return f"/package/download/{author}/{name}/{version}/"
+
+
+def scan_page(chunks, author, name):
+    """Scan text chunks for a download URL; returns (url, strategy, version) or (None, None, None).
+
+    url may be relative to the site. Stops consuming chunks at the first hit.
+    """
+    carry = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        window = carry + chunk
+        for pattern in LINK_PATTERNS:
+            match = pattern.search(window)
+            if match:
+                return match.group(1), STRATEGY_SCRAPE, None
+        for match in PACKAGE_DOWNLOAD_PATH.finditer(window):
+            if match.group(1).lower() == author.lower() and match.group(2).lower() == name.lower():
+                return match.group(0), STRATEGY_SCRAPE, match.group(3)
+        match = VERSION_NUMBER.search(window)
+        if match:
+            version = match.group(1)
+            return download_path(author, name, version), STRATEGY_VERSION_GUESS, version
+        carry = window[-OVERLAP:]
+    return None, None, None
+
+
+def resolve_from_response(response, author, name, base_url):
+    """Scan an open streaming page response; returns (absolute url, strategy, version) or Nones.
+
+    The response is closed when the scan stops, so an early hit skips the rest of the body.
+    """
+    if response.encoding is None:
+        response.encoding = "utf-8"
+    try:
+        url, strategy, version = scan_page(response.iter_content(CHUNK_SIZE, decode_unicode=True), author, name)
+    finally:
+        response.close()
+    if url and not url.startswith("http"):
+        url = f"{base_url.rstrip('/')}{url}"
+    if url and version is None:
+        match = PACKAGE_DOWNLOAD_PATH.search(url)
+        if match:
+            version = match.group(3)
+    return url, strategy, version
+
+
+class ResolutionCache:
+    """Download URLs found by scraping, per full_name and per (full_name, version)"""
+
+    def __init__(self, ttl=600.0):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, full_name, version=None):
+        """(url, strategy, version) for full_name, or None when missing or expired"""
+        key = (full_name.lower(), version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            return value
+
+    def put(self, full_name, url, strategy, version=None):
+        value = (url, strategy, version)
+        now = time.monotonic()
+        with self._lock:
+            self._entries[(full_name.lower(), None)] = (now, value)
+            if version:
+                self._entries[(full_name.lower(), version)] = (now, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = ResolutionCache()
+
+
+def get_cache():
+    """The process-wide ResolutionCache"""
+    return _cache
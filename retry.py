@@ -0,0 +1,221 @@
+"""Retries, a shared retry budget and circuit breakers for engine requests.
+
+One RetryBudget and one CircuitBreaker are shared by all workers of a
+batch. A failed request is retried with jittered exponential backoff, or
+after the server's Retry-After on 429/503, as long as the budget has
+tokens. A (host, strategy) pair that keeps failing opens its breaker and is
+skipped for the rest of the batch instead of timing out once per mod.
+Given the batch's control.BatchControl, back-offs and cool-downs end as
+soon as the batch (or the mod) is cancelled and wait out a pause.
+"""
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+TRANSIENT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class CircuitOpenError(Exception):
+    """The breaker for this host and strategy is open; the request was not sent"""
+
+
+class RetryPolicy:
+    """How many attempts, and how long to back off between them"""
+
+    def __init__(self, attempts=4, base_delay=0.5, max_delay=30.0, max_retry_after=60.0, rng=None):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self._rng = rng or random.Random()
+
+    def backoff(self, attempt):
+        """Full-jitter exponential delay before retry number attempt (1-based)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return self._rng.uniform(0, ceiling)
+
+    def retry_after(self, response):
+        """Seconds the server asked us to wait, capped, or None"""
+        value = response.headers.get("Retry-After") if response is not None else None
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(max(seconds, 0.0), self.max_retry_after)
+
+
+class RetryBudget:
+    """Retry tokens shared by every worker, plus per-host cool-downs.
+
+    Each retry spends a token; each success earns back refill tokens, so a
+    batch against a healthy server keeps retrying occasional failures while
+    an outage cannot multiply traffic. Retry-After puts the whole host on
+    hold, not just the request that got it.
+    """
+
+    def __init__(self, retries=20, refill=0.2):
+        self.capacity = float(retries)
+        self.refill = refill
+        self._tokens = float(retries)
+        self._hold_until = {}
+        self._lock = threading.Lock()
+
+    def try_spend(self):
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.refill)
+
+    def cool_down(self, host, seconds):
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._hold_until.get(host, 0):
+                self._hold_until[host] = until
+
+    def wait(self, host, sleep=time.sleep):
+        """Sleep until host's cool-down (if any) has passed"""
+        with self._lock:
+            remaining = self._hold_until.get(host, 0) - time.monotonic()
+        if remaining > 0:
+            sleep(remaining)
+
+    @property
+    def tokens(self):
+        with self._lock:
+            return self._tokens
+
+
+class CircuitBreaker:
+    """Opens a (host, strategy) key after threshold consecutive failures"""
+
+    def __init__(self, threshold=3):
+        self.threshold = threshold
+        self._failures = {}
+        self._open = set()
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        with self._lock:
+            return key not in self._open
+
+    def record_success(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def record_failure(self, key):
+        """Count a failure; returns True when this one opened the breaker"""
+        with self._lock:
+            count = self._failures.get(key, 0) + 1
+            self._failures[key] = count
+            if count >= self.threshold and key not in self._open:
+                self._open.add(key)
+                return True
+            return False
+
+    def reset(self):
+        with self._lock:
+            self._failures.clear()
+            self._open.clear()
+
+    @property
+    def open_keys(self):
+        with self._lock:
+            return sorted(self._open)
+
+
+class Retrier:
+    """Send requests through the policy, the shared budget and the breaker"""
+
+    def __init__(self, policy=None, budget=None, breaker=None, log=None, sleep=time.sleep):
+        self.policy = policy or RetryPolicy()
+        self.budget = budget or RetryBudget()
+        self.breaker = breaker or CircuitBreaker()
+        self._log = log
+        self._sleep = sleep
+
+    def log(self, message, msg_type="info"):
+        if self._log:
+            self._log(message, msg_type)
+
+    def _wait(self, seconds, control, mod):
+        if control is not None:
+            control.sleep(seconds, mod)
+        else:
+            self._sleep(seconds)
+
+    def call(self, url, strategy, send, on_retry=None, control=None, mod=None):
+        """Call send() until it returns a non-retryable response.
+
+        Raises CircuitOpenError without sending when the breaker for
+        (host, strategy) is open. Returns the last response (possibly a
+        429/5xx once retries run out) or raises the last transport error.
+        With control, waits raise control.Cancelled once mod or the batch
+        is cancelled.
+        """
+        host = urlparse(url).netloc
+
+        def sleep(seconds):
+            self._wait(seconds, control, mod)
+
+        key = (host, strategy)
+        if not self.breaker.allow(key):
+            raise CircuitOpenError(f"{strategy} on {host} is unavailable for this batch")
+
+        attempt = 0
+        while True:
+            attempt += 1
+            self.budget.wait(host, sleep)
+            response = error = None
+            try:
+                response = send()
+            except TRANSIENT_ERRORS as e:
+                error = e
+
+            if error is None and response.status_code not in RETRY_STATUSES:
+                self.breaker.record_success(key)
+                self.budget.record_success()
+                return response
+
+            delay = self.policy.retry_after(response)
+            if delay is not None:
+                self.budget.cool_down(host, delay)
+            reason = f"HTTP {response.status_code}" if error is None else type(error).__name__
+
+            if attempt >= self.policy.attempts or not self.budget.try_spend():
+                if self.breaker.record_failure(key):
+                    self.log(f"  ⛔ {strategy} on {host} keeps failing ({reason}); skipping it for this batch",
+                             "warning")
+                if error is not None:
+                    raise error
+                return response
+
+            if response is not None:
+                response.close()
+            if delay is None:
+                delay = self.policy.backoff(attempt)
+            self.log(f"  ↻ {strategy} failed ({reason}); retry {attempt}/{self.policy.attempts - 1} "
+                     f"in {delay:.1f}s", "warning")
+            if on_retry is not None:
+                on_retry()
+            sleep(delay)
@@ -0,0 +1,316 @@
+"""Copy-free snapshots of installed folders, with rollback.
+
+A snapshot recreates the directory structure and links each file into it:
+a reflink (copy-on-write clone) where the filesystem supports it, otherwise
+a hardlink, and only as a last resort a real copy. Either way, taking a
+snapshot costs a directory walk, not a copy of the data.
+
+Hardlinked files share their contents with the live tree, so anything that
+later replaces a file must write a new file instead of overwriting the old
+one in place. copy_unlinked does that, and installers use it when copying
+over a folder that may have been snapshotted.
+
+    store = SnapshotStore(game_folder, include=("GDWeave", "winmm.dll"), keep=5)
+    store.create("before GDWeave 2.0.0")
+    ...
+    store.rollback()          # newest snapshot back into place
+"""
+import os
+import sys
+import json
+import stat
+import shutil
+import errno
+from datetime import datetime
+
+
+SNAPSHOT_DIR = ".webloader_snapshots"
+META_FILE = "snapshot.json"
+
+MODE_REFLINK = "reflink"
+MODE_HARDLINK = "hardlink"
+MODE_SYMLINK = "symlink"
+MODE_COPY = "copy"
+
+# Linux FICLONE ioctl (btrfs, XFS, bcachefs and others)
+_FICLONE = 0x40049409
+
+
+class SnapshotError(Exception):
+    """A snapshot could not be taken or restored"""
+
+
+def _reflink(src, dst):
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflink not supported on this platform")
+    import fcntl
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.remove(dst)
+            raise
+    shutil.copystat(src, dst)
+
+
+class Linker:
+    """Links files with the cheapest method that works, remembering what failed"""
+
+    def __init__(self, modes=(MODE_REFLINK, MODE_HARDLINK, MODE_COPY)):
+        self.modes = list(modes)
+        self.used = {}
+
+    def link(self, src, dst):
+        for mode in list(self.modes):
+            try:
+                if mode == MODE_REFLINK:
+                    _reflink(src, dst)
+                elif mode == MODE_HARDLINK:
+                    os.link(src, dst)
+                elif mode == MODE_SYMLINK:
+                    os.symlink(os.path.abspath(src), dst)
+                else:
+                    shutil.copy2(src, dst)
+            except OSError:
+                if mode == MODE_COPY:
+                    raise
+                # Same filesystem for the whole tree, so one failure means it will keep failing
+                self.modes.remove(mode)
+                continue
+            self.used[mode] = self.used.get(mode, 0) + 1
+            return mode
+        raise SnapshotError(f"Could not link {src}")
+
+    def link_tree(self, src, dst, skip=()):
+        """Recreate src at dst with every file linked, leaving out skip paths; returns the number of files"""
+        if os.path.isfile(src):
+            self.link(src, dst)
+            return 1
+        skip = {os.path.normcase(os.path.abspath(path)) for path in skip}
+        count = 0
+        for root, dirs, files in os.walk(src):
+            dirs[:] = [d for d in dirs if os.path.normcase(os.path.join(root, d)) not in skip]
+            target = os.path.join(dst, os.path.relpath(root, src))
+            os.makedirs(target, exist_ok=True)
+            for name in files:
+                self.link(os.path.join(root, name), os.path.join(target, name))
+                count += 1
+        return count
+
+
+def _make_writable(path):
+    try:
+        os.chmod(path, stat.S_IMODE(os.lstat(path).st_mode) | stat.S_IWRITE)
+    except OSError:
+        pass
+
+
+def remove_file(path):
+    """os.remove that also removes read-only files (store objects are read-only; Windows refuses to delete those)"""
+    try:
+        os.remove(path)
+    except PermissionError:
+        if os.path.islink(path):
+            raise
+        _make_writable(path)
+        os.remove(path)
+
+
+def remove_tree(path, ignore_errors=False):
+    """shutil.rmtree that also removes read-only files, see remove_file"""
+    try:
+        shutil.rmtree(path)
+        return
+    except FileNotFoundError:
+        if ignore_errors:
+            return
+        raise
+    except OSError:
+        if not os.path.isdir(path):
+            if ignore_errors:
+                return
+            raise
+    for root, _, names in os.walk(path):
+        for name in names:
+            if not os.path.islink(os.path.join(root, name)):
+                _make_writable(os.path.join(root, name))
+    shutil.rmtree(path, ignore_errors=ignore_errors)
+
+
+def copy_unlinked(src, dst, *, follow_symlinks=True):
+    """shutil.copy2 that replaces dst instead of writing into it, so snapshots sharing its inode keep their copy"""
+    if os.path.lexists(dst) and not os.path.isdir(dst):
+        remove_file(dst)
+    return shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+
+
+class Snapshot:
+    """One snapshot directory and its metadata"""
+
+    def __init__(self, path, meta):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.label = meta.get("label", "")
+        self.created_at = meta.get("created_at", "")
+        self.items = meta.get("items", [])
+        self.files = meta.get("files", 0)
+        self.modes = meta.get("modes", {})
+
+
+class SnapshotStore:
+    """Snapshots of the include entries of base (or all of base), newest kept first.
+
+    exclude lists paths relative to base (e.g. "GDWeave/mods") that are left
+    out of snapshots and left as they are on rollback.
+    """
+
+    def __init__(self, base, include=None, root=None, keep=5, exclude=()):
+        self.base = os.path.abspath(base)
+        self.include = tuple(include) if include else None
+        self.exclude = tuple(os.path.normpath(path) for path in exclude)
+        self.root = root or os.path.join(self.base, SNAPSHOT_DIR)
+        self.keep = max(1, int(keep))
+
+    def _items(self):
+        if self.include is not None:
+            return [name for name in self.include if os.path.lexists(os.path.join(self.base, name))]
+        root_name = os.path.relpath(self.root, self.base).split(os.sep)[0]
+        return sorted(name for name in os.listdir(self.base) if name != root_name)
+
+    def create(self, label="", prune=True):
+        """Snapshot the current state; returns the Snapshot, or None if there is nothing to keep"""
+        items = self._items()
+        if not items:
+            return None
+        os.makedirs(self.root, exist_ok=True)
+        name = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        path = os.path.join(self.root, name)
+        staging = path + ".partial"
+        linker = Linker()
+        files = 0
+        try:
+            os.makedirs(staging)
+            skip = [os.path.join(self.base, path) for path in self.exclude]
+            for item in items:
+                files += linker.link_tree(os.path.join(self.base, item), os.path.join(staging, item), skip)
+            meta = {
+                "label": label,
+                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "base": self.base,
+                "items": items,
+                "files": files,
+                "modes": linker.used,
+            }
+            with open(os.path.join(staging, META_FILE), "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2)
+            os.rename(staging, path)
+        except Exception as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise SnapshotError(f"Snapshot failed: {str(e)}") from e
+        if prune:
+            self.prune()
+        return Snapshot(path, meta)
+
+    def list(self):
+        """Snapshots, newest first"""
+        if not os.path.isdir(self.root):
+            return []
+        snapshots = []
+        for name in sorted(os.listdir(self.root), reverse=True):
+            meta_path = os.path.join(self.root, name, META_FILE)
+            if name.endswith(".partial") or not os.path.exists(meta_path):
+                continue
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            snapshots.append(Snapshot(os.path.join(self.root, name), meta))
+        return snapshots
+
+    def get(self, name=None):
+        snapshots = self.list()
+        if not snapshots:
+            raise SnapshotError("No snapshots to roll back to")
+        if name is None:
+            return snapshots[0]
+        for snapshot in snapshots:
+            if snapshot.name == name:
+                return snapshot
+        raise SnapshotError(f"Snapshot {name} not found")
+
+    def prune(self):
+        """Delete all but the newest keep snapshots; returns the names removed"""
+        removed = []
+        for snapshot in self.list()[self.keep:]:
+            remove_tree(snapshot.path, ignore_errors=True)
+            removed.append(snapshot.name)
+        return removed
+
+    def rollback(self, name=None):
+        """Put a snapshot's items back in place (newest by default); returns the Snapshot used.
+
+        The current state is snapshotted first, so a rollback can itself be
+        rolled back. Each item is rebuilt from links next to the live one and
+        renamed into place.
+        """
+        snapshot = self.get(name)
+        # Pruned only after the restore, so keep=1 cannot delete the snapshot being restored
+        self.create(f"before rollback to {snapshot.name}", prune=False)
+        linker = Linker()
+        for item in snapshot.items:
+            source = os.path.join(snapshot.path, item)
+            live = os.path.join(self.base, item)
+            incoming = live + ".rollback"
+            outgoing = live + ".replaced"
+            for leftover in (incoming, outgoing):
+                _remove_path(leftover)
+            moved = []
+            try:
+                linker.link_tree(source, incoming)
+                if os.path.lexists(live):
+                    os.rename(live, outgoing)
+                for path in self.exclude:
+                    parts = path.split(os.sep, 1)
+                    if parts[0] != item or len(parts) != 2:
+                        continue
+                    kept = os.path.join(outgoing, parts[1])
+                    if os.path.lexists(kept):
+                        target = os.path.join(incoming, parts[1])
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        _remove_path(target)
+                        os.rename(kept, target)
+                        moved.append((target, kept))
+                os.replace(incoming, live)
+            except OSError as e:
+                # Put excluded folders (the user's mods, configs) back before discarding anything
+                for target, kept in reversed(moved):
+                    if os.path.lexists(target):
+                        os.rename(target, kept)
+                _remove_path(incoming)
+                if os.path.lexists(outgoing) and not os.path.lexists(live):
+                    os.rename(outgoing, live)
+                raise SnapshotError(f"Rollback of {item} failed: {str(e)}") from e
+            _remove_path(outgoing)
+        self.prune()
+        return snapshot
+
+
+def _remove_path(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        remove_tree(path, ignore_errors=True)
+    elif os.path.lexists(path):
+        remove_file(path)
+
+
+def mod_store(download_folder, folder_name, keep=5):
+    """SnapshotStore for one installed mod folder.
+
+    Snapshots live next to the mods folder rather than inside it, so the mod
+    loader never mistakes them for mods.
+    """
+    download_folder = os.path.abspath(download_folder)
+    root = os.path.join(os.path.dirname(download_folder), SNAPSHOT_DIR,
+                        os.path.basename(download_folder), folder_name)
+    return SnapshotStore(download_folder, include=(folder_name,), root=root, keep=keep)
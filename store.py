@@ -0,0 +1,419 @@
+"""Content-addressed store of extracted mod files, and link-based profiles.
+
+Every file is stored once under objects/<first two hex digits>/<sha256>,
+however many mods or profiles ship it. A mods folder is then a tree of
+links into the store: reflinks where the filesystem supports them,
+otherwise hardlinks, symlinks, and copies only as a last resort.
+
+A profile is a manifest of relative path -> digest for one mods folder.
+Switching profiles records the current folder into the active profile,
+builds the target profile's link tree next to the folder and renames it
+into place, so a switch costs one link per file and no data is copied.
+
+The store sits next to the mods folder, like snapshots, so hardlinks stay
+on one filesystem and the mod loader never sees it:
+
+    <parent>/.webloader_store/objects/...
+    <parent>/.webloader_store/profiles/<mods folder name>/<profile>.json
+
+Hardlinked files share their contents with the store, so objects are kept
+read-only: a mod or editor that writes into a linked file gets an error
+instead of silently changing every profile that shares it. Files mods are
+expected to write (configs, see WRITABLE_SUFFIXES) get a reflink or a copy
+of their object instead, never a hardlink. Installers replace files rather
+than write into them (see snapshots.copy_unlinked).
+"""
+import os
+import json
+import stat
+import errno
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime
+
+import snapshots
+
+
+STORE_DIR = ".webloader_store"
+OBJECTS_DIR = "objects"
+PROFILES_DIR = "profiles"
+STATE_FILE = "state.json"
+
+# Left out of profiles: staging for a running batch
+IGNORED = ("temp_extract",)
+
+LINK_MODES = (snapshots.MODE_REFLINK, snapshots.MODE_HARDLINK, snapshots.MODE_SYMLINK, snapshots.MODE_COPY)
+# Files that mods and users edit in place get their own writable copy
+WRITABLE_MODES = (snapshots.MODE_REFLINK, snapshots.MODE_COPY)
+WRITABLE_SUFFIXES = (".cfg", ".conf", ".ini", ".json", ".toml", ".txt", ".yaml", ".yml")
+
+_WRITE_BITS = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+
+HASH_BUFFER = 1024 * 1024
+
+
+class StoreError(Exception):
+    """The store or a profile could not be read or updated"""
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    buffer = bytearray(HASH_BUFFER)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+def is_writable(path):
+    """True for files that get a private writable copy instead of a link (configs)"""
+    return os.path.splitext(path)[1].lower() in WRITABLE_SUFFIXES
+
+
+def store_root(download_folder):
+    return os.path.join(os.path.dirname(os.path.abspath(download_folder)), STORE_DIR)
+
+
+class FileStore:
+    """Files kept once per SHA-256, linked out to wherever they are needed"""
+
+    def __init__(self, root, modes=LINK_MODES):
+        self.root = os.path.abspath(root)
+        self.objects = os.path.join(self.root, OBJECTS_DIR)
+        self.linker = snapshots.Linker(modes)
+        self.copier = snapshots.Linker([mode for mode in modes if mode in WRITABLE_MODES] or [snapshots.MODE_COPY])
+
+    def object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest)
+
+    def has(self, digest):
+        return os.path.exists(self.object_path(digest))
+
+    def seal(self, digest):
+        path = self.object_path(digest)
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+        if mode & _WRITE_BITS:
+            os.chmod(path, mode & ~_WRITE_BITS)
+
+    def add(self, path, move=False, copy=False):
+        """Put the file at path into the store; returns (digest, stored) where stored is False if it was already there.
+
+        With move the file itself becomes the object when possible (for
+        extracted files that are about to be deleted anyway). Otherwise the
+        object is a hardlink to path, or with copy (or across filesystems) a
+        copy of it. The object is made read-only either way.
+        """
+        digest = hash_file(path)
+        target = self.object_path(digest)
+        if os.path.exists(target):
+            self.seal(digest)
+            return digest, False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, temp = tempfile.mkstemp(prefix=".incoming-", dir=os.path.dirname(target))
+        os.close(fd)
+        os.remove(temp)
+        try:
+            if move:
+                try:
+                    os.replace(path, temp)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    shutil.copy2(path, temp)
+            elif copy:
+                shutil.copy2(path, temp)
+            else:
+                try:
+                    os.link(path, temp)
+                except OSError:
+                    shutil.copy2(path, temp)
+            os.replace(temp, target)
+            self.seal(digest)
+        except OSError:
+            if os.path.exists(temp):
+                snapshots.remove_file(temp)
+            raise
+        return digest, True
+
+    def discard(self, digest):
+        """Delete one object, e.g. one whose contents no longer match its name"""
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            snapshots.remove_file(path)
+
+    def link(self, digest, dst, writable=False):
+        """Link the object for digest to dst, replacing any file already there; returns the mode used.
+
+        With writable dst is a reflink or copy the caller may write to.
+        """
+        source = self.object_path(digest)
+        if not os.path.exists(source):
+            raise StoreError(f"Object {digest[:12]} is missing from the store")
+        if os.path.lexists(dst):
+            snapshots.remove_file(dst)
+        self.seal(digest)
+        if not writable:
+            return self.linker.link(source, dst)
+        mode = self.copier.link(source, dst)
+        os.chmod(dst, stat.S_IMODE(os.stat(dst).st_mode) | stat.S_IWUSR)
+        return mode
+
+    def install_tree(self, src, dst):
+        """Move every file under src into the store and link it to the same place under dst.
+
+        Returns (files, already stored). Files already at dst are replaced,
+        not written into.
+        """
+        files = shared = 0
+        for root, _, names in os.walk(src):
+            target = os.path.join(dst, os.path.relpath(root, src))
+            os.makedirs(target, exist_ok=True)
+            for filename in names:
+                digest, stored = self.add(os.path.join(root, filename), move=True)
+                self.link(digest, os.path.join(target, filename), writable=is_writable(filename))
+                files += 1
+                shared += not stored
+        return files, shared
+
+    def is_linked(self, digest, path):
+        """True when path is the stored object itself (a hardlink or symlink to it)"""
+        try:
+            return os.path.samefile(path, self.object_path(digest))
+        except OSError:
+            return False
+
+    def digests(self):
+        if not os.path.isdir(self.objects):
+            return set()
+        return {name for prefix in os.listdir(self.objects)
+                for name in os.listdir(os.path.join(self.objects, prefix)) if not name.startswith(".")}
+
+    def stats(self):
+        count = size = 0
+        for digest in self.digests():
+            count += 1
+            size += os.path.getsize(self.object_path(digest))
+        modes = dict(self.linker.used)
+        for mode, used in self.copier.used.items():
+            modes[mode] = modes.get(mode, 0) + used
+        return {"objects": count, "bytes": size, "link_modes": modes}
+
+    def gc(self, referenced):
+        """Delete objects not in referenced and not hardlinked anywhere; returns (objects removed, bytes freed)"""
+        removed = freed = 0
+        for digest in self.digests() - set(referenced):
+            path = self.object_path(digest)
+            st = os.stat(path)
+            if st.st_nlink > 1:
+                continue
+            freed += st.st_size
+            snapshots.remove_file(path)
+            removed += 1
+        return removed, freed
+
+
+class Profile:
+    """A named manifest of the files in a mods folder"""
+
+    def __init__(self, name, files, dirs=(), created_at=""):
+        self.name = name
+        # relative path -> [digest, size, mtime_ns]
+        self.files = files
+        self.dirs = list(dirs)
+        self.created_at = created_at
+
+    @property
+    def size(self):
+        return sum(entry[1] for entry in self.files.values())
+
+    def to_dict(self):
+        return {"name": self.name, "created_at": self.created_at, "dirs": self.dirs, "files": self.files}
+
+
+class ProfileManager:
+    """Profiles of one mods folder, built from links into a FileStore"""
+
+    def __init__(self, download_folder, store=None, log=None):
+        self.download_folder = os.path.abspath(download_folder)
+        self.store = store or FileStore(store_root(self.download_folder))
+        self.profiles_dir = os.path.join(self.store.root, PROFILES_DIR, os.path.basename(self.download_folder))
+        self._log = log
+
+    def log(self, message, msg_type="info"):
+        if self._log:
+            self._log(message, msg_type)
+
+    def _path(self, name):
+        if not name or name != os.path.basename(name) or name.startswith(".") or f"{name}.json" == STATE_FILE:
+            raise StoreError(f"Invalid profile name: {name!r}")
+        return os.path.join(self.profiles_dir, f"{name}.json")
+
+    def _read_state(self):
+        try:
+            with open(os.path.join(self.profiles_dir, STATE_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, state):
+        os.makedirs(self.profiles_dir, exist_ok=True)
+        with open(os.path.join(self.profiles_dir, STATE_FILE), "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+
+    def active(self):
+        return self._read_state().get("active")
+
+    def list(self):
+        if not os.path.isdir(self.profiles_dir):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.profiles_dir)
+                      if name.endswith(".json") and name != STATE_FILE)
+
+    def get(self, name):
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            raise StoreError(f"Profile {name} not found")
+        except (OSError, ValueError) as e:
+            raise StoreError(f"Could not read profile {name}: {str(e)}") from e
+        return Profile(data.get("name", name), data.get("files", {}), data.get("dirs", []),
+                       data.get("created_at", ""))
+
+    def _write(self, profile):
+        os.makedirs(self.profiles_dir, exist_ok=True)
+        path = self._path(profile.name)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(profile.to_dict(), f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def capture(self, name, previous=None):
+        """Record the mods folder as profile name, moving new files into the store and linking them back.
+
+        Files unchanged in size and mtime since previous are not hashed
+        again; being linked to their object is not enough, since a write
+        through a hardlink changes the object too (and its mtime). If such a
+        write happened anyway (objects are read-only, but not to root or
+        after a chmod), the file's contents become a new object and the old
+        one, which no longer matches its name, is dropped.
+        """
+        known = previous.files if previous else {}
+        files, dirs = {}, []
+        added = 0
+        if os.path.isdir(self.download_folder):
+            for root, subdirs, names in os.walk(self.download_folder):
+                rel_root = os.path.relpath(root, self.download_folder)
+                if rel_root == ".":
+                    subdirs[:] = [d for d in subdirs if d not in IGNORED]
+                else:
+                    dirs.append(rel_root.replace(os.sep, "/"))
+                for filename in names:
+                    path = os.path.join(root, filename)
+                    rel = os.path.relpath(path, self.download_folder).replace(os.sep, "/")
+                    st = os.stat(path)
+                    entry = known.get(rel)
+                    writable = is_writable(filename)
+                    linked = entry is not None and self.store.is_linked(entry[0], path)
+                    if entry and not (writable and linked) and entry[1] == st.st_size and entry[2] == st.st_mtime_ns:
+                        files[rel] = entry
+                        continue
+                    # A file sharing an object's inode is copied out, never adopted as a second object
+                    digest, stored = self.store.add(path, copy=writable or linked)
+                    added += stored
+                    if linked and digest != entry[0]:
+                        self.log(f"⚠️ {rel} was changed in place; stored object {entry[0][:12]} dropped", "warning")
+                        self.store.discard(entry[0])
+                    if writable and linked:
+                        # Hardlinked config (stores from before WRITABLE_SUFFIXES): give it its own copy
+                        self.store.link(digest, path, writable=True)
+                    elif not writable and not self.store.is_linked(digest, path):
+                        # Duplicate of a stored file, or a copy out of a modified object: keep one copy on disk
+                        self.store.link(digest, path)
+                    st = os.stat(path)
+                    files[rel] = [digest, st.st_size, st.st_mtime_ns]
+        profile = Profile(name, files, dirs, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        self._write(profile)
+        return profile, added
+
+    def save(self, name, activate=True):
+        """Record the current folder as name (replacing it); returns the Profile"""
+        previous = None
+        if name in self.list():
+            previous = self.get(name)
+        elif self.active() in self.list():
+            previous = self.get(self.active())
+        profile, added = self.capture(name, previous)
+        if activate:
+            self._write_state({"active": name})
+        self.log(f"💾 Profile '{name}' saved: {len(profile.files)} files, {added} new in the store", "success")
+        return profile
+
+    def switch(self, name):
+        """Make the mods folder match profile name; the current folder is saved to the active profile first"""
+        target = self.get(name)
+        current = self.active()
+        if current and current != name:
+            self.save(current, activate=False)
+
+        incoming = self.download_folder + ".profile"
+        outgoing = self.download_folder + ".replaced"
+        for leftover in (incoming, outgoing):
+            snapshots.remove_tree(leftover, ignore_errors=True)
+        try:
+            os.makedirs(incoming)
+            for rel in target.dirs:
+                os.makedirs(os.path.join(incoming, rel), exist_ok=True)
+            for rel, entry in target.files.items():
+                dst = os.path.join(incoming, rel)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                self.store.link(entry[0], dst, writable=is_writable(rel))
+            if os.path.exists(self.download_folder):
+                os.rename(self.download_folder, outgoing)
+            os.rename(incoming, self.download_folder)
+        except (OSError, snapshots.SnapshotError) as e:
+            snapshots.remove_tree(incoming, ignore_errors=True)
+            if os.path.exists(outgoing) and not os.path.exists(self.download_folder):
+                os.rename(outgoing, self.download_folder)
+            raise StoreError(f"Could not switch to profile {name}: {str(e)}") from e
+
+        temp = os.path.join(outgoing, IGNORED[0])
+        if os.path.isdir(temp):
+            os.rename(temp, os.path.join(self.download_folder, IGNORED[0]))
+        snapshots.remove_tree(outgoing, ignore_errors=True)
+        self._write_state({"active": name})
+        self.log(f"🔀 Switched to profile '{name}' ({len(target.files)} files)", "success")
+        return target
+
+    def delete(self, name):
+        if name == self.active():
+            raise StoreError(f"Profile {name} is active; switch to another one first")
+        path = self._path(name)
+        if not os.path.exists(path):
+            raise StoreError(f"Profile {name} not found")
+        os.remove(path)
+
+    def gc(self):
+        """Drop store objects no profile of any mods folder refers to, nor any file linked into this folder"""
+        referenced = set()
+        profiles_root = os.path.join(self.store.root, PROFILES_DIR)
+        for folder in os.listdir(profiles_root) if os.path.isdir(profiles_root) else ():
+            for filename in os.listdir(os.path.join(profiles_root, folder)):
+                if not filename.endswith(".json") or filename == STATE_FILE:
+                    continue
+                try:
+                    with open(os.path.join(profiles_root, folder, filename), "r", encoding="utf-8") as f:
+                        referenced.update(entry[0] for entry in json.load(f).get("files", {}).values())
+                except (OSError, ValueError) as e:
+                    raise StoreError(f"Could not read {filename}; not collecting: {str(e)}") from e
+        # Files installed since the last save are still in use
+        for root, _, names in os.walk(self.download_folder):
+            for filename in names:
+                path = os.path.join(root, filename)
+                if os.path.islink(path):
+                    referenced.add(os.path.basename(os.readlink(path)))
+        return self.store.gc(referenced)
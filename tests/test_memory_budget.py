@@ -0,0 +1,149 @@
+"""Memory budgets for the mod browser's catalog and icon state, without a display.
+
+The browser code (search_mods, show_mod_details, load_mod_image) runs on a
+WebFishingModManager whose widgets are stand-ins, so no Tk window is
+needed. Catalog records, the JSON carried in the tree's tags and the icon
+cache are Python objects and are traced; Tk's own heap is not, which is
+what benchmarks/memory_budget.py adds on a real display. More mods are
+clicked than the icon budget allows, so a cache that never shrinks fails.
+A failure lists the allocation sites that grew the most.
+"""
+import io
+import gc
+import json
+import random
+import tracemalloc
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+import WebLoader
+from memory_budget import DEFAULT_BUDGETS, budget_failures, top_sites
+from standin_server import Catalog
+
+
+BASE_URL = "http://standin.invalid"
+# Above DEFAULT_BUDGETS["max_cached_icons"]
+CLICKS = 100
+
+
+class FakeWidget:
+    def config(self, **options):
+        pass
+
+    configure = config
+
+    def bbox(self, *items):
+        return None
+
+
+class FakeTree:
+    """The parts of ttk.Treeview the browser uses"""
+
+    def __init__(self):
+        self.rows = {}
+        self.selected = ()
+
+    def insert(self, parent, index, values=(), tags=()):
+        item = f"I{len(self.rows)}"
+        self.rows[item] = {"values": list(values), "tags": list(tags)}
+        return item
+
+    def get_children(self):
+        return list(self.rows)
+
+    def delete(self, item):
+        del self.rows[item]
+
+    def item(self, item, option=None):
+        return self.rows[item][option] if option else self.rows[item]
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, item):
+        self.selected = (item,)
+
+
+class FakePhotoImage:
+    def __init__(self, image):
+        self.size = image.size
+
+    def width(self):
+        return self.size[0]
+
+    def height(self):
+        return self.size[1]
+
+
+class SyncThread:
+    """Runs the icon fetch inline so the test does not race it"""
+
+    def __init__(self, target, daemon=None):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+def icon_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGBA", (256, 256), (40, 120, 200, 255)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def headless_manager(monkeypatch):
+    """A WebFishingModManager with stand-in widgets, HTTP and image classes"""
+    icon = icon_bytes()
+    monkeypatch.setattr(WebLoader.ImageTk, "PhotoImage", FakePhotoImage)
+    monkeypatch.setattr(WebLoader, "threading", SimpleNamespace(Thread=SyncThread))
+
+    app = WebLoader.WebFishingModManager.__new__(WebLoader.WebFishingModManager)
+    app.root = SimpleNamespace(after=lambda delay, callback: callback())
+    app.http = SimpleNamespace(get=lambda url, **kwargs: SimpleNamespace(status_code=200, content=icon))
+    app.log = lambda message, msg_type="info": None
+    app.current_mods = []
+    app.current_mod_images = OrderedDict()
+    app.mod_tree = FakeTree()
+    app.search_entry = SimpleNamespace(get=lambda: "")
+    app.category_var = SimpleNamespace(get=lambda: "Popular")
+    for name in ("mod_name_label", "mod_author_label", "mod_version_label", "mod_downloads_label",
+                 "mod_description_label", "mod_requirements_label", "mod_image_label", "add_button", "view_button",
+                 "details_canvas"):
+        setattr(app, name, FakeWidget())
+    return app
+
+
+@pytest.mark.parametrize("size", [1000, 10000])
+def test_catalog_and_icons_within_budget(monkeypatch, size):
+    listing = json.dumps(Catalog.generate(size, archive_size=0, versions=5, seed=1,
+                                          realistic_versions=True).absolute(BASE_URL))
+    app = headless_manager(monkeypatch)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        baseline_snapshot = tracemalloc.take_snapshot()
+        # What refresh_mod_browser does with the API response
+        app.current_mods = json.loads(listing)
+        app.search_mods()
+        rows = app.mod_tree.get_children()
+        for item in random.Random(1).sample(rows, min(CLICKS, len(rows))):
+            app.mod_tree.selection_set(item)
+            app.show_mod_details()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    assert len(rows) == size
+    assert app.current_mod_images, "no icons were loaded"
+    failures = budget_failures(size, peak - baseline, current - baseline, len(app.current_mod_images),
+                               DEFAULT_BUDGETS)
+    assert not failures, "; ".join(failures) + "".join(
+        f"\n  {site['size_diff_bytes'] / 1024:+.1f} KiB  {site['site']}  {site['code']}"
+        for site in top_sites(snapshot, baseline_snapshot))
@@ -0,0 +1,164 @@
+"""Bandwidth limits for archive downloads.
+
+A Bandwidth holds one token bucket shared by every transfer (the total
+limit) and gives each transfer its own bucket (the per-download limit).
+stream_to_file charges every chunk it reads to both, so a batch never
+takes more than the total and no single mod takes more than its share.
+Limits are bytes per second, 0 meaning unlimited, and set_limits() changes
+them for transfers that are already running: a waiting transfer wakes at
+least every WAIT_SLICE seconds and rechecks the rate.
+
+    bandwidth = Bandwidth(limit=parse_rate("2M"), per_download=parse_rate("512K"))
+    engine = ModEngine("mods", bandwidth=bandwidth)
+    ...
+    bandwidth.set_limits(limit=0)   # from another thread, mid-batch
+"""
+import re
+import time
+import threading
+
+
+# Longest single sleep, so rate changes apply quickly
+WAIT_SLICE = 0.1
+# Reads are sized to about this many seconds of the slowest applicable limit
+CHUNK_SECONDS = 0.1
+MIN_CHUNK = 16 * 1024
+
+RATE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmg]?)(?:i?b)?(?:/s)?\s*$", re.IGNORECASE)
+UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+
+
+def parse_rate(text):
+    """Bytes per second from "500K", "2M", "1.5 MB/s" or a plain number; 0 for "", "0" or "unlimited" """
+    if text is None:
+        return 0
+    if isinstance(text, (int, float)):
+        return max(0, int(text))
+    text = text.strip()
+    if not text or text.lower() in ("0", "none", "off", "unlimited"):
+        return 0
+    match = RATE.match(text)
+    if not match:
+        raise ValueError(f"Not a transfer rate: {text!r} (use e.g. 500K or 2M)")
+    return int(float(match.group(1)) * UNITS[match.group(2).lower()])
+
+
+def format_rate(rate):
+    if not rate:
+        return "Unlimited"
+    for unit in ("B", "KB", "MB"):
+        if rate < 1024:
+            return f"{rate:.0f} {unit}/s" if unit == "B" else f"{rate:g} {unit}/s"
+        rate /= 1024.0
+    return f"{rate:g} GB/s"
+
+
+class TokenBucket:
+    """Thread-safe token bucket; rate in bytes per second, 0 for no limit"""
+
+    def __init__(self, rate=0, burst=None):
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self.rate = 0
+        self.burst = 0
+        self.set_rate(rate, burst)
+
+    def set_rate(self, rate, burst=None):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(0, int(rate or 0))
+            # A quarter second of traffic by default: smooth, but no sleep per small chunk
+            self.burst = int(burst) if burst else max(MIN_CHUNK, self.rate // 4)
+            self._tokens = min(self._tokens, self.burst)
+
+    def _refill(self, now):
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def consume(self, n):
+        """Take n tokens, sleeping until they are available"""
+        while True:
+            with self._lock:
+                if not self.rate:
+                    return
+                self._refill(time.monotonic())
+                # More than a burst is taken on credit once a full burst is available
+                needed = min(n, self.burst)
+                if self._tokens >= needed:
+                    self._tokens -= n
+                    return
+                wait = (needed - self._tokens) / self.rate
+            time.sleep(min(wait, WAIT_SLICE))
+
+
+class Throttle:
+    """The limits one transfer is subject to; call it with each chunk's size"""
+
+    def __init__(self, bandwidth):
+        self.bandwidth = bandwidth
+        self.bucket = TokenBucket(bandwidth.per_download)
+
+    def __call__(self, n):
+        self.bucket.consume(n)
+        self.bandwidth.total.consume(n)
+
+    def chunk_size(self, buffer_size):
+        """How much to read at once: a fraction of a second at the tighter limit, at most buffer_size"""
+        rates = [rate for rate in (self.bucket.rate, self.bandwidth.total.rate) if rate]
+        if not rates:
+            return buffer_size
+        return max(MIN_CHUNK, min(buffer_size, int(min(rates) * CHUNK_SECONDS)))
+
+    def close(self):
+        self.bandwidth._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Bandwidth:
+    """Total and per-download limits, changeable while transfers run"""
+
+    def __init__(self, limit=0, per_download=0):
+        self.total = TokenBucket(limit)
+        self.per_download = max(0, int(per_download or 0))
+        self._lock = threading.Lock()
+        self._active = set()
+
+    @property
+    def limit(self):
+        return self.total.rate
+
+    @property
+    def unlimited(self):
+        return not (self.total.rate or self.per_download)
+
+    def set_limits(self, limit=None, per_download=None):
+        """Change either limit (None leaves it alone); running transfers follow at once"""
+        if limit is not None:
+            self.total.set_rate(limit)
+        if per_download is not None:
+            self.per_download = max(0, int(per_download))
+            with self._lock:
+                active = list(self._active)
+            for throttle in active:
+                throttle.bucket.set_rate(self.per_download)
+
+    def transfer(self):
+        """A Throttle for one download; use it as a context manager"""
+        throttle = Throttle(self)
+        with self._lock:
+            self._active.add(throttle)
+        return throttle
+
+    def _release(self, throttle):
+        with self._lock:
+            self._active.discard(throttle)
+
+    def describe(self):
+        return f"total {format_rate(self.total.rate)}, per download {format_rate(self.per_download)}"
@@ -0,0 +1,118 @@
+"""Streaming archive writer.
+
+Reads a streamed requests.Response into one reusable buffer, preallocates
+the target file when Content-Length is known, hashes the bytes with SHA-256
+as they pass through and reports progress at most a few times per second.
+A throttle.Throttle, if given, is charged for every chunk (and sizes the
+reads) so the transfer keeps to the bandwidth limits. A transfer stopped
+by its checkpoint can be continued from its byte offset (PartialTransfer).
+"""
+import os
+import time
+import hashlib
+
+import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+
+BUFFER_SIZE = 1024 * 1024
+PROGRESS_INTERVAL = 0.25
+
+
+class TransferResult:
+    """Bytes written and their SHA-256"""
+
+    def __init__(self, size, sha256, total):
+        self.size = size
+        self.sha256 = sha256
+        self.total = total
+
+
+class PartialTransfer:
+    """What stream_to_file has written so far; pass it again to continue after a Range request"""
+
+    def __init__(self):
+        self.size = 0
+        self.total = 0
+        self.digest = hashlib.sha256()
+
+    def result(self):
+        return TransferResult(self.size, self.digest.hexdigest(), self.total)
+
+
+def preallocate(f, size):
+    """Reserve size bytes for f up front; best effort, ignored where unsupported"""
+    if size <= 0:
+        return
+    try:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(f.fileno(), 0, size)
+        else:
+            f.truncate(size)
+    except OSError:
+        pass
+
+
+def stream_to_file(response, path, on_progress=None, buffer_size=BUFFER_SIZE, progress_interval=PROGRESS_INTERVAL,
+                   throttle=None, checkpoint=None, partial=None):
+    """Write response's body to path and return a TransferResult.
+
+    on_progress(downloaded, total) is called at most every progress_interval
+    seconds and once more at the end. Connection drops mid-body are raised as
+    requests exceptions, the same ones iter_content would raise.
+
+    checkpoint() is called after every chunk and may raise to stop the
+    transfer; the file then holds exactly partial.size bytes. Passing that
+    partial back with a response to a Range request for the rest appends
+    to the file and continues the hash.
+    """
+    partial = partial or PartialTransfer()
+    offset = partial.size
+    length = int(response.headers.get("content-length", 0) or 0)
+    total = offset + length if length else 0
+    partial.total = total
+    raw = response.raw
+    raw.decode_content = True
+    digest = partial.digest
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    last_report = time.monotonic()
+
+    with open(path, "r+b" if offset else "wb") as f:
+        if offset:
+            f.seek(offset)
+            f.truncate()
+        preallocate(f, total)
+        try:
+            while True:
+                if throttle is None:
+                    n = raw.readinto(buffer)
+                else:
+                    n = raw.readinto(view[:throttle.chunk_size(buffer_size)])
+                if not n:
+                    break
+                chunk = view[:n]
+                f.write(chunk)
+                digest.update(chunk)
+                partial.size += n
+                if throttle is not None:
+                    throttle(n)
+                if on_progress is not None:
+                    now = time.monotonic()
+                    if now - last_report >= progress_interval:
+                        last_report = now
+                        on_progress(partial.size, total)
+                # Not after the last byte: there would be nothing left to ask for
+                if checkpoint is not None and (not total or partial.size < total):
+                    checkpoint()
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e)
+        finally:
+            if total and partial.size != total:
+                f.truncate(partial.size)
+
+    if on_progress is not None:
+        on_progress(partial.size, total)
+    return partial.result()